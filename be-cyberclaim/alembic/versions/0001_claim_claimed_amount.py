@@ -0,0 +1,35 @@
+"""claim_submission.claimed_amount
+
+Kolom nominal klaim untuk scoring anomali tarif. Database yang dibuat
+create_all sebelum kolom ini ada tidak mendapatkannya otomatis.
+
+Revision ID: 0001_claimed_amount
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+
+revision = "0001_claimed_amount"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _has_column(table, column):
+    if context.is_offline_mode():
+        # --sql: tidak ada koneksi untuk diperiksa, tulis DDL apa adanya
+        return False
+    inspector = sa.inspect(op.get_bind())
+    return column in {col["name"] for col in inspector.get_columns(table)}
+
+
+def upgrade():
+    if not _has_column("claim_submission", "claimed_amount"):
+        op.add_column("claim_submission", sa.Column("claimed_amount", sa.Float(), nullable=True))
+
+
+def downgrade():
+    if context.is_offline_mode() or _has_column("claim_submission", "claimed_amount"):
+        op.drop_column("claim_submission", "claimed_amount")
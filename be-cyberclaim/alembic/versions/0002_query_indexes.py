@@ -0,0 +1,61 @@
+"""index untuk query listing, dashboard dan fraud
+
+Index mengikuti query di repositories/claim.py, repositories/fraud.py,
+repositories/facility_stats.py, repositories/doctor.py dan
+routes/dashboard.py (lihat benchmarks/query_plans.py). Di PostgreSQL index
+dibuat CONCURRENTLY agar tabel tetap bisa ditulis selama migrasi.
+
+Revision ID: 0002_query_indexes
+Revises: 0001_claimed_amount
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002_query_indexes"
+down_revision = "0001_claimed_amount"
+branch_labels = None
+depends_on = None
+
+# (nama, tabel, kolom)
+INDEXES = [
+    # Listing klaim keyset (upload_at DESC, id DESC), per faskes / status
+    ("ix_claim_submission_upload_at_id", "claim_submission", ["upload_at", "id"]),
+    ("ix_claim_submission_facility_upload_at_id", "claim_submission", ["facility_id", "upload_at", "id"]),
+    ("ix_claim_submission_status_upload_at_id", "claim_submission", ["status", "upload_at", "id"]),
+    # Riwayat klaim pasien (fraud detection) & pasien baru per faskes (facility_stats)
+    ("ix_claim_submission_patient_upload_at", "claim_submission", ["patient_id", "upload_at"]),
+    ("ix_claim_submission_facility_patient", "claim_submission", ["facility_id", "patient_id"]),
+    # claim_files per klaim (selectinload listing & detail klaim)
+    ("ix_claim_files_claim_id", "claim_files", ["claim_id"]),
+    # Fraud: per klaim, listing keyset, filter resolved / risk_level, statistik confidence
+    ("ix_fraud_detections_claim_id", "fraud_detections", ["claim_id"]),
+    ("ix_fraud_detections_created_at_id", "fraud_detections", ["created_at", "id"]),
+    ("ix_fraud_detections_resolved_created_at_id", "fraud_detections", ["is_resolved", "created_at", "id"]),
+    ("ix_fraud_detections_risk_created_at_id", "fraud_detections", ["risk_level", "created_at", "id"]),
+    ("ix_fraud_detections_confidence", "fraud_detections", ["confidence"]),
+    # Dokter dicari berdasarkan lower(name)
+    ("ix_doctors_name_lower", "doctors", [sa.text("lower(name)")]),
+    # Progress batch bulk upload (keyset per posisi)
+    ("ix_claim_batch_items_batch_position", "claim_batch_items", ["batch_id", "position"]),
+]
+
+
+def _create_indexes(concurrently):
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True, postgresql_concurrently=concurrently)
+
+
+def upgrade():
+    if op.get_bind().dialect.name == "postgresql":
+        # CREATE INDEX CONCURRENTLY tidak boleh di dalam transaksi
+        with op.get_context().autocommit_block():
+            _create_indexes(concurrently=True)
+    else:
+        _create_indexes(concurrently=False)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
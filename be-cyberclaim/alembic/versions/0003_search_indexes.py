@@ -0,0 +1,56 @@
+"""index pencarian pg_trgm / tsvector
+
+Index GIN untuk parameter `search` di /api/patients, /api/doctors,
+/api/medical/sep dan /api/fraud/search (lihat repositories/search.py).
+Hanya PostgreSQL; database lain memakai fallback LIKE tanpa index khusus.
+
+Revision ID: 0003_search_indexes
+Revises: 0002_query_indexes
+Create Date: 2026-10-18
+"""
+import os
+import re
+
+from alembic import op
+
+
+revision = "0003_search_indexes"
+down_revision = "0002_query_indexes"
+branch_labels = None
+depends_on = None
+
+# Harus sama dengan repositories.search.SEARCH_TS_CONFIG agar index terpakai
+TS_CONFIG = re.sub(r"\W", "", os.getenv("SEARCH_TS_CONFIG", "simple"))
+
+# (nama, tabel, ekspresi index GIN)
+INDEXES = [
+    ("ix_patients_name_trgm", "patients", "name gin_trgm_ops"),
+    ("ix_patients_nik_trgm", "patients", "nik gin_trgm_ops"),
+    ("ix_patients_bpjs_number_trgm", "patients", "bpjs_number gin_trgm_ops"),
+    ("ix_doctors_name_trgm", "doctors", "name gin_trgm_ops"),
+    ("ix_doctors_specialization_trgm", "doctors", "specialization gin_trgm_ops"),
+    ("ix_doctors_bpjs_id_trgm", "doctors", "bpjs_id gin_trgm_ops"),
+    ("ix_sep_sep_number_trgm", "sep", "sep_number gin_trgm_ops"),
+    ("ix_sep_poli_trgm", "sep", "poli gin_trgm_ops"),
+    ("ix_fraud_detections_detection_type_trgm", "fraud_detections", "detection_type gin_trgm_ops"),
+    ("ix_fraud_detections_description_tsv", "fraud_detections",
+     f"to_tsvector('{TS_CONFIG}', coalesce(description, ''))"),
+]
+
+
+def upgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # CREATE INDEX CONCURRENTLY tidak boleh di dalam transaksi
+    with op.get_context().autocommit_block():
+        for name, table, expression in INDEXES:
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} USING gin ({expression})")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    with op.get_context().autocommit_block():
+        for name, _, _ in reversed(INDEXES):
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
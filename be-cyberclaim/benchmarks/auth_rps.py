@@ -0,0 +1,141 @@
+"""
+Benchmark requests/detik endpoint terautentikasi sederhana (default /api/auth/me).
+
+Endpoint ini hampir tidak melakukan apa-apa selain get_current_user, jadi
+throughput-nya mengukur biaya autentikasi per request. Bandingkan server
+dengan cache user nonaktif (sebelum) dan aktif (sesudah):
+
+    AUTH_USER_CACHE_TTL=0 uvicorn main:app --port 8000     # sebelum
+    python benchmarks/auth_rps.py --token <JWT> --label tanpa-cache
+
+    uvicorn main:app --port 8000                           # sesudah (TTL default)
+    python benchmarks/auth_rps.py --token <JWT> --label cache
+
+Token bisa didapat dari POST /api/auth/login, atau langsung dengan
+--username/--password.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import statistics
+import urllib.parse
+import urllib.request
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def login(base_url, username, password, timeout):
+    body = urllib.parse.urlencode({"username": username, "password": password}).encode()
+    request = urllib.request.Request(
+        f"{base_url}/api/auth/login",
+        data=body,
+        method="POST",
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+    )
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.loads(response.read())["access_token"]
+
+
+def authenticated_request(url, token, timeout):
+    request = urllib.request.Request(url, headers={"Authorization": f"Bearer {token}"})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except urllib.error.URLError as e:
+        print(f"[WARNING] request gagal: {e}")
+        status = None
+    return status, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Requests/detik endpoint terautentikasi")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--path", default="/api/auth/me", help="Endpoint terautentikasi yang diukur")
+    parser.add_argument("--token", default=os.getenv("CYBERCLAIM_TOKEN"), help="JWT (atau --username/--password)")
+    parser.add_argument("--username", default=None)
+    parser.add_argument("--password", default=None)
+    parser.add_argument("--concurrency", type=int, default=8, help="Jumlah klien paralel")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Durasi pengukuran")
+    parser.add_argument("--warmup", type=int, default=20, help="Request pemanasan (tidak dihitung)")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--label", default="run", help="Nama run di output (mis. tanpa-cache / cache)")
+    parser.add_argument("--min-rps", type=float, default=None,
+                        help="Exit code 1 jika requests/detik di bawah nilai ini")
+    parser.add_argument("--json", action="store_true", help="Cetak hasil sebagai JSON")
+    args = parser.parse_args()
+
+    base_url = args.base_url.rstrip("/")
+    token = args.token
+    if not token:
+        if not (args.username and args.password):
+            parser.error("--token (atau CYBERCLAIM_TOKEN) atau --username/--password wajib diisi")
+        token = login(base_url, args.username, args.password, args.timeout)
+
+    url = f"{base_url}{args.path}"
+    for _ in range(args.warmup):
+        authenticated_request(url, token, args.timeout)
+
+    latencies, statuses = [], {}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.seconds
+
+    def client():
+        local_latencies, local_statuses = [], {}
+        while time.perf_counter() < deadline:
+            status, elapsed = authenticated_request(url, token, args.timeout)
+            local_latencies.append(elapsed)
+            local_statuses[str(status)] = local_statuses.get(str(status), 0) + 1
+        with lock:
+            latencies.extend(local_latencies)
+            for status, count in local_statuses.items():
+                statuses[status] = statuses.get(status, 0) + count
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        for future in [executor.submit(client) for _ in range(args.concurrency)]:
+            future.result()
+    elapsed = time.perf_counter() - start
+
+    ms = [latency * 1000 for latency in latencies]
+    result = {
+        "label": args.label,
+        "path": args.path,
+        "concurrency": args.concurrency,
+        "requests": len(ms),
+        "rps": round(len(ms) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(statistics.median(ms), 2) if ms else 0.0,
+        "p99_ms": round(percentile(ms, 99), 2),
+        "status": statuses,
+    }
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"{result['label']:<12} {result['path']} c={result['concurrency']} n={result['requests']} "
+              f"rps={result['rps']:.1f} p50={result['p50_ms']:.2f}ms p99={result['p99_ms']:.2f}ms "
+              f"status={result['status']}")
+
+    if set(statuses) != {"200"}:
+        print(f"[WARNING] Ada response selain 200: {statuses}")
+    if args.min_rps is not None and result["rps"] < args.min_rps:
+        print(f"[FAIL] {result['rps']} rps < {args.min_rps} rps")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,482 @@
+"""
+Micro-benchmark ekstraksi field per halaman: extractor lama (loop re.search per
+pattern) vs engine FieldSpec/DocumentSpec (pattern dikompilasi saat import,
+alternatif digabung menjadi satu alternation).
+
+Output kedua versi dibandingkan terlebih dahulu; benchmark gagal jika berbeda.
+
+    python benchmarks/field_extraction.py --iterations 2000
+    python benchmarks/field_extraction.py --corpus contoh_teks/ --json
+"""
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.validation import (
+    validate_icd_code, detect_icd_codes_in_text, ICD10_DB, ICD9_DB,
+    extract_sep_info, extract_rujukan_info, extract_rekam_medis_info
+)
+
+# ============================================================
+# EXTRACTOR LAMA (baseline "sebelum")
+# ============================================================
+
+def legacy_extract_sep_info(text):
+    """Ekstrak informasi dari SEP dengan pattern yang lebih akurat"""
+    info = {
+        'no_sep': None, 'nama_pasien': None, 'tgl_sep': None, 
+        'no_kartu': None, 'diagnosa': [], 'field_missing': [],
+        'icd10_validation': {'status': 'BELUM_DIVALIDASI', 'errors': []}
+    }
+    
+    field_wajib_sep = ['no_sep', 'nama_pasien', 'tgl_sep', 'no_kartu', 'diagnosa']
+    
+    # Pattern untuk nomor SEP - lebih akurat
+    sep_patterns = [
+        r'No\.?SEP\s*:\s*([A-Z0-9\-]+)',
+        r'SEP\s*:\s*([A-Z0-9\-]+)',
+    ]
+    
+    for pattern in sep_patterns:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            info['no_sep'] = match.group(1).strip()
+            break
+    
+    # Pattern untuk tanggal SEP - lebih spesifik
+    tgl_sep_patterns = [
+        r'Tgl\.?SEP\s*:\s*(\d{4}-\d{2}-\d{2})',
+        r'Tanggal\s*SEP\s*:\s*(\d{4}-\d{2}-\d{2})',
+    ]
+    
+    for pattern in tgl_sep_patterns:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            info['tgl_sep'] = match.group(1).strip()
+            break
+    
+    # Pattern untuk nomor kartu - lebih spesifik
+    no_kartu_patterns = [
+        r'No\.?Kartu\s*:\s*([0-9]+)',
+        r'Kartu\s*:\s*([0-9]+)',
+    ]
+    
+    for pattern in no_kartu_patterns:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            info['no_kartu'] = match.group(1).strip()
+            break
+    
+    # Pattern untuk nama pasien
+    nama_patterns = [
+        r'Nama\s*Peserta\s*:\s*([^\n]+)',
+        r'Nama\s*:\s*([^\n]+)',
+    ]
+    
+    for pattern in nama_patterns:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            nama = match.group(1).strip()
+            # Hapus karakter non-alfabetik tetapi pertahankan spasi
+            nama = re.sub(r'[^A-Za-z\s]', '', nama).strip()
+            info['nama_pasien'] = nama
+            break
+    
+    # Pattern untuk diagnosa - lebih akurat berdasarkan format dokumen
+    diagnosa_patterns = [
+        r'Diagnosa\s*Awal\s*:\s*[-\s]*([A-Z][0-9]{2}\.?[0-9]*)\s*[-–]\s*([^\n]+)',
+        r'Diagnosa\s*Awal\s*:\s*([^\n]+)',
+    ]
+    
+    for pattern in diagnosa_patterns:
+        matches = re.findall(pattern, text)
+        for match in matches:
+            if isinstance(match, tuple) and len(match) == 2:
+                kode = match[0].strip()
+                deskripsi = match[1].strip()
+                is_valid, validation_msg, system = validate_icd_code(kode, ICD10_DB, ICD9_DB)
+                
+                info['diagnosa'].append({
+                    'kode': kode, 'deskripsi': deskripsi, 'valid_icd': is_valid,
+                    'validation_msg': validation_msg, 'system': system
+                })
+                break
+    
+    # Fallback: cari kode ICD-10 dalam teks diagnosa
+    if not info['diagnosa']:
+        # Cari bagian diagnosa terlebih dahulu
+        diagnosa_section_pattern = r'Diagnosa\s*Awal\s*:\s*([^\n]+)'
+        diagnosa_match = re.search(diagnosa_section_pattern, text, re.IGNORECASE)
+        if diagnosa_match:
+            diagnosa_text = diagnosa_match.group(1).strip()
+            all_icd_codes = detect_icd_codes_in_text(diagnosa_text)
+            for icd_info in all_icd_codes:
+                if icd_info['system'] == 'ICD-10':
+                    info['diagnosa'].append({
+                        'kode': icd_info['code'], 
+                        'deskripsi': diagnosa_text,
+                        'valid_icd': icd_info['valid'], 
+                        'validation_msg': icd_info['validation_msg'],
+                        'system': icd_info['system']
+                    })
+                    break
+    
+    # Update status validasi ICD-10
+    if info['icd10_validation']['errors']:
+        info['icd10_validation']['status'] = 'GAGAL'
+    elif info['diagnosa']:
+        info['icd10_validation']['status'] = 'SUKSES'
+    else:
+        info['icd10_validation']['status'] = 'TIDAK_ADA_DIAGNOSA'
+    
+    # Cek field missing
+    for field in field_wajib_sep:
+        if not info[field] or (field == 'diagnosa' and not info[field]):
+            info['field_missing'].append(field)
+    
+    return info
+
+def legacy_extract_rujukan_info(text):
+    """Ekstrak informasi dari surat rujukan dengan pattern yang lebih akurat"""
+    info = {
+        'diagnosa_rujukan': [], 'nama_pasien_rujukan': None, 'no_rujukan': None,
+        'dokter_perujuk': None, 'tanda_tangan_dokter': False, 'field_missing': []
+    }
+    
+    field_wajib_rujukan = ['no_rujukan', 'nama_pasien_rujukan', 'diagnosa_rujukan', 'tanda_tangan_dokter']
+    
+    # Pattern untuk nomor rujukan - lebih akurat
+    rujukan_patterns = [
+        r'No\.?\s*Rujukan\s*:\s*([^\n]+)',
+        r'Rujukan\s*:\s*([^\n]+)',
+    ]
+    
+    for pattern in rujukan_patterns:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            no_rujukan = match.group(1).strip()
+            # Filter untuk menghindari kata "Puskesmas"
+            if no_rujukan.lower() != "puskesmas":
+                info['no_rujukan'] = no_rujukan
+            break
+    
+    # Pattern untuk nama pasien
+    nama_patterns = [
+        r'Nama\s*:\s*([^\n]+)',
+        r'Peserta\s*:\s*([^\n]+)',
+    ]
+    
+    for pattern in nama_patterns:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            nama = match.group(1).strip()
+            # Hapus informasi tambahan seperti "Umur : 45 Tahun : 1980-01-01"
+            nama = re.sub(r'Umur\s*:.*', '', nama).strip()
+            nama = re.sub(r'[^A-Za-z\s]', '', nama).strip()
+            info['nama_pasien_rujukan'] = nama
+            break
+    
+    # Pattern untuk diagnosa - lebih akurat
+    diagnosa_patterns = [
+        r'Diagnosa\s*:\s*([^\n]+)',
+        r'Diagnosa\s*Awal\s*:\s*([^\n]+)',
+    ]
+    
+    for pattern in diagnosa_patterns:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            diagnosa_text = match.group(1).strip()
+            # Hapus informasi tambahan dalam kurung
+            diagnosa_text = re.sub(r'\([^)]*\)', '', diagnosa_text).strip()
+            
+            all_icd_codes = detect_icd_codes_in_text(diagnosa_text)
+            
+            for icd_info in all_icd_codes:
+                info['diagnosa_rujukan'].append({
+                    'kode': icd_info['code'], 
+                    'deskripsi': diagnosa_text,
+                    'valid_icd': icd_info['valid'], 
+                    'validation_msg': icd_info['validation_msg'],
+                    'system': icd_info['system']
+                })
+            break
+    
+    # Cek tanda tangan dokter
+    tanda_tangan_patterns = [
+        r'Dr\.\s*[A-Za-z\s]+\s*$',  # Pattern untuk nama dokter di akhir dokumen
+        r'Tanda\s*tangan',
+    ]
+    
+    for pattern in tanda_tangan_patterns:
+        if re.search(pattern, text, re.IGNORECASE):
+            info['tanda_tangan_dokter'] = True
+            # Extract nama dokter
+            doctor_match = re.search(r'Dr\.\s*([A-Za-z\s]+)', text, re.IGNORECASE)
+            if doctor_match:
+                info['dokter_perujuk'] = doctor_match.group(1).strip()
+            break
+    
+    # Cek field missing
+    for field in field_wajib_rujukan:
+        if field == 'tanda_tangan_dokter':
+            if not info[field]:
+                info['field_missing'].append(field)
+        elif not info[field] or (field == 'diagnosa_rujukan' and not info[field]):
+            info['field_missing'].append(field)
+    
+    return info
+
+def legacy_extract_rekam_medis_info(text):
+    """Ekstrak informasi dari rekam medis dengan pattern yang lebih akurat"""
+    info = {
+        'diagnosa_rm': [], 'nama_pasien_rm': None, 'no_rekam_medis': None,
+        'dokter_dpip': None, 'tanda_tangan_dpip': False, 
+        'tindakan_medis': [], 'field_missing': [],
+        'icd9_validation': {'status': 'BELUM_DIVALIDASI', 'errors': []}
+    }
+    
+    field_wajib_rm = ['no_rekam_medis', 'nama_pasien_rm', 'diagnosa_rm', 'dokter_dpip']
+    
+    # Pattern untuk nomor rekam medis
+    rm_patterns = [
+        r'No\.?\s*Rekam\s*Medik?\s*:\s*([A-Z0-9\-]+)',
+        r'No\.?RM\s*:\s*([A-Z0-9\-]+)',
+    ]
+    
+    for pattern in rm_patterns:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            info['no_rekam_medis'] = match.group(1).strip()
+            break
+    
+    # Pattern untuk nama pasien
+    nama_patterns = [
+        r'Nama\s*Pasien\s*:\s*([^\n]+)',
+        r'Nama\s*:\s*([^\n]+)',
+    ]
+    
+    for pattern in nama_patterns:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            nama = match.group(1).strip()
+            nama = re.sub(r'[^A-Za-z\s]', '', nama).strip()
+            info['nama_pasien_rm'] = nama
+            break
+    
+    # Pattern untuk diagnosa - lebih akurat
+    diagnosa_patterns = [
+        r'Diagnosa\s*masuk\s*:\s*([^\n]+)',
+        r'Diagnosa\s*Utama\s*:\s*([^\n]+)',
+        r'ICD X\s*([A-Z0-9\.]+)',
+    ]
+    
+    for pattern in diagnosa_patterns:
+        matches = re.findall(pattern, text, re.IGNORECASE)
+        for match in matches:
+            if isinstance(match, str):
+                diagnosa_text = match.strip()
+                all_icd_codes = detect_icd_codes_in_text(diagnosa_text)
+                
+                for icd_info in all_icd_codes:
+                    info['diagnosa_rm'].append({
+                        'kode': icd_info['code'], 
+                        'deskripsi': diagnosa_text,
+                        'valid_icd': icd_info['valid'], 
+                        'validation_msg': icd_info['validation_msg'],
+                        'system': icd_info['system']
+                    })
+    
+    # Cek dokter DPJP
+    dokter_patterns = [
+        r'Dokter\s*yang\s*merawat\s*:\s*Dr\.\s*([^\n]+)',
+        r'Dr\.\s*([A-Za-z\s]+)(?=\s*Tanda\s*tangan)',
+    ]
+    
+    for pattern in dokter_patterns:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            info['dokter_dpip'] = match.group(1).strip()
+            info['tanda_tangan_dpip'] = True
+            break
+    
+    # EKSTRAKSI TINDAKAN MEDIS YANG LEBIH AKURAT
+    # Cari section operasi/tindakan terlebih dahulu
+    operasi_section_pattern = r'Operasi\s*/\s*Tindakan\s*:([^•]+?)(?=Infeksi Nosokomial|Imunisasi|Keadaan KRS|$)'
+    operasi_match = re.search(operasi_section_pattern, text, re.IGNORECASE | re.DOTALL)
+    
+    if operasi_match:
+        operasi_text = operasi_match.group(1).strip()
+        # Cari kode ICD-9 dalam format "4800 - Deskripsi"
+        tindakan_pattern = r'(\d{4})\s*-\s*([^\n]+)'
+        tindakan_matches = re.findall(tindakan_pattern, operasi_text)
+        
+        for kode, deskripsi in tindakan_matches:
+            deskripsi = deskripsi.strip()
+            # Skip jika deskripsi adalah "Golongan Operasi" atau kosong
+            if deskripsi and "golongan" not in deskripsi.lower():
+                is_valid, validation_msg, system = validate_icd_code(kode, ICD10_DB, ICD9_DB)
+                
+                info['tindakan_medis'].append({
+                    'deskripsi': deskripsi,
+                    'kode_icd9': kode,
+                    'valid_icd9': is_valid,
+                    'validation_msg': validation_msg
+                })
+                
+                if not is_valid:
+                    info['icd9_validation']['errors'].append(f"Tindakan {kode}: {validation_msg}")
+    
+    # Update status validasi ICD-9
+    if info['icd9_validation']['errors']:
+        info['icd9_validation']['status'] = 'GAGAL'
+    elif info['tindakan_medis']:
+        info['icd9_validation']['status'] = 'SUKSES'
+    else:
+        info['icd9_validation']['status'] = 'TIDAK_ADA_TINDAKAN'
+    
+    # Cek field missing
+    for field in field_wajib_rm:
+        if not info[field] or (field == 'diagnosa_rm' and not info[field]):
+            info['field_missing'].append(field)
+    
+    return info
+
+# ============================================================
+# KORPUS CONTOH
+# ============================================================
+
+# Baris header/footer yang biasa muncul di hasil OCR halaman klaim
+_KOP = (
+    "BPJS Kesehatan\nBadan Penyelenggara Jaminan Sosial\nRUMAH SAKIT UMUM DAERAH KOTA\n"
+    "Jl. Merdeka No. 12 Telp. (021) 555-0123 Fax. (021) 555-0124\n"
+)
+_SEP_BODY = (
+    "Tgl.Lahir : 1980-01-01 Peserta : PBI (APBN)\nNo.Telepon : 081234567890 Jns.Rawat : R.Inap\n"
+    "Sub/Spesialis : PENYAKIT DALAM Jns.Kunjungan : - Konsultasi dokter(pertama)\n"
+    "Dokter : dr. Hendra Gunawan, Sp.PD Poli Perujuk : -\nFaskes Perujuk : PUSKESMAS SUKAMAJU\n"
+    "Kls.Hak : Kelas 3 Kls.Rawat : Kelas 3 Penjamin : -\n"
+    "*Saya menyetujui BPJS Kesehatan untuk: a. membuka dan atau menggunakan informasi medis\n"
+    "pasien untuk keperluan administrasi, pembayaran asuransi atau jaminan pembiayaan kesehatan\n"
+    "b. memberikan akses informasi medis atau riwayat pelayanan kepada dokter/tenaga medis\n"
+    "**Dengan tampilnya luaran SEP elektronik ini merupakan hasil validasi terhadap eligibilitas\n"
+    "Pasien secara elektronik dan selanjutnya Pasien dapat mengakses pelayanan kesehatan rujukan\n"
+    "Cetakan ke 1 2024-10-01 08:15:22 PM\n"
+)
+_RM_BODY = (
+    "Tanggal Masuk : 2024-10-01 Jam : 08.30 Tanggal Keluar : 2024-10-05\n"
+    "Ruang Rawat : Melati Kelas 3 Cara Masuk : IGD\nAnamnesis : BAB cair > 5x/hari sejak 2 hari, mual, muntah\n"
+    "Pemeriksaan Fisik : KU lemah, TD 100/70 mmHg, N 98x/menit, S 37.8 C, turgor kulit menurun\n"
+    "Pemeriksaan Penunjang : Darah rutin: Hb 13.2, Leukosit 12.400, Trombosit 245.000\n"
+    "Terapi / Pengobatan : IVFD RL 20 tpm, Ondansetron 3x4mg, Ranitidin 2x50mg, Zinc 1x20mg\n"
+)
+
+SAMPLE_PAGES = {
+    "sep": [
+        _KOP + "SURAT ELEGIBILITAS PESERTA\nNo.SEP : 0301R0011024V000123\n"
+        "Tgl.SEP : 2024-10-01\nNo.Kartu : 0001234567890\nNama Peserta : BUDI SANTOSO (L)\n" + _SEP_BODY +
+        "Diagnosa Awal : - A09 - Diarrhoea and gastroenteritis of presumed infectious origin\n"
+        "Catatan : -\nPasien/Keluarga Pasien\nPetugas BPJS Kesehatan\n",
+        # Varian label hasil OCR: pattern pertama tiap field tidak cocok
+        _KOP + _SEP_BODY + "SEP : 0301R0011024V000456\nTanggal SEP : 2024-10-02\nKartu : 0009876543210\n"
+        "Nama : SITI AMINAH\nDiagnosa Awal : demam tifoid A01.0 dengan komplikasi\n",
+        _KOP + "SURAT ELEGIBILITAS PESERTA\nNo.SEP : 0301R0011024V000789\nTgl.SEP : 2024-10-03\n"
+        "Nama Peserta : ANDI\n" + _SEP_BODY + "Diagnosa Awal : - J18.9 - Pneumonia, unspecified\n",
+    ],
+    "rujukan": [
+        _KOP + "SURAT RUJUKAN\nPuskesmas Sukamaju\nNo. Rujukan : 1234567890/2024\n"
+        "Kepada Yth. : Dokter Spesialis Penyakit Dalam\n"
+        "Nama : BUDI SANTOSO Umur : 45 Tahun : 1980-01-01\nNo. Kartu BPJS : 0001234567890\n"
+        "Diagnosa : A09 (Diare akut) dehidrasi ringan\n"
+        "Telah diberikan : Oralit, Zinc, Paracetamol 3x500mg\n"
+        "Mohon pemeriksaan dan penanganan lebih lanjut\nSalam sejawat,\nDr. Rina Wulandari",
+        _KOP + "RUJUKAN : Puskesmas\nKepada Yth. : Poli Paru\nPeserta : SITI AMINAH\n"
+        "Anamnesa : batuk berdahak 2 minggu, demam, sesak\nDiagnosa Awal : A01.0 J18.9\n"
+        "Terapi : Amoxicillin 3x500mg\nTanda tangan dokter",
+    ],
+    "rekam_medis": [
+        _KOP + "RINGKASAN PULANG\nNo. Rekam Medik : RM-001234\nNama Pasien : BUDI SANTOSO\n" + _RM_BODY +
+        "Diagnosa masuk : A09 Diare\nDiagnosa Utama : A09 Gastroenteritis\nICD X A09\n"
+        "Operasi / Tindakan : 9904 - Transfusi darah\n8901 - Golongan Operasi Kecil\n"
+        "4513 - Endoskopi\nInfeksi Nosokomial : Tidak\n"
+        "Dokter yang merawat : Dr. Hendra Gunawan, Sp.PD\nTanda tangan",
+        _KOP + "No.RM : 00-11-22\nNama : SITI AMINAH\n" + _RM_BODY + "Diagnosa Utama : J18.9\n"
+        "Dr. Made Wirawan Tanda tangan\nKeadaan KRS : Membaik",
+    ],
+}
+
+EXTRACTORS = {
+    "sep": (legacy_extract_sep_info, extract_sep_info),
+    "rujukan": (legacy_extract_rujukan_info, extract_rujukan_info),
+    "rekam_medis": (legacy_extract_rekam_medis_info, extract_rekam_medis_info),
+}
+
+
+def load_corpus(corpus_dir):
+    """Tambahkan file .txt dari direktori; jenis dokumen dari awalan nama file (sep_*, rujukan_*, rekam_medis_*)"""
+    pages = {kind: list(texts) for kind, texts in SAMPLE_PAGES.items()}
+    if not corpus_dir:
+        return pages
+    for name in sorted(os.listdir(corpus_dir)):
+        if not name.endswith(".txt"):
+            continue
+        kind = next((k for k in EXTRACTORS if name.startswith(k)), None)
+        if kind is None:
+            print(f"[WARNING] Jenis dokumen tidak dikenali: {name}")
+            continue
+        with open(os.path.join(corpus_dir, name), encoding="utf-8") as f:
+            pages[kind].append(f.read())
+    return pages
+
+
+def time_per_page(extractor, texts, iterations):
+    samples = []
+    for _ in range(iterations):
+        for text in texts:
+            start = time.perf_counter()
+            extractor(text)
+            samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ekstraksi field per halaman")
+    parser.add_argument("--iterations", type=int, default=1000, help="Pengulangan per halaman")
+    parser.add_argument("--corpus", default=None, help="Direktori tambahan berisi teks halaman (.txt)")
+    parser.add_argument("--json", action="store_true", help="Cetak hasil sebagai JSON")
+    args = parser.parse_args()
+
+    pages = load_corpus(args.corpus)
+    result = {}
+
+    for kind, (legacy, engine) in EXTRACTORS.items():
+        texts = pages[kind]
+        for text in texts:
+            if legacy(text) != engine(text):
+                print(f"[FAIL] Hasil ekstraksi {kind} berbeda untuk halaman:\n{text[:200]}")
+                sys.exit(1)
+
+        before = time_per_page(legacy, texts, args.iterations)
+        after = time_per_page(engine, texts, args.iterations)
+        before_us = statistics.median(before) * 1e6
+        after_us = statistics.median(after) * 1e6
+        result[kind] = {
+            "pages": len(texts),
+            "before_us_per_page": round(before_us, 2),
+            "after_us_per_page": round(after_us, 2),
+            "speedup": round(before_us / after_us, 2) if after_us else None,
+        }
+        print(f"{kind:<12} pages={len(texts):<3} sebelum={before_us:>8.2f}us "
+              f"sesudah={after_us:>8.2f}us speedup={result[kind]['speedup']}x")
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
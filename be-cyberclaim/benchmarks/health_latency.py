@@ -0,0 +1,168 @@
+"""
+Benchmark latensi /health selama burst upload klaim.
+
+Mengukur latensi /health saat idle, lalu mengirim N upload paralel ke
+/api/upload/claim sambil terus mem-polling /health. Jika route upload
+memblokir event loop, latensi /health selama burst akan melonjak.
+
+Contoh (server sudah berjalan):
+
+    python benchmarks/health_latency.py --token <JWT> --archive data_tes.zip --uploads 20
+"""
+import os
+import sys
+import time
+import json
+import uuid
+import argparse
+import threading
+import statistics
+import urllib.request
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def summarize(label, samples):
+    ms = [s * 1000 for s in samples]
+    if not ms:
+        print(f"{label:<12} tidak ada sampel")
+        return {}
+    summary = {
+        "count": len(ms),
+        "p50_ms": round(statistics.median(ms), 2),
+        "p95_ms": round(percentile(ms, 95), 2),
+        "p99_ms": round(percentile(ms, 99), 2),
+        "max_ms": round(max(ms), 2),
+    }
+    print(f"{label:<12} n={summary['count']:<5} p50={summary['p50_ms']:>8.2f}ms "
+          f"p95={summary['p95_ms']:>8.2f}ms p99={summary['p99_ms']:>8.2f}ms max={summary['max_ms']:>8.2f}ms")
+    return summary
+
+
+def health_request(base_url, timeout):
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(f"{base_url}/health", timeout=timeout) as response:
+            response.read()
+    except urllib.error.URLError as e:
+        print(f"[WARNING] /health gagal: {e}")
+    return time.perf_counter() - start
+
+
+def upload_request(base_url, token, archive_path, timeout):
+    boundary = uuid.uuid4().hex
+    with open(archive_path, "rb") as f:
+        content = f.read()
+    filename = os.path.basename(archive_path)
+    body = (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="rar_file"; filename="{filename}"\r\n'
+        f"Content-Type: application/octet-stream\r\n\r\n"
+    ).encode() + content + f"\r\n--{boundary}--\r\n".encode()
+
+    request = urllib.request.Request(
+        f"{base_url}/api/upload/claim",
+        data=body,
+        method="POST",
+        headers={
+            "Authorization": f"Bearer {token}",
+            "Content-Type": f"multipart/form-data; boundary={boundary}",
+        },
+    )
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except urllib.error.URLError as e:
+        print(f"[WARNING] upload gagal: {e}")
+        status = None
+    return status, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latensi /health selama burst upload")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--token", default=os.getenv("CYBERCLAIM_TOKEN"), help="JWT user faskes")
+    parser.add_argument("--archive", default="data_tes.zip", help="Arsip klaim RAR/ZIP")
+    parser.add_argument("--uploads", type=int, default=20, help="Jumlah upload paralel")
+    parser.add_argument("--interval", type=float, default=0.05, help="Jeda polling /health (detik)")
+    parser.add_argument("--baseline-seconds", type=float, default=3.0)
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--max-p99-ms", type=float, default=None,
+                        help="Exit code 1 jika p99 /health selama burst melebihi nilai ini")
+    parser.add_argument("--json", action="store_true", help="Cetak hasil sebagai JSON")
+    args = parser.parse_args()
+
+    if not args.token:
+        parser.error("--token (atau CYBERCLAIM_TOKEN) wajib diisi")
+
+    base_url = args.base_url.rstrip("/")
+
+    # 1. Baseline idle
+    baseline = []
+    deadline = time.perf_counter() + args.baseline_seconds
+    while time.perf_counter() < deadline:
+        baseline.append(health_request(base_url, args.timeout))
+        time.sleep(args.interval)
+
+    # 2. Burst upload + polling /health
+    burst = []
+    done = threading.Event()
+
+    def poll_health():
+        while not done.is_set():
+            burst.append(health_request(base_url, args.timeout))
+            time.sleep(args.interval)
+
+    poller = threading.Thread(target=poll_health, daemon=True)
+    poller.start()
+
+    burst_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.uploads) as executor:
+        futures = [
+            executor.submit(upload_request, base_url, args.token, args.archive, args.timeout)
+            for _ in range(args.uploads)
+        ]
+        uploads = [future.result() for future in futures]
+    burst_seconds = time.perf_counter() - burst_start
+    done.set()
+    poller.join()
+
+    statuses = {}
+    for status, _ in uploads:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    print(f"Burst: {args.uploads} upload dalam {burst_seconds:.2f}s, status: {statuses}")
+    result = {
+        "baseline": summarize("idle", baseline),
+        "during_burst": summarize("burst", burst),
+        "uploads": summarize("upload", [elapsed for _, elapsed in uploads]),
+        "upload_status": statuses,
+        "burst_seconds": round(burst_seconds, 2),
+    }
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+
+    # Burst yang semua upload-nya gagal tidak mengukur apa-apa
+    if not statuses.get("200"):
+        print(f"[WARNING] Tidak ada upload yang berhasil (status: {statuses}); hasil burst tidak representatif")
+
+    if args.max_p99_ms is not None and result["during_burst"].get("p99_ms", 0) > args.max_p99_ms:
+        print(f"[FAIL] p99 /health {result['during_burst']['p99_ms']}ms > {args.max_p99_ms}ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark waktu import (cold start) API / worker.
+
+Menjalankan `python -X importtime -c "import <module>"` di proses baru
+beberapa kali, lalu melaporkan total waktu import dan modul dengan waktu
+kumulatif terbesar. Modul berat yang seharusnya dimuat lazy (PyMuPDF,
+pytesseract, pandas) dilaporkan jika ikut ter-import.
+
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --module worker --top 30
+    python benchmarks/import_time.py --max-ms 1500 --json
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modul yang tidak boleh ter-import saat startup (dimuat saat dipakai / warm-up)
+LAZY_MODULES = ["fitz", "pymupdf", "pytesseract", "pandas", "PIL.Image", "numpy"]
+
+
+def run_importtime(module, env):
+    """Import `module` di proses baru, kembalikan list (self_us, cumulative_us, nama, depth)"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        print(result.stderr[-2000:])
+        raise SystemExit(f"[FAIL] import {module} gagal (exit {result.returncode})")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((int(self_us), int(cumulative_us), name.strip(), depth))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Laporan waktu import (python -X importtime)")
+    parser.add_argument("--module", default="main", help="Modul yang di-import (main, worker, ...)")
+    parser.add_argument("--runs", type=int, default=5, help="Jumlah proses cold start")
+    parser.add_argument("--top", type=int, default=20, help="Jumlah modul terberat yang ditampilkan")
+    parser.add_argument("--max-ms", type=float, default=None,
+                        help="Exit code 1 jika median waktu import melebihi nilai ini")
+    parser.add_argument("--json", action="store_true", help="Cetak hasil sebagai JSON")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    # Startup tidak boleh butuh koneksi database; SQLite cukup untuk create_engine
+    env.setdefault("DATABASE_URL", "sqlite:///./importtime_benchmark.db")
+
+    totals = []
+    rows = []
+    for _ in range(args.runs):
+        rows = run_importtime(args.module, env)
+        top_level = [row for row in rows if row[2] == args.module]
+        totals.append(top_level[-1][1] / 1000 if top_level else sum(r[0] for r in rows) / 1000)
+
+    heaviest = sorted(rows, key=lambda row: row[1], reverse=True)[:args.top]
+    imported = {row[2] for row in rows}
+    lazy_loaded = [name for name in LAZY_MODULES if name in imported]
+
+    print(f"import {args.module}: median {statistics.median(totals):.1f} ms, "
+          f"min {min(totals):.1f} ms, max {max(totals):.1f} ms ({args.runs} run)")
+    print(f"{'kumulatif':>12} {'self':>10}  modul")
+    for self_us, cumulative_us, name, depth in heaviest:
+        print(f"{cumulative_us / 1000:>10.1f}ms {self_us / 1000:>8.1f}ms  {'  ' * depth}{name}")
+    if lazy_loaded:
+        print(f"[WARNING] Modul berat ikut ter-import saat startup: {', '.join(lazy_loaded)}")
+
+    result = {
+        "module": args.module,
+        "median_ms": round(statistics.median(totals), 1),
+        "runs_ms": [round(total, 1) for total in totals],
+        "heaviest": [{"module": name, "cumulative_ms": round(c / 1000, 1), "self_ms": round(s / 1000, 1)}
+                     for s, c, name, _ in heaviest],
+        "heavy_modules_imported": lazy_loaded,
+    }
+    if args.json:
+        print(json.dumps(result, indent=2))
+
+    if args.max_ms is not None and result["median_ms"] > args.max_ms:
+        print(f"[FAIL] median import {result['median_ms']} ms > {args.max_ms} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
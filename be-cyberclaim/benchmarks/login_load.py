@@ -0,0 +1,123 @@
+"""
+Load test login (POST /api/auth/login) pada concurrency tertentu.
+
+Mensimulasikan banyak user login bersamaan (pergantian shift) dan
+melaporkan p50/p95/p99 latensi, throughput, jumlah 503 (antrean bcrypt
+penuh) serta metrik password_hasher dari /health setelah run.
+
+Contoh (server sudah berjalan):
+
+    python benchmarks/login_load.py --username uploader_rsud001 --password uploader123 --concurrency 50
+    python benchmarks/login_load.py --username admin_rsud001 --password admin123 \\
+        --concurrency 100 --requests 1000 --max-p99-ms 3000 --json
+"""
+import sys
+import json
+import time
+import argparse
+import statistics
+import urllib.parse
+import urllib.request
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def login_request(base_url, username, password, timeout):
+    body = urllib.parse.urlencode({"username": username, "password": password}).encode()
+    request = urllib.request.Request(
+        f"{base_url}/api/auth/login",
+        data=body,
+        method="POST",
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+    )
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except urllib.error.URLError as e:
+        print(f"[WARNING] login gagal: {e}")
+        status = None
+    return status, time.perf_counter() - start
+
+
+def hasher_stats(base_url, timeout):
+    try:
+        with urllib.request.urlopen(f"{base_url}/health", timeout=timeout) as response:
+            return json.loads(response.read()).get("password_hasher")
+    except (urllib.error.URLError, ValueError) as e:
+        print(f"[WARNING] /health gagal: {e}")
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test login")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrency", type=int, default=20, help="Jumlah login paralel")
+    parser.add_argument("--requests", type=int, default=None, help="Total login (default: 5 x concurrency)")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--max-p99-ms", type=float, default=None,
+                        help="Exit code 1 jika p99 login melebihi nilai ini")
+    parser.add_argument("--json", action="store_true", help="Cetak hasil sebagai JSON")
+    args = parser.parse_args()
+
+    base_url = args.base_url.rstrip("/")
+    total = args.requests or args.concurrency * 5
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        futures = [
+            executor.submit(login_request, base_url, args.username, args.password, args.timeout)
+            for _ in range(total)
+        ]
+        results = [future.result() for future in futures]
+    elapsed = time.perf_counter() - start
+
+    statuses = {}
+    for status, _ in results:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    ok_ms = [latency * 1000 for status, latency in results if status == 200]
+    all_ms = [latency * 1000 for _, latency in results]
+
+    result = {
+        "concurrency": args.concurrency,
+        "requests": total,
+        "seconds": round(elapsed, 2),
+        "logins_per_second": round(statuses.get("200", 0) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(statistics.median(ok_ms), 2) if ok_ms else 0.0,
+        "p95_ms": round(percentile(ok_ms, 95), 2),
+        "p99_ms": round(percentile(ok_ms, 99), 2),
+        "max_ms": round(max(all_ms), 2) if all_ms else 0.0,
+        "status": statuses,
+        "password_hasher": hasher_stats(base_url, args.timeout),
+    }
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"login c={result['concurrency']} n={result['requests']} dalam {result['seconds']:.2f}s "
+              f"({result['logins_per_second']} login/s) status={result['status']}")
+        print(f"latensi 200: p50={result['p50_ms']:.2f}ms p95={result['p95_ms']:.2f}ms "
+              f"p99={result['p99_ms']:.2f}ms max={result['max_ms']:.2f}ms")
+        if result["password_hasher"]:
+            print(f"password_hasher: {result['password_hasher']}")
+
+    if args.max_p99_ms is not None and result["p99_ms"] > args.max_p99_ms:
+        print(f"[FAIL] p99 login {result['p99_ms']}ms > {args.max_p99_ms}ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark scoring anomali tarif (services/tariff_scoring.score_claims).
+
+Membangkitkan populasi klaim sintetis (nominal lognormal per diagnosa,
+beberapa faskes dengan markup sistematis, sebagian kecil klaim ekstrem)
+lalu mengukur satu pass vektor per diagnosa & per faskes. Recall dihitung
+terhadap klaim ekstrem yang disisipkan.
+
+    python benchmarks/tariff_scoring.py
+    python benchmarks/tariff_scoring.py --claims 500000 --diagnoses 800 --facilities 300
+    python benchmarks/tariff_scoring.py --max-ms 5000 --json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def build_population(claims, diagnoses, facilities, outlier_rate, seed):
+    """DataFrame klaim sintetis + tarif standar per diagnosa + mask klaim ekstrem"""
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    codes = np.array([f"D{i:04d}" for i in range(diagnoses)])
+    base = rng.uniform(500_000, 20_000_000, diagnoses)
+    markup = np.ones(facilities)
+    markup[rng.choice(facilities, max(1, facilities // 20), replace=False)] = 1.6   # faskes "mahal"
+
+    dx = rng.integers(0, diagnoses, claims)
+    fac = rng.integers(0, facilities, claims)
+    amounts = base[dx] * markup[fac] * rng.lognormal(0, 0.12, claims)
+    outliers = rng.random(claims) < outlier_rate
+    amounts[outliers] *= rng.uniform(3, 8, outliers.sum())
+
+    frame = pd.DataFrame({
+        "claim_id": np.arange(claims),
+        "facility_id": fac,
+        "diagnosa_code": codes[dx],
+        "claimed_amount": amounts.round(-3),
+    })
+    return frame, dict(zip(codes, base)), outliers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark scoring anomali tarif")
+    parser.add_argument("--claims", type=int, default=200_000, help="Jumlah klaim (± satu bulan)")
+    parser.add_argument("--diagnoses", type=int, default=500)
+    parser.add_argument("--facilities", type=int, default=200)
+    parser.add_argument("--outlier-rate", type=float, default=0.005)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--max-ms", type=float, default=None,
+                        help="Exit code 1 jika waktu scoring melebihi nilai ini")
+    parser.add_argument("--json", action="store_true", help="Cetak hasil sebagai JSON")
+    args = parser.parse_args()
+
+    from services.tariff_scoring import score_claims
+
+    frame, tariffs, outliers = build_population(
+        args.claims, args.diagnoses, args.facilities, args.outlier_rate, args.seed
+    )
+
+    start = time.perf_counter()
+    scored = score_claims(frame, tariffs)
+    score_ms = (time.perf_counter() - start) * 1000
+
+    flagged = scored["is_anomaly"].to_numpy()
+    robust_flagged = (scored["anomaly_score"] > 3.5).to_numpy()
+    result = {
+        "claims": args.claims,
+        "score_ms": round(score_ms, 1),
+        "claims_per_second": round(args.claims / (score_ms / 1000)),
+        "anomalies": int(flagged.sum()),
+        "injected_outliers": int(outliers.sum()),
+        "outlier_recall": round(float((robust_flagged & outliers).sum() / max(1, outliers.sum())), 3),
+    }
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"{result['claims']} klaim di-score dalam {result['score_ms']:.0f} ms "
+              f"({result['claims_per_second']} klaim/s)")
+        print(f"anomali: {result['anomalies']}, recall klaim ekstrem: {result['outlier_recall']:.1%} "
+              f"dari {result['injected_outliers']}")
+
+    if args.max_ms is not None and score_ms > args.max_ms:
+        print(f"[FAIL] scoring {score_ms:.0f} ms > {args.max_ms:.0f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -27,4 +27,9 @@ def create_tables():
     from models.medical import SEP, RekamMedis, Diagnosis, Tindakan, TarifINACBGS
     from models.claim import ClaimSubmission, ClaimFiles
     from models.fraud import FraudDetection
+    from models.job import Job
+    from models.claim_batch import ClaimBatch, ClaimBatchItem
+    from models.cache_version import CacheVersion
+    from models.claim_score import ClaimTariffScore
+    from models.facility_stats import FacilityClaimStat
     Base.metadata.create_all(bind=engine)
\ No newline at end of file
@@ -459,6 +459,7 @@ def init_medical_data(db: Session):
         {"diagnosa_code": "J18", "description": "Pneumonia", "tarif_inacbgs": 3000000},
     ]
     
+    tarif_added = False
     for tarif in tarif_data:
         existing = db.query(TarifINACBGS).filter(TarifINACBGS.diagnosa_code == tarif["diagnosa_code"]).first()
         if not existing:
@@ -472,6 +473,12 @@ def init_medical_data(db: Session):
                 updated_at=datetime.now()
             )
             db.add(tarif_obj)
+            tarif_added = True
+    
+    # Cache tarif di proses lain (API/worker) dimuat ulang
+    if tarif_added:
+        from repositories.tariff import bump_tariff_version
+        bump_tariff_version(db)
     
     db.commit()
     print("✓ Medical data initialized")
@@ -836,6 +843,7 @@ def init_claims_and_fraud(db: Session, users: list, patients: list, facilities:
                 rar_file_path=f"/uploads/claims/claim_{i+1}_2024.rar",
                 upload_at=datetime.now(),
                 status=claim_statuses[i],  # Use uppercase enum values
+                claimed_amount=[2500000, 3500000, 4500000, 2800000][i],
                 notes=f"Claim submission for {patients[i].name} - {['Hipertensi', 'Diabetes', 'Pneumonia', 'Gastritis'][i]}",
                 validated_by=users[0].id if i > 0 else None,  # First claim not validated
                 validated_at=datetime.now() if i > 0 else None,
@@ -857,6 +865,10 @@ def init_claims_and_fraud(db: Session, users: list, patients: list, facilities:
     db.commit()
     print(f"   ✅ {len(claim_objects)} claims created successfully")
 
+    # Counter dashboard per faskes untuk klaim seed
+    from repositories.facility_stats import rebuild_facility_stats
+    rebuild_facility_stats(db)
+
     # 5. Create fraud detections
     print("📋 Step 5: Creating fraud detections...")
     for i, claim_obj in enumerate(claim_objects):
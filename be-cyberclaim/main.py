@@ -1,26 +1,39 @@
 from fastapi import FastAPI, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 import os
 from contextlib import asynccontextmanager
 from initial_data import init_all_data
 
 from database import get_db, create_tables
+from services.audit_sink import get_audit_sink
+from services.password_hasher import get_password_hasher
+from utils.upload_limits import UploadSizeLimitMiddleware
 from routes import (
     auth, dashboard, upload, facility, patient, 
     doctor, user, inacbgs, medical, claim, fraud
 )
 import pydantic
 
-# Buat tabel database
-create_tables()
+# Skema dibuat lewat langkah eksplisit `python manage.py create-schema`;
+# AUTO_CREATE_SCHEMA=true membuatnya saat startup (praktis untuk development)
+AUTO_CREATE_SCHEMA = os.getenv("AUTO_CREATE_SCHEMA", "false").lower() in ("1", "true", "yes")
+# Muat modul berat (PyMuPDF, pytesseract) & index ICD di background setelah startup
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "true").lower() in ("1", "true", "yes")
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup: Initialize data
     print(f"Pydantic version: {pydantic.__version__}")
     print("🚀 Starting CyberClaim API...")
+    if AUTO_CREATE_SCHEMA:
+        print("🧱 Membuat skema database (AUTO_CREATE_SCHEMA)...")
+        create_tables()
+    if WARMUP_ON_STARTUP:
+        from services.warmup import start_warm_up
+        start_warm_up()
     print("📊 Checking and initializing data...")
     try:
         init_all_data()
@@ -31,6 +44,8 @@ async def lifespan(app: FastAPI):
     yield
     # Shutdown
     print("🔴 Shutting down CyberClaim API...")
+    get_audit_sink().close()
+    get_password_hasher().close()
 
 app = FastAPI(
     title="CyberClaim API",
@@ -39,6 +54,10 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Batas ukuran body upload, ditegakkan sebelum multipart di-spool
+# (didaftarkan sebelum CORS agar response 413 tetap membawa header CORS)
+app.add_middleware(UploadSizeLimitMiddleware, limits=upload.UPLOAD_BODY_LIMITS)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -46,6 +65,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Mount static files
@@ -79,11 +99,13 @@ def read_root():
 @app.get("/health")
 def health_check(db: Session = Depends(get_db)):
     try:
-        db.execute("SELECT 1")
+        db.execute(text("SELECT 1"))
         return {
             "status": "healthy", 
             "database": "connected",
-            "service": "CyberClaim API"
+            "service": "CyberClaim API",
+            "audit_sink": get_audit_sink().stats(),
+            "password_hasher": get_password_hasher().stats()
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database connection failed: {str(e)}")
@@ -0,0 +1,107 @@
+"""
+Perintah administrasi CyberClaim.
+
+    python manage.py create-schema
+    python manage.py build-icd-index
+    python manage.py build-icd-index --icd10 data/Code_ICD_10.csv --icd9 data/Code_ICD_9.csv
+    python manage.py score-tariffs --start 2024-01-01 --end 2024-02-01
+    python manage.py rebuild-facility-stats
+"""
+import argparse
+import time
+from datetime import datetime
+
+
+def create_schema(args):
+    """Buat tabel database aplikasi dan tabel hasil validasi (idempotent)"""
+    from database import create_tables
+    from services.validation import init_database
+
+    start = time.perf_counter()
+    create_tables()
+    init_database()
+    print(f"✅ Skema database siap dalam {(time.perf_counter() - start) * 1000:.0f} ms")
+
+
+def build_icd_index(args):
+    """Kompilasi ulang CSV ICD menjadi artefak biner yang di-mmap oleh API & worker"""
+    from services.icd_index import build_icd_artifact, CompiledICDIndex
+
+    start = time.perf_counter()
+    result = build_icd_artifact(args.output, args.icd10, args.icd9)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    index = CompiledICDIndex(args.output)
+    load_ms = (time.perf_counter() - start) * 1000
+    index.close()
+
+    print(f"✅ {result['path']}: {result['bytes'] / 1024:.0f} KB, "
+          f"build {build_ms:.0f} ms, cold load {load_ms:.2f} ms")
+
+
+def score_tariffs(args):
+    """
+    Hitung skor anomali tarif seluruh klaim di jendela waktu dan tulis ke
+    claim_tariff_scores. Hanya klaim yang punya claimed_amount (diisi saat upload)
+    """
+    from database import SessionLocal
+    from services.tariff_scoring import run_tariff_scoring
+
+    db = SessionLocal()
+    try:
+        summary = run_tariff_scoring(db, args.start, args.end)
+    finally:
+        db.close()
+
+    if not summary["claims_scored"]:
+        print("[WARNING] Tidak ada klaim dengan claimed_amount di jendela ini; nominal klaim diisi lewat form upload")
+    total_ms = summary["load_ms"] + summary["score_ms"] + summary["write_ms"]
+    print(f"✅ {summary['claims_scored']} klaim ({summary['diagnoses']} diagnosa, "
+          f"{summary['facilities']} faskes), {summary['anomalies']} anomali dalam {total_ms:.0f} ms "
+          f"(load {summary['load_ms']:.0f} / score {summary['score_ms']:.0f} / write {summary['write_ms']:.0f} ms)")
+
+
+def rebuild_facility_stats(args):
+    """Hitung ulang counter dashboard per faskes dari claim_submission"""
+    from database import SessionLocal
+    from repositories.facility_stats import rebuild_facility_stats as rebuild
+
+    start = time.perf_counter()
+    db = SessionLocal()
+    try:
+        rows = rebuild(db)
+    finally:
+        db.close()
+    print(f"✅ {rows} baris facility_claim_stats dibangun ulang dalam {(time.perf_counter() - start) * 1000:.0f} ms")
+
+
+def main():
+    from services.icd_index import ICD_INDEX_PATH, ICD10_CSV_PATH, ICD9_CSV_PATH
+
+    parser = argparse.ArgumentParser(description="CyberClaim management commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    schema = subparsers.add_parser("create-schema", help="Buat tabel database (jalankan sebelum API/worker)")
+    schema.set_defaults(handler=create_schema)
+
+    icd = subparsers.add_parser("build-icd-index", help="Bangun ulang artefak ICD dari CSV")
+    icd.add_argument("--icd10", default=ICD10_CSV_PATH, help="CSV ICD-10 (delimiter ';')")
+    icd.add_argument("--icd9", default=ICD9_CSV_PATH, help="CSV ICD-9")
+    icd.add_argument("--output", default=ICD_INDEX_PATH, help="Path artefak biner")
+    icd.set_defaults(handler=build_icd_index)
+
+    scoring = subparsers.add_parser("score-tariffs", help="Skor anomali tarif klaim terhadap populasinya")
+    scoring.add_argument("--start", type=datetime.fromisoformat, help="Awal jendela upload_at (ISO, inklusif)")
+    scoring.add_argument("--end", type=datetime.fromisoformat, help="Akhir jendela upload_at (ISO, eksklusif)")
+    scoring.set_defaults(handler=score_tariffs)
+
+    stats = subparsers.add_parser("rebuild-facility-stats", help="Hitung ulang statistik klaim per faskes (backfill)")
+    stats.set_defaults(handler=rebuild_facility_stats)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,9 +5,16 @@ from .doctor import Doctor
 from .medical import SEP, RekamMedis, Diagnosis, Tindakan, TarifINACBGS
 from .claim import ClaimSubmission, ClaimFiles
 from .fraud import FraudDetection
+from .job import Job, JobStatus
+from .claim_batch import ClaimBatch, ClaimBatchItem
+from .cache_version import CacheVersion
+from .claim_score import ClaimTariffScore
+from .facility_stats import FacilityClaimStat
 
 __all__ = [
     'User', 'Role', 'Facility', 'JenisSarana', 'Patient', 'Doctor',
     'SEP', 'RekamMedis', 'Diagnosis', 'Tindakan', 'TarifINACBGS',
-    'ClaimSubmission', 'ClaimFiles', 'FraudDetection'
+    'ClaimSubmission', 'ClaimFiles', 'FraudDetection', 'Job', 'JobStatus',
+    'ClaimBatch', 'ClaimBatchItem', 'CacheVersion', 'ClaimTariffScore',
+    'FacilityClaimStat'
 ]
\ No newline at end of file
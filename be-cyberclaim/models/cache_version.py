@@ -0,0 +1,15 @@
+from sqlalchemy import Column, String, Integer, DateTime
+from datetime import datetime
+from database import Base
+
+class CacheVersion(Base):
+    """
+    Nomor versi data referensi yang di-cache di memori setiap proses (mis.
+    tarif INA-CBG). Setiap penulisan menaikkan versi dalam transaksi yang sama;
+    proses lain cukup membaca satu baris ini untuk tahu cache-nya basi.
+    """
+    __tablename__ = "cache_versions"
+
+    name = Column(String(50), primary_key=True)
+    version = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
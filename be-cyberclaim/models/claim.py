@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey, Text, Enum as SQLEnum
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey, Text, Float, Index, Enum as SQLEnum
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import uuid
@@ -35,6 +35,7 @@ class ClaimSubmission(Base):
     validated_by = Column(UUID(as_uuid=True), ForeignKey("users.id"))
     validated_at = Column(DateTime)
     validation_data = Column(JSON)  # Store SEP validation results
+    claimed_amount = Column(Float)  # Nominal yang diklaim faskes (Rupiah)
     
     # Relationships
     facility = relationship("Facility", back_populates="claim_submissions")
@@ -46,12 +47,22 @@ class ClaimSubmission(Base):
     claim_files = relationship("ClaimFiles", back_populates="claim")
     fraud_detections = relationship("FraudDetection", back_populates="claim")
     
+    # Index mengikuti query di repositories/claim.py, facility_stats.py & routes/dashboard.py
+    # (listing keyset upload_at DESC, id DESC). Dibuat juga oleh migrasi Alembic.
+    __table_args__ = (
+        Index("ix_claim_submission_upload_at_id", "upload_at", "id"),
+        Index("ix_claim_submission_facility_upload_at_id", "facility_id", "upload_at", "id"),
+        Index("ix_claim_submission_status_upload_at_id", "status", "upload_at", "id"),
+        Index("ix_claim_submission_patient_upload_at", "patient_id", "upload_at"),
+        Index("ix_claim_submission_facility_patient", "facility_id", "patient_id"),
+    )
+    
 
 class ClaimFiles(Base):
     __tablename__ = "claim_files"
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    claim_id = Column(UUID(as_uuid=True), ForeignKey("claim_submission.id"), nullable=False)
+    claim_id = Column(UUID(as_uuid=True), ForeignKey("claim_submission.id"), nullable=False, index=True)
     file_type = Column(String(50), nullable=False)  # sep, rm, rujukan, ktp, kartu
     file_path = Column(String(500), nullable=False)
     checksum = Column(String(64), nullable=False)  # SHA256 checksum
@@ -0,0 +1,40 @@
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, JSON, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+import uuid
+from datetime import datetime
+from database import Base
+
+class ClaimBatch(Base):
+    """
+    Satu upload bulk: arsip berisi banyak klaim (satu folder atau satu PDF
+    di root arsip = satu klaim). Setiap klaim menjadi ClaimSubmission sendiri
+    yang divalidasi worker; progress dihitung dari status klaim & job-nya.
+    """
+    __tablename__ = "claim_batches"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    facility_id = Column(UUID(as_uuid=True), ForeignKey("facilities.id"), nullable=False)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    archive_path = Column(String(500), nullable=False)
+    archive_checksum = Column(String(64), nullable=False)
+    total_claims = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    items = relationship("ClaimBatchItem", back_populates="batch")
+
+class ClaimBatchItem(Base):
+    __tablename__ = "claim_batch_items"
+    __table_args__ = (
+        Index("ix_claim_batch_items_batch_position", "batch_id", "position"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    batch_id = Column(UUID(as_uuid=True), ForeignKey("claim_batches.id"), nullable=False, index=True)
+    claim_id = Column(UUID(as_uuid=True), ForeignKey("claim_submission.id"), nullable=False, index=True)
+    job_id = Column(UUID(as_uuid=True), ForeignKey("jobs.id"))
+    position = Column(Integer, nullable=False)     # urutan klaim di dalam arsip
+    name = Column(String(500), nullable=False)     # nama folder / PDF di dalam arsip
+    members = Column(JSON)                         # PDF milik klaim ini di dalam arsip
+
+    batch = relationship("ClaimBatch", back_populates="items")
@@ -0,0 +1,37 @@
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, Float, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
+from database import Base
+
+class ClaimTariffScore(Base):
+    """
+    Skor anomali tarif satu klaim terhadap populasi klaim (per diagnosa dan
+    per faskes), hasil services/tariff_scoring.py. Ditulis ulang setiap run.
+    """
+    __tablename__ = "claim_tariff_scores"
+
+    claim_id = Column(UUID(as_uuid=True), ForeignKey("claim_submission.id"), primary_key=True)
+    facility_id = Column(UUID(as_uuid=True), ForeignKey("facilities.id"), index=True)
+    diagnosa_code = Column(String(20), index=True)
+    claimed_amount = Column(Float, nullable=False)
+    standard_tariff = Column(Float)             # tarif INA-CBG aktif diagnosa
+    tariff_ratio = Column(Float)                # claimed / standard
+
+    # Statistik per diagnosa
+    diagnosis_claims = Column(Integer)
+    diagnosis_median = Column(Float)
+    diagnosis_mad = Column(Float)
+    diagnosis_robust_z = Column(Float)
+    diagnosis_z = Column(Float)
+    diagnosis_percentile = Column(Float)
+
+    # Statistik per faskes (nominal relatif terhadap median diagnosanya)
+    facility_claims = Column(Integer)
+    facility_median_ratio = Column(Float)
+    facility_robust_z = Column(Float)
+    facility_percentile = Column(Float)
+
+    anomaly_score = Column(Float, index=True)
+    is_anomaly = Column(Boolean, default=False, index=True)
+    run_id = Column(String(36), nullable=False)
+    scored_at = Column(DateTime, default=datetime.utcnow)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, Date, Text, ForeignKey
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, Date, Text, ForeignKey, Index, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import uuid
@@ -25,3 +25,8 @@ class Doctor(Base):
     facility = relationship("Facility", back_populates="doctors")
     sep_records = relationship("SEP", back_populates="doctor")
     medical_records = relationship("RekamMedis", back_populates="doctor")
+    
+    # get_doctors_by_names mencari lower(name) IN (...)
+    __table_args__ = (
+        Index("ix_doctors_name_lower", func.lower(name)),
+    )
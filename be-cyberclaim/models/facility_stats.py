@@ -0,0 +1,24 @@
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
+from database import Base
+
+class FacilityClaimStat(Base):
+    """
+    Counter klaim per faskes yang dijaga inkremental oleh repository klaim
+    (repositories/facility_stats.py), sehingga dashboard cukup membaca baris
+    faskesnya tanpa COUNT/GROUP BY atas claim_submission.
+
+    metric  | bucket              | value
+    --------+---------------------+-------------------------------
+    status  | nilai ClaimStatus   | jumlah klaim dengan status itu
+    daily   | tanggal upload (ISO)| jumlah klaim di-upload hari itu
+    patients| "all"               | jumlah pasien berbeda
+    """
+    __tablename__ = "facility_claim_stats"
+
+    facility_id = Column(UUID(as_uuid=True), ForeignKey("facilities.id"), primary_key=True)
+    metric = Column(String(20), primary_key=True)
+    bucket = Column(String(40), primary_key=True)
+    value = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
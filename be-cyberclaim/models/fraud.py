@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, Text, Float, JSON
+from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, Text, Float, JSON, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import uuid
@@ -24,4 +24,13 @@ class FraudDetection(Base):
     
     # Relationships
     claim = relationship("ClaimSubmission", back_populates="fraud_detections")
-    resolver = relationship("User", foreign_keys=[resolved_by])
\ No newline at end of file
+    resolver = relationship("User", foreign_keys=[resolved_by])
+    
+    # Index mengikuti query di repositories/fraud.py (listing keyset created_at DESC, id DESC)
+    __table_args__ = (
+        Index("ix_fraud_detections_claim_id", "claim_id"),
+        Index("ix_fraud_detections_created_at_id", "created_at", "id"),
+        Index("ix_fraud_detections_resolved_created_at_id", "is_resolved", "created_at", "id"),
+        Index("ix_fraud_detections_risk_created_at_id", "risk_level", "created_at", "id"),
+        Index("ix_fraud_detections_confidence", "confidence"),
+    )
\ No newline at end of file
@@ -17,6 +17,11 @@ from .fraud import (
     get_fraud_detection, get_fraud_detections, create_fraud_detection,
     update_fraud_detection, get_fraud_detections_by_claim
 )
+from .job import (
+    enqueue_job, get_job, get_jobs_by_claim, has_active_job,
+    claim_next_job, extend_job_lease, complete_job, fail_job
+)
+from .facility_stats import get_facility_stats, rebuild_facility_stats
 from .tariff import (
     get_tariff_by_id,
     get_tariff_by_diagnosis,
@@ -43,6 +48,9 @@ __all__ = [
     'get_claims_by_facility', 'get_claims_by_status',
     'get_fraud_detection', 'get_fraud_detections', 'create_fraud_detection',
     'update_fraud_detection', 'get_fraud_detections_by_claim',
+    'enqueue_job', 'get_job', 'get_jobs_by_claim', 'has_active_job',
+    'claim_next_job', 'extend_job_lease', 'complete_job', 'fail_job',
+    'get_facility_stats', 'rebuild_facility_stats',
     # Tambahkan fungsi dari tariff
     'get_tariff_by_id',
     'get_tariff_by_diagnosis',
@@ -1,10 +1,17 @@
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, joinedload, selectinload, load_only
+from sqlalchemy import func, update
 from datetime import datetime
 import uuid
 import json
 from typing import List, Optional, Dict, Any
 from models.claim import ClaimSubmission, ClaimFiles, ClaimStatus
+from models.facility import Facility
+from models.user import User
+from models.patient import Patient
+from models.medical import SEP
 from schemas.claim import ClaimSubmissionCreate, ClaimSubmissionUpdate, ClaimSubmissionResponse
+from repositories.facility_stats import record_claims_created, record_status_changes, get_facility_stats, raw_status_column
+from utils.pagination import Keyset, apply_keyset
 
 # ============================================================
 # FUNGSI SERIALIZATION UNTUK HANDLE DATETIME
@@ -102,49 +109,51 @@ def get_claim_by_id(db: Session, claim_id: uuid.UUID) -> Optional[ClaimSubmissio
     """
     return get_claim(db, claim_id)
 
-def get_claims(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(ClaimSubmission)\
-        .options(
-            joinedload(ClaimSubmission.facility),
-            joinedload(ClaimSubmission.user),
-            joinedload(ClaimSubmission.patient),
-            joinedload(ClaimSubmission.sep),
-            joinedload(ClaimSubmission.validator),
-            joinedload(ClaimSubmission.claim_files)
-        )\
-        .offset(skip)\
-        .limit(limit)\
-        .all()
+# Kolom yang ditampilkan di tabel listing klaim (tanpa validation_data / path arsip)
+CLAIM_LIST_COLUMNS = (
+    ClaimSubmission.id, ClaimSubmission.facility_id, ClaimSubmission.user_id,
+    ClaimSubmission.patient_id, ClaimSubmission.sep_id, ClaimSubmission.rm_id,
+    ClaimSubmission.upload_at, ClaimSubmission.status, ClaimSubmission.notes,
+    ClaimSubmission.validated_by, ClaimSubmission.validated_at
+)
 
-def get_claims_by_facility(db: Session, facility_id: uuid.UUID, skip: int = 0, limit: int = 100):
+def _claim_list_query(db: Session):
+    """
+    Query listing klaim: hanya kolom tabel, relasi many-to-one di-join dengan
+    kolom nama saja, claim_files dimuat terpisah (selectinload) agar JOIN
+    tidak menggandakan baris klaim.
+    """
     return db.query(ClaimSubmission)\
         .options(
-            joinedload(ClaimSubmission.facility),
-            joinedload(ClaimSubmission.user),
-            joinedload(ClaimSubmission.patient),
-            joinedload(ClaimSubmission.sep),
-            joinedload(ClaimSubmission.validator),
-            joinedload(ClaimSubmission.claim_files)
-        )\
-        .filter(ClaimSubmission.facility_id == facility_id)\
-        .offset(skip)\
-        .limit(limit)\
-        .all()
+            load_only(*CLAIM_LIST_COLUMNS),
+            joinedload(ClaimSubmission.facility).load_only(Facility.name),
+            joinedload(ClaimSubmission.user).load_only(User.full_name),
+            joinedload(ClaimSubmission.patient).load_only(Patient.name),
+            joinedload(ClaimSubmission.sep).load_only(SEP.sep_number),
+            joinedload(ClaimSubmission.validator).load_only(User.full_name),
+            selectinload(ClaimSubmission.claim_files)
+        )
 
-def get_claims_by_status(db: Session, status: ClaimStatus, skip: int = 0, limit: int = 100):
-    return db.query(ClaimSubmission)\
-        .options(
-            joinedload(ClaimSubmission.facility),
-            joinedload(ClaimSubmission.user),
-            joinedload(ClaimSubmission.patient),
-            joinedload(ClaimSubmission.sep),
-            joinedload(ClaimSubmission.validator),
-            joinedload(ClaimSubmission.claim_files)
-        )\
-        .filter(ClaimSubmission.status == status)\
-        .offset(skip)\
-        .limit(limit)\
-        .all()
+def _paginate_claims(query, skip: int, limit: int, after: Optional[Keyset]):
+    """
+    Keyset (upload_at DESC, id DESC). `skip` hanya untuk klien lama yang
+    belum memakai cursor; halaman dalam sebaiknya memakai `after`.
+    """
+    query = apply_keyset(query, ClaimSubmission.upload_at, ClaimSubmission.id, after, limit)
+    if skip and not after:
+        query = query.offset(skip)
+    return query.all()
+
+def get_claims(db: Session, skip: int = 0, limit: int = 100, after: Optional[Keyset] = None):
+    return _paginate_claims(_claim_list_query(db), skip, limit, after)
+
+def get_claims_by_facility(db: Session, facility_id: uuid.UUID, skip: int = 0, limit: int = 100, after: Optional[Keyset] = None):
+    query = _claim_list_query(db).filter(ClaimSubmission.facility_id == facility_id)
+    return _paginate_claims(query, skip, limit, after)
+
+def get_claims_by_status(db: Session, status: ClaimStatus, skip: int = 0, limit: int = 100, after: Optional[Keyset] = None):
+    query = _claim_list_query(db).filter(ClaimSubmission.status == status)
+    return _paginate_claims(query, skip, limit, after)
 
 def create_claim_submission(db: Session, claim_data: ClaimSubmissionCreate, facility_id: uuid.UUID, user_id: uuid.UUID):
     """
@@ -161,33 +170,48 @@ def create_claim_submission(db: Session, claim_data: ClaimSubmissionCreate, faci
         upload_at=datetime.utcnow()  # Set upload timestamp
     )
     
-    db.add(db_claim)
-    db.commit()
+    try:
+        # Counter dashboard faskes ikut transaksi yang sama
+        record_claims_created(db, [{
+            "facility_id": facility_id,
+            "patient_id": db_claim.patient_id,
+            "status": db_claim.status,
+            "upload_at": db_claim.upload_at
+        }])
+        db.add(db_claim)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
     db.refresh(db_claim)
     return db_claim
 
 def update_claim_status(db: Session, claim_id: uuid.UUID, status: ClaimStatus, validation_data: dict = None, validated_by: uuid.UUID = None):
     """
-    Update claim status dengan handling enum value yang benar
+    Update claim status dengan handling enum value yang benar.
+    Baris klaim dikunci (SELECT ... FOR UPDATE) sampai commit agar status lama
+    yang dipakai counter facility_stats tidak berubah oleh transaksi lain.
     """
-    db_claim = db.query(ClaimSubmission).filter(ClaimSubmission.id == claim_id).first()
+    db_claim = db.query(ClaimSubmission)\
+        .filter(ClaimSubmission.id == claim_id)\
+        .populate_existing()\
+        .with_for_update()\
+        .first()
     if not db_claim:
         print(f"❌ Claim {claim_id} tidak ditemukan")
         return None
     
-    # DEBUG: Print enum values untuk troubleshooting
-    print(f"🔄 Updating status: {status} (type: {type(status)}, value: {status.value if hasattr(status, 'value') else status})")
+    # Kolom SQLEnum(ClaimStatus) menyimpan nama member, sedangkan caller bisa
+    # mengirim member enum maupun string value ('rejected'); normalisasi sekali
+    # ke member enum dan pakai untuk kolom, timestamp, dan counter facility_stats
+    status = ClaimStatus(status)
+    print(f"🔄 Updating status: {status.name} (value: {status.value})")
+    previous_status = db_claim.status
     
-    # Pastikan kita menggunakan value string dari enum, bukan enum object
-    if hasattr(status, 'value'):
-        # Jika status adalah enum object, gunakan value-nya
-        db_claim.status = status.value
-    else:
-        # Jika sudah string, gunakan langsung
-        db_claim.status = status
+    db_claim.status = status
     
     # Update timestamp untuk status tertentu
-    status_str = status.value if hasattr(status, 'value') else status
+    status_str = status.value
     if status_str in ['validated', 'rejected', 'approved', 'menunggu_verifikasi']:
         db_claim.validated_at = datetime.utcnow()
         if validated_by:
@@ -202,6 +226,7 @@ def update_claim_status(db: Session, claim_id: uuid.UUID, status: ClaimStatus, v
     db_claim.updated_at = datetime.utcnow()
     
     try:
+        record_status_changes(db, [(db_claim.facility_id, previous_status, status)])
         db.commit()
         db.refresh(db_claim)
         print(f"✅ Status klaim {claim_id} diupdate ke {status_str}")
@@ -230,6 +255,36 @@ def update_claim_status(db: Session, claim_id: uuid.UUID, status: ClaimStatus, v
                 return None
         return None
 
+def update_claims_bulk(db: Session, updates: List[Dict[str, Any]], commit: bool = True) -> int:
+    """
+    Update banyak klaim sekaligus (UPDATE executemany berdasarkan primary key).
+    Setiap dict berisi "id" dan kolom yang diubah, mis. status & validation_data.
+    Baris klaim dikunci (urut id) saat status lama dibaca untuk counter.
+    commit=False membiarkan UPDATE di transaksi caller.
+    """
+    if not updates:
+        return 0
+    try:
+        status_updates = {item["id"]: item["status"] for item in updates if "status" in item}
+        if status_updates:
+            current = db.query(ClaimSubmission.id, ClaimSubmission.facility_id, raw_status_column())\
+                .filter(ClaimSubmission.id.in_(list(status_updates)))\
+                .order_by(ClaimSubmission.id)\
+                .with_for_update()\
+                .all()
+            record_status_changes(db, [
+                (facility_id, old_status, status_updates[claim_id])
+                for claim_id, facility_id, old_status in current
+            ])
+        db.execute(update(ClaimSubmission), updates)
+        if commit:
+            db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error bulk update klaim: {e}")
+        raise
+    return len(updates)
+
 def add_claim_file(db: Session, claim_id: uuid.UUID, file_type: str, file_path: str, checksum: str):
     db_file = ClaimFiles(
         claim_id=claim_id,
@@ -243,23 +298,18 @@ def add_claim_file(db: Session, claim_id: uuid.UUID, file_type: str, file_path:
     return db_file
 
 # Fungsi tambahan untuk fraud detection
-def get_pending_verification_claims(db: Session, facility_id: uuid.UUID = None, skip: int = 0, limit: int = 100) -> List[ClaimSubmission]:
+def get_pending_verification_claims(db: Session, facility_id: uuid.UUID = None, skip: int = 0, limit: int = 100,
+                                    after: Optional[Keyset] = None) -> List[ClaimSubmission]:
     """
     Get claims pending verification (status: MENUNGGU_VERIFIKASI)
     """
-    query = db.query(ClaimSubmission)\
-        .options(
-            joinedload(ClaimSubmission.facility),
-            joinedload(ClaimSubmission.user),
-            joinedload(ClaimSubmission.patient),
-            joinedload(ClaimSubmission.sep)
-        )\
+    query = _claim_list_query(db)\
         .filter(ClaimSubmission.status == ClaimStatus.MENUNGGU_VERIFIKASI)
     
     if facility_id:
         query = query.filter(ClaimSubmission.facility_id == facility_id)
     
-    return query.offset(skip).limit(limit).all()
+    return _paginate_claims(query, skip, limit, after)
 
 def get_patient_claim_history(db: Session, patient_id: uuid.UUID, limit: int = 10) -> List[ClaimSubmission]:
     """
@@ -275,6 +325,50 @@ def get_patient_claim_history(db: Session, patient_id: uuid.UUID, limit: int = 1
         .limit(limit)\
         .all()
 
+def get_claims_by_ids(db: Session, claim_ids: List[uuid.UUID]) -> List[ClaimSubmission]:
+    """Ambil banyak klaim sekaligus (satu query IN) tanpa memuat relasi"""
+    if not claim_ids:
+        return []
+    return db.query(ClaimSubmission)\
+        .filter(ClaimSubmission.id.in_(set(claim_ids)))\
+        .all()
+
+def get_patient_claim_histories(db: Session, patient_ids: List[uuid.UUID], limit: int = 10) -> Dict[uuid.UUID, List[ClaimSubmission]]:
+    """
+    Riwayat klaim banyak pasien sekaligus: `limit` klaim terbaru per pasien
+    dalam satu query (ROW_NUMBER per patient_id), dikunci dengan patient_id
+    """
+    histories: Dict[uuid.UUID, List[ClaimSubmission]] = {}
+    if not patient_ids:
+        return histories
+
+    ranked = db.query(
+            ClaimSubmission.id.label("claim_id"),
+            func.row_number().over(
+                partition_by=ClaimSubmission.patient_id,
+                order_by=(ClaimSubmission.upload_at.desc(), ClaimSubmission.id.desc())
+            ).label("rank")
+        )\
+        .filter(ClaimSubmission.patient_id.in_(set(patient_ids)))\
+        .subquery()
+
+    claims = db.query(ClaimSubmission)\
+        .join(ranked, ranked.c.claim_id == ClaimSubmission.id)\
+        .filter(ranked.c.rank <= limit)\
+        .order_by(ClaimSubmission.patient_id, ranked.c.rank)\
+        .all()
+    for claim in claims:
+        histories.setdefault(claim.patient_id, []).append(claim)
+    return histories
+
+def get_pending_verification_claim_ids(db: Session, facility_id: uuid.UUID = None) -> List[uuid.UUID]:
+    """Id semua klaim MENUNGGU_VERIFIKASI (tanpa memuat baris klaim)"""
+    query = db.query(ClaimSubmission.id)\
+        .filter(ClaimSubmission.status == ClaimStatus.MENUNGGU_VERIFIKASI)
+    if facility_id:
+        query = query.filter(ClaimSubmission.facility_id == facility_id)
+    return [claim_id for (claim_id,) in query.order_by(ClaimSubmission.upload_at.asc()).all()]
+
 def update_claim_with_fraud_data(db: Session, claim_id: uuid.UUID, fraud_data: Dict[str, Any]) -> Optional[ClaimSubmission]:
     """
     Update claim with fraud detection results
@@ -330,37 +424,13 @@ def get_claims_by_date_range(db: Session, start_date: datetime, end_date: dateti
 
 def get_claim_statistics(db: Session, facility_id: uuid.UUID = None) -> Dict[str, Any]:
     """
-    Get claim statistics for dashboard
+    Get claim statistics for dashboard (dari counter facility_claim_stats)
     """
-    from sqlalchemy import func
-    
-    query = db.query(ClaimSubmission)
-    
-    if facility_id:
-        query = query.filter(ClaimSubmission.facility_id == facility_id)
-    
-    total_claims = query.count()
-    
-    # Count by status
-    status_counts = {}
-    for status in ClaimStatus:
-        count = query.filter(ClaimSubmission.status == status).count()
-        status_counts[status.value] = count
-    
-    # Today's claims
-    today = datetime.utcnow().date()
-    today_start = datetime(today.year, today.month, today.day)
-    today_end = datetime(today.year, today.month, today.day, 23, 59, 59)
-    
-    today_claims = query.filter(
-        ClaimSubmission.created_at >= today_start,
-        ClaimSubmission.created_at <= today_end
-    ).count()
-    
+    stats = get_facility_stats(db, facility_id)
     return {
-        "total_claims": total_claims,
-        "status_counts": status_counts,
-        "today_claims": today_claims,
+        "total_claims": stats["total_claims"],
+        "status_counts": stats["claims_by_status"],
+        "today_claims": stats["today_claims"],
         "facility_id": facility_id
     }
 
@@ -0,0 +1,230 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import insert, func
+from datetime import datetime
+import uuid
+import os
+from typing import List, Optional, Dict, Any, Iterable, Tuple
+
+from models.claim import ClaimSubmission, ClaimFiles, ClaimStatus
+from models.claim_batch import ClaimBatch, ClaimBatchItem
+from models.job import Job, JobStatus
+from repositories.job import JOB_MAX_ATTEMPTS
+from repositories.facility_stats import record_claims_created
+
+# ============================================================
+# KONFIGURASI BULK INSERT
+# ============================================================
+# Jumlah klaim per statement INSERT multi-row; satu batch tetap satu transaksi
+BULK_INSERT_CHUNK = int(os.getenv("BULK_INSERT_CHUNK", "500"))
+
+# (nama klaim di arsip, daftar member PDF-nya)
+BatchClaim = Tuple[str, List[str]]
+
+# ============================================================
+# FUNGSI CLAIM BATCH REPOSITORY
+# ============================================================
+
+def create_claim_batch(
+    db: Session,
+    facility_id: uuid.UUID,
+    user_id: uuid.UUID,
+    archive_path: str,
+    archive_checksum: str,
+    claims: Iterable[BatchClaim],
+    claim_defaults: Dict[str, Any],
+    job_type: str,
+    extract_root: str,
+    chunk_size: int = BULK_INSERT_CHUNK
+) -> ClaimBatch:
+    """
+    Buat batch beserta semua klaimnya dalam satu transaksi.
+
+    Per chunk `chunk_size` klaim dijalankan satu INSERT multi-row untuk
+    masing-masing claim_submission, claim_files, jobs dan claim_batch_items,
+    dengan UUID dibuat di aplikasi sehingga tidak perlu flush/refresh per baris.
+    Setiap klaim langsung punya job validasi (`job_type`) yang membaca hanya
+    member PDF miliknya dari arsip. `claim_defaults` berisi kolom wajib klaim
+    yang belum diketahui sebelum validasi (patient_id, sep_id, rm_id).
+    """
+    now = datetime.utcnow()
+    batch = ClaimBatch(
+        id=uuid.uuid4(),
+        facility_id=facility_id,
+        user_id=user_id,
+        archive_path=archive_path,
+        archive_checksum=archive_checksum,
+        total_claims=0,
+        created_at=now
+    )
+    db.add(batch)
+
+    total = 0
+    try:
+        db.flush()
+        chunk: List[BatchClaim] = []
+        for claim in claims:
+            chunk.append(claim)
+            if len(chunk) >= chunk_size:
+                _insert_chunk(db, batch, chunk, total, claim_defaults, job_type, extract_root, now)
+                total += len(chunk)
+                chunk = []
+        if chunk:
+            _insert_chunk(db, batch, chunk, total, claim_defaults, job_type, extract_root, now)
+            total += len(chunk)
+
+        batch.total_claims = total
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    db.refresh(batch)
+    return batch
+
+def _insert_chunk(db: Session, batch: ClaimBatch, chunk: List[BatchClaim], offset: int,
+                  claim_defaults: Dict[str, Any], job_type: str, extract_root: str, now: datetime):
+    claims, files, jobs, items = [], [], [], []
+    for position, (name, members) in enumerate(chunk, start=offset):
+        claim_id = uuid.uuid4()
+        job_id = uuid.uuid4()
+        claims.append({
+            **claim_defaults,
+            "id": claim_id,
+            "facility_id": batch.facility_id,
+            "user_id": batch.user_id,
+            "rar_file_path": batch.archive_path,
+            "upload_at": now,
+            "status": ClaimStatus.UPLOADED,
+        })
+        files.append({
+            "id": uuid.uuid4(),
+            "claim_id": claim_id,
+            "file_type": "archive",
+            "file_path": batch.archive_path,
+            "checksum": batch.archive_checksum,
+            "created_at": now,
+            "updated_at": now,
+        })
+        jobs.append({
+            "id": job_id,
+            "job_type": job_type,
+            "claim_id": claim_id,
+            "payload": {
+                "batch_id": str(batch.id),
+                "archive_path": batch.archive_path,
+                "members": members,
+                "extract_dir": os.path.join(extract_root, str(batch.id), str(position)),
+                # Hasil ekstraksi RAR seluruh batch, dibuat sekali dan dipakai semua job
+                "archive_extract_dir": batch_extract_dir(extract_root, batch.id),
+            },
+            "status": JobStatus.QUEUED,
+            "attempts": 0,
+            "max_attempts": JOB_MAX_ATTEMPTS,
+            "run_after": now,
+            "created_at": now,
+            "updated_at": now,
+        })
+        items.append({
+            "id": uuid.uuid4(),
+            "batch_id": batch.id,
+            "claim_id": claim_id,
+            "job_id": job_id,
+            "position": position,
+            "name": name,
+            "members": members,
+        })
+
+    record_claims_created(db, claims)
+    db.execute(insert(ClaimSubmission), claims)
+    db.execute(insert(ClaimFiles), files)
+    db.execute(insert(Job), jobs)
+    db.execute(insert(ClaimBatchItem), items)
+
+def batch_extract_dir(extract_root: str, batch_id) -> str:
+    """Direktori ekstraksi bersama arsip batch (RAR)"""
+    return os.path.join(extract_root, str(batch_id), "archive")
+
+def count_unfinished_batch_jobs(db: Session, batch_id: uuid.UUID, exclude_job_id: Optional[uuid.UUID] = None) -> int:
+    """Jumlah job validasi batch yang masih QUEUED/RUNNING (selain `exclude_job_id`)"""
+    query = db.query(func.count(ClaimBatchItem.id))\
+        .join(Job, Job.id == ClaimBatchItem.job_id)\
+        .filter(ClaimBatchItem.batch_id == batch_id)\
+        .filter(Job.status.in_([JobStatus.QUEUED, JobStatus.RUNNING]))
+    if exclude_job_id is not None:
+        query = query.filter(Job.id != exclude_job_id)
+    return query.scalar() or 0
+
+def get_claim_batch(db: Session, batch_id: uuid.UUID) -> Optional[ClaimBatch]:
+    return db.query(ClaimBatch).filter(ClaimBatch.id == batch_id).first()
+
+def get_claim_batch_progress(db: Session, batch_id: uuid.UUID) -> Dict[str, Any]:
+    """
+    Ringkasan progress batch: jumlah klaim per status dan jumlah job
+    validasi per status, masing-masing satu GROUP BY.
+    """
+    claim_counts = db.query(ClaimSubmission.status, func.count(ClaimBatchItem.id))\
+        .join(ClaimSubmission, ClaimSubmission.id == ClaimBatchItem.claim_id)\
+        .filter(ClaimBatchItem.batch_id == batch_id)\
+        .group_by(ClaimSubmission.status)\
+        .all()
+
+    job_counts = db.query(Job.status, func.count(ClaimBatchItem.id))\
+        .join(Job, Job.id == ClaimBatchItem.job_id)\
+        .filter(ClaimBatchItem.batch_id == batch_id)\
+        .group_by(Job.status)\
+        .all()
+
+    jobs = {_status_value(status): count for status, count in job_counts}
+    finished = jobs.get(JobStatus.SUCCEEDED.value, 0) + jobs.get(JobStatus.FAILED.value, 0)
+    total = sum(jobs.values())
+    return {
+        "claims_by_status": {_status_value(status): count for status, count in claim_counts},
+        "jobs_by_status": jobs,
+        "processed": finished,
+        "total": total,
+        "percent": round(finished * 100 / total, 1) if total else 100.0,
+        "completed": total > 0 and finished == total
+    }
+
+def get_claim_batch_items(db: Session, batch_id: uuid.UUID, skip: int = 0, limit: int = 100,
+                          after_position: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Progress per klaim (urut posisi di arsip) tanpa memuat relasi klaim.
+    `after_position` = keyset lewat index (batch_id, position); `skip` hanya
+    dipakai jika tidak ada after_position.
+    """
+    query = db.query(
+            ClaimBatchItem.position,
+            ClaimBatchItem.name,
+            ClaimBatchItem.claim_id,
+            ClaimSubmission.status,
+            Job.status,
+            Job.attempts,
+            Job.last_error
+        )\
+        .join(ClaimSubmission, ClaimSubmission.id == ClaimBatchItem.claim_id)\
+        .outerjoin(Job, Job.id == ClaimBatchItem.job_id)\
+        .filter(ClaimBatchItem.batch_id == batch_id)
+    if after_position is not None:
+        query = query.filter(ClaimBatchItem.position > after_position)
+    elif skip:
+        query = query.offset(skip)
+    rows = query.order_by(ClaimBatchItem.position.asc())\
+        .limit(limit)\
+        .all()
+
+    return [
+        {
+            "position": position,
+            "name": name,
+            "claim_id": str(claim_id),
+            "status": _status_value(claim_status),
+            "job_status": _status_value(job_status),
+            "attempts": attempts,
+            "last_error": last_error
+        }
+        for position, name, claim_id, claim_status, job_status, attempts, last_error in rows
+    ]
+
+def _status_value(status):
+    return status.value if hasattr(status, 'value') else status
@@ -1,27 +1,40 @@
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import or_
+from sqlalchemy import func
 import uuid
+from typing import Dict, List
 from models.doctor import Doctor
 from schemas.doctor import DoctorCreate, DoctorUpdate
+from repositories.search import apply_search, TRIGRAM, SUBSTRING
+
+# Kolom yang dicari parameter `search` (index GIN pg_trgm di PostgreSQL)
+DOCTOR_SEARCH_FIELDS = [
+    (Doctor.name, TRIGRAM),
+    (Doctor.specialization, TRIGRAM),
+    (Doctor.bpjs_id, SUBSTRING),
+]
 
 def get_doctor(db: Session, doctor_id: uuid.UUID):
     # ✅ PASTIKAN menggunakan joinedload dengan benar
     return db.query(Doctor).options(joinedload(Doctor.facility)).filter(Doctor.id == doctor_id).first()
 
+def get_doctors_by_names(db: Session, names: List[str]) -> Dict[str, Doctor]:
+    """
+    Ambil banyak dokter sekaligus berdasarkan nama (satu query IN, tidak
+    case-sensitive), dikunci dengan nama huruf kecil
+    """
+    lowered = {name.strip().lower() for name in names if name and name.strip()}
+    if not lowered:
+        return {}
+    doctors = db.query(Doctor).filter(func.lower(Doctor.name).in_(lowered)).all()
+    return {doctor.name.strip().lower(): doctor for doctor in doctors}
+
 def get_doctors(db: Session, skip: int = 0, limit: int = 100, search: str = None, facility_id: uuid.UUID = None):
     # ✅ PASTIKAN menggunakan joinedload dengan benar
     query = db.query(Doctor).options(joinedload(Doctor.facility))
     
-    if search:
-        query = query.filter(
-            or_(
-                Doctor.name.ilike(f"%{search}%"),
-                Doctor.specialization.ilike(f"%{search}%"),
-                Doctor.bpjs_id.ilike(f"%{search}%")
-            )
-        )
     if facility_id:
         query = query.filter(Doctor.facility_id == facility_id)
+    query = apply_search(query, db, DOCTOR_SEARCH_FIELDS, search, Doctor.id)
     
     return query.offset(skip).limit(limit).all()
 
@@ -0,0 +1,220 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, insert, or_, and_, type_coerce, String
+from datetime import datetime, timedelta, date
+import uuid
+import os
+from collections import defaultdict
+from typing import Dict, Any, Iterable, Optional, Tuple
+
+from models.claim import ClaimSubmission, ClaimStatus
+from models.facility_stats import FacilityClaimStat
+
+# ============================================================
+# KONFIGURASI STATISTIK FASKES
+# ============================================================
+STAT_STATUS = "status"
+STAT_DAILY = "daily"
+STAT_PATIENTS = "patients"
+ALL_BUCKET = "all"
+
+# Jumlah hari ke belakang yang dikembalikan sebagai total harian dashboard
+DASHBOARD_DAILY_DAYS = int(os.getenv("DASHBOARD_DAILY_DAYS", "30"))
+
+# (facility_id, metric, bucket) -> perubahan nilai
+StatKey = Tuple[uuid.UUID, str, str]
+
+# ============================================================
+# FUNGSI PERUBAHAN INKREMENTAL
+# ============================================================
+# Dipanggil oleh repository klaim di dalam transaksi yang sama dengan
+# perubahan klaimnya (tanpa commit), sehingga counter ikut di-rollback.
+
+def status_bucket(status) -> str:
+    """Nilai ClaimStatus sebagai bucket; menerima enum, value ('uploaded') atau nama ('UPLOADED')"""
+    if hasattr(status, 'value'):
+        return status.value
+    if status in ClaimStatus.__members__:
+        return ClaimStatus[status].value
+    return str(status).lower() if status else ClaimStatus.UPLOADED.value
+
+def raw_status_column():
+    """
+    Kolom status sebagai string mentah: baris lama bisa berisi nama enum
+    ('UPLOADED') maupun value-nya ('uploaded'); status_bucket menormalkan keduanya
+    """
+    return type_coerce(ClaimSubmission.status, String)
+
+def record_claims_created(db: Session, claims: Iterable[Dict[str, Any]]):
+    """
+    Tambahkan counter untuk klaim baru (dict berisi facility_id, patient_id,
+    status, upload_at). Harus dipanggil SEBELUM klaim di-insert: pasangan
+    faskes-pasien yang belum punya klaim dihitung sebagai pasien baru.
+    """
+    deltas: Dict[StatKey, int] = defaultdict(int)
+    pairs = set()
+    for claim in claims:
+        facility_id = claim["facility_id"]
+        upload_at = claim.get("upload_at") or datetime.utcnow()
+        deltas[(facility_id, STAT_STATUS, status_bucket(claim.get("status")))] += 1
+        deltas[(facility_id, STAT_DAILY, upload_at.date().isoformat())] += 1
+        pairs.add((facility_id, claim["patient_id"]))
+
+    if pairs:
+        existing = set(
+            db.query(ClaimSubmission.facility_id, ClaimSubmission.patient_id)
+            .filter(
+                ClaimSubmission.facility_id.in_({facility_id for facility_id, _ in pairs}),
+                ClaimSubmission.patient_id.in_({patient_id for _, patient_id in pairs})
+            )
+            .distinct()
+            .all()
+        )
+        for facility_id, patient_id in pairs - existing:
+            deltas[(facility_id, STAT_PATIENTS, ALL_BUCKET)] += 1
+
+    apply_stat_deltas(db, deltas)
+
+def record_status_changes(db: Session, changes: Iterable[Tuple[uuid.UUID, Any, Any]]):
+    """Pindahkan counter status untuk (facility_id, status_lama, status_baru)"""
+    deltas: Dict[StatKey, int] = defaultdict(int)
+    for facility_id, old_status, new_status in changes:
+        old_bucket, new_bucket = status_bucket(old_status), status_bucket(new_status)
+        if old_bucket == new_bucket:
+            continue
+        deltas[(facility_id, STAT_STATUS, old_bucket)] -= 1
+        deltas[(facility_id, STAT_STATUS, new_bucket)] += 1
+    apply_stat_deltas(db, deltas)
+
+def apply_stat_deltas(db: Session, deltas: Dict[StatKey, int]):
+    """
+    Satu upsert multi-row `value = value + delta`. Baris diurutkan berdasarkan
+    key agar transaksi paralel mengunci baris counter dalam urutan yang sama.
+    """
+    now = datetime.utcnow()
+    rows = [
+        {"facility_id": facility_id, "metric": metric, "bucket": bucket, "value": delta, "updated_at": now}
+        for (facility_id, metric, bucket), delta in sorted(deltas.items(), key=lambda item: (str(item[0][0]), item[0][1], item[0][2]))
+        if delta
+    ]
+    if not rows:
+        return
+
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as upsert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as upsert
+    else:
+        _apply_stat_deltas_fallback(db, rows)
+        return
+
+    stmt = upsert(FacilityClaimStat)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[FacilityClaimStat.facility_id, FacilityClaimStat.metric, FacilityClaimStat.bucket],
+        set_={
+            "value": FacilityClaimStat.value + stmt.excluded.value,
+            "updated_at": stmt.excluded.updated_at
+        }
+    )
+    db.execute(stmt, rows)
+
+def _apply_stat_deltas_fallback(db: Session, rows):
+    """Database tanpa INSERT ... ON CONFLICT: baca-lalu-tulis per baris"""
+    for row in rows:
+        stat = db.get(FacilityClaimStat, (row["facility_id"], row["metric"], row["bucket"]))
+        if stat:
+            stat.value += row["value"]
+            stat.updated_at = row["updated_at"]
+        else:
+            db.add(FacilityClaimStat(**row))
+    db.flush()
+
+# ============================================================
+# FUNGSI BACA
+# ============================================================
+
+def get_facility_stats(db: Session, facility_id: Optional[uuid.UUID] = None, days: int = DASHBOARD_DAILY_DAYS) -> Dict[str, Any]:
+    """
+    Statistik klaim satu faskes (atau semua faskes jika facility_id None)
+    dari satu query ke facility_claim_stats: jumlah per status, total
+    harian `days` hari terakhir dan jumlah pasien.
+    """
+    today = datetime.utcnow().date()
+    since = (today - timedelta(days=max(0, days - 1))).isoformat()
+
+    query = db.query(
+            FacilityClaimStat.metric,
+            FacilityClaimStat.bucket,
+            func.sum(FacilityClaimStat.value)
+        )\
+        .filter(or_(
+            FacilityClaimStat.metric != STAT_DAILY,
+            and_(FacilityClaimStat.metric == STAT_DAILY, FacilityClaimStat.bucket >= since)
+        ))
+    if facility_id:
+        query = query.filter(FacilityClaimStat.facility_id == facility_id)
+    rows = query.group_by(FacilityClaimStat.metric, FacilityClaimStat.bucket).all()
+
+    claims_by_status = {status.value: 0 for status in ClaimStatus}
+    daily_claims = {}
+    total_patients = 0
+    for metric, bucket, value in rows:
+        value = int(value or 0)
+        if metric == STAT_STATUS:
+            claims_by_status[bucket] = value
+        elif metric == STAT_DAILY:
+            daily_claims[bucket] = value
+        elif metric == STAT_PATIENTS:
+            total_patients += value
+
+    return {
+        "total_claims": sum(claims_by_status.values()),
+        "claims_by_status": claims_by_status,
+        "daily_claims": dict(sorted(daily_claims.items())),
+        "today_claims": daily_claims.get(today.isoformat(), 0),
+        "total_patients": total_patients
+    }
+
+# ============================================================
+# REBUILD
+# ============================================================
+
+def rebuild_facility_stats(db: Session) -> int:
+    """
+    Hitung ulang seluruh counter dari claim_submission (backfill database
+    lama atau koreksi setelah perubahan data di luar repository).
+    """
+    status_rows = db.query(ClaimSubmission.facility_id, raw_status_column(), func.count(ClaimSubmission.id))\
+        .group_by(ClaimSubmission.facility_id, ClaimSubmission.status)\
+        .all()
+    daily_rows = db.query(ClaimSubmission.facility_id, func.date(ClaimSubmission.upload_at), func.count(ClaimSubmission.id))\
+        .filter(ClaimSubmission.upload_at.isnot(None))\
+        .group_by(ClaimSubmission.facility_id, func.date(ClaimSubmission.upload_at))\
+        .all()
+    patient_rows = db.query(ClaimSubmission.facility_id, func.count(func.distinct(ClaimSubmission.patient_id)))\
+        .group_by(ClaimSubmission.facility_id)\
+        .all()
+
+    now = datetime.utcnow()
+    deltas: Dict[StatKey, int] = defaultdict(int)
+    for facility_id, status, count in status_rows:
+        deltas[(facility_id, STAT_STATUS, status_bucket(status))] += count
+    for facility_id, day, count in daily_rows:
+        day = day.isoformat() if isinstance(day, date) else str(day)
+        deltas[(facility_id, STAT_DAILY, day)] += count
+    for facility_id, count in patient_rows:
+        deltas[(facility_id, STAT_PATIENTS, ALL_BUCKET)] += count
+
+    rows = [
+        {"facility_id": facility_id, "metric": metric, "bucket": bucket, "value": value, "updated_at": now}
+        for (facility_id, metric, bucket), value in deltas.items()
+    ]
+    try:
+        db.query(FacilityClaimStat).delete(synchronize_session=False)
+        if rows:
+            db.execute(insert(FacilityClaimStat), rows)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return len(rows)
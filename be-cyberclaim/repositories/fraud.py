@@ -1,13 +1,28 @@
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func, case
+from sqlalchemy import func, case, insert
 from datetime import datetime
 import uuid
-from typing import Dict, Any ,List
+from typing import Dict, Any ,List, Optional
 
 from models.fraud import FraudDetection
 from models.claim import ClaimSubmission
+from models.claim_score import ClaimTariffScore
 from models.user import User
+from models.patient import Patient
+from models.facility import Facility
+from models.medical import SEP
+from utils.pagination import Keyset, apply_keyset
 from schemas.fraud import FraudDetectionCreate, FraudDetectionUpdate, FraudStatsResponse
+from repositories.search import (
+    apply_search, search_condition, normalize_search,
+    FULLTEXT, TRIGRAM, SEARCH_ORDER_RELEVANCE, SEARCH_ORDER_RECENT
+)
+
+# Kolom yang dicari /api/fraud/search (tsvector + pg_trgm di PostgreSQL)
+FRAUD_SEARCH_FIELDS = [
+    (FraudDetection.description, FULLTEXT),
+    (FraudDetection.detection_type, TRIGRAM),
+]
 
 def get_fraud_detection(db: Session, fraud_id: uuid.UUID):
     return db.query(FraudDetection)\
@@ -20,19 +35,35 @@ def get_fraud_detection(db: Session, fraud_id: uuid.UUID):
         .filter(FraudDetection.id == fraud_id)\
         .first()
 
-def get_fraud_detections(db: Session, skip: int = 0, limit: int = 100, resolved: bool = None):
-    query = db.query(FraudDetection)\
+def _fraud_list_query(db: Session):
+    """Listing fraud: relasi many-to-one yang dipakai response di-join, kolom nama saja"""
+    claim = joinedload(FraudDetection.claim).load_only(ClaimSubmission.id, ClaimSubmission.patient_id,
+                                                     ClaimSubmission.facility_id, ClaimSubmission.sep_id)
+    return db.query(FraudDetection)\
         .options(
-            joinedload(FraudDetection.claim).joinedload(ClaimSubmission.patient),
-            joinedload(FraudDetection.claim).joinedload(ClaimSubmission.facility),
-            joinedload(FraudDetection.claim).joinedload(ClaimSubmission.sep),
-            joinedload(FraudDetection.resolver)
+            claim.joinedload(ClaimSubmission.patient).load_only(Patient.name),
+            claim.joinedload(ClaimSubmission.facility).load_only(Facility.name),
+            claim.joinedload(ClaimSubmission.sep).load_only(SEP.sep_number),
+            joinedload(FraudDetection.resolver).load_only(User.full_name)
         )
+
+def _paginate_fraud(query, skip: int, limit: int, after: Optional[Keyset]):
+    """Keyset (created_at DESC, id DESC); `skip` hanya untuk klien tanpa cursor"""
+    query = apply_keyset(query, FraudDetection.created_at, FraudDetection.id, after, limit)
+    if skip and not after:
+        query = query.offset(skip)
+    return query.all()
+
+def get_fraud_detections(db: Session, skip: int = 0, limit: int = 100, resolved: bool = None,
+                         risk_level: str = None, after: Optional[Keyset] = None):
+    query = _fraud_list_query(db)
     
     if resolved is not None:
         query = query.filter(FraudDetection.is_resolved == resolved)
+    if risk_level:
+        query = query.filter(FraudDetection.risk_level == risk_level)
     
-    return query.offset(skip).limit(limit).all()
+    return _paginate_fraud(query, skip, limit, after)
 
 def get_fraud_detections_by_claim(db: Session, claim_id: uuid.UUID):
     return db.query(FraudDetection)\
@@ -71,6 +102,29 @@ def create_bulk_fraud_detections(db: Session, fraud_data_list: List[FraudDetecti
         db.refresh(fraud)
     return db_frauds
 
+def bulk_insert_fraud_detections(db: Session, fraud_data_list: List[FraudDetectionCreate], commit: bool = True) -> int:
+    """
+    Simpan banyak hasil fraud detection dengan satu INSERT multi-row
+    (tanpa refresh per baris). Mengembalikan jumlah baris.
+    """
+    if not fraud_data_list:
+        return 0
+    now = datetime.utcnow()
+    rows = [
+        {
+            **fraud_data.model_dump(),
+            "id": uuid.uuid4(),
+            "is_resolved": False,
+            "created_at": now,
+            "updated_at": now
+        }
+        for fraud_data in fraud_data_list
+    ]
+    db.execute(insert(FraudDetection), rows)
+    if commit:
+        db.commit()
+    return len(rows)
+
 def update_fraud_detection(db: Session, fraud_id: uuid.UUID, fraud_update: FraudDetectionUpdate, resolved_by: uuid.UUID = None):
     db_fraud = db.query(FraudDetection).filter(FraudDetection.id == fraud_id).first()
     if not db_fraud:
@@ -138,18 +192,36 @@ def get_user_name_by_id(db: Session, user_id: uuid.UUID):
         return user.full_name if user else None
     return None
 
-def search_fraud_detections(db: Session, query: str, skip: int = 0, limit: int = 100):
-    return db.query(FraudDetection)\
-        .options(
-            joinedload(FraudDetection.claim).joinedload(ClaimSubmission.patient),
-            joinedload(FraudDetection.claim).joinedload(ClaimSubmission.facility),
-            joinedload(FraudDetection.claim).joinedload(ClaimSubmission.sep),
-            joinedload(FraudDetection.resolver)
-        )\
-        .filter(
-            FraudDetection.description.ilike(f"%{query}%") |
-            FraudDetection.detection_type.ilike(f"%{query}%")
-        )\
+def search_fraud_detections(db: Session, query: str, skip: int = 0, limit: int = 100,
+                            after: Optional[Keyset] = None, order: str = SEARCH_ORDER_RELEVANCE):
+    """
+    Cari deteksi fraud pada deskripsi (full-text) dan jenis deteksi (trigram).
+    `order="relevance"` mengurutkan dari yang paling relevan (offset `skip`);
+    `order="recent"` atau `after` memakai keyset created_at seperti listing.
+    """
+    if after or order == SEARCH_ORDER_RECENT:
+        term = normalize_search(query)
+        fraud_query = _fraud_list_query(db)
+        if term:
+            fraud_query = fraud_query.filter(search_condition(db, FRAUD_SEARCH_FIELDS, term)[0])
+        return _paginate_fraud(fraud_query, skip, limit, after)
+
+    fraud_query = apply_search(_fraud_list_query(db), db, FRAUD_SEARCH_FIELDS, query,
+                               FraudDetection.created_at.desc(), FraudDetection.id.desc())
+    return fraud_query.offset(skip).limit(limit).all()
+
+def get_tariff_scores(db: Session, skip: int = 0, limit: int = 100, anomalies_only: bool = True,
+                      facility_id: uuid.UUID = None, diagnosa_code: str = None) -> List[ClaimTariffScore]:
+    """Skor anomali tarif terakhir, diurutkan dari skor tertinggi"""
+    query = db.query(ClaimTariffScore)
+    if anomalies_only:
+        query = query.filter(ClaimTariffScore.is_anomaly == True)
+    if facility_id:
+        query = query.filter(ClaimTariffScore.facility_id == facility_id)
+    if diagnosa_code:
+        query = query.filter(ClaimTariffScore.diagnosa_code == diagnosa_code)
+
+    return query.order_by(ClaimTariffScore.anomaly_score.desc())\
         .offset(skip)\
         .limit(limit)\
-        .all()
\ No newline at end of file
+        .all()
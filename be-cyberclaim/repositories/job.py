@@ -0,0 +1,197 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import or_, and_
+from datetime import datetime, timedelta
+import uuid
+import os
+from typing import List, Optional, Dict, Any
+
+from models.job import Job, JobStatus
+
+# ============================================================
+# KONFIGURASI JOB QUEUE
+# ============================================================
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_VISIBILITY_TIMEOUT = int(os.getenv("JOB_VISIBILITY_TIMEOUT", "600"))   # detik
+JOB_RETRY_BASE_DELAY = int(os.getenv("JOB_RETRY_BASE_DELAY", "30"))        # detik
+JOB_RETRY_MAX_DELAY = int(os.getenv("JOB_RETRY_MAX_DELAY", "1800"))        # detik
+
+ACTIVE_JOB_STATUSES = [JobStatus.QUEUED, JobStatus.RUNNING]
+
+def retry_delay(attempts: int) -> int:
+    """Exponential backoff: base * 2^(attempts-1), dibatasi JOB_RETRY_MAX_DELAY"""
+    return min(JOB_RETRY_MAX_DELAY, JOB_RETRY_BASE_DELAY * (2 ** max(0, attempts - 1)))
+
+# ============================================================
+# FUNGSI JOB REPOSITORY
+# ============================================================
+
+def enqueue_job(
+    db: Session,
+    job_type: str,
+    claim_id: uuid.UUID = None,
+    payload: Dict[str, Any] = None,
+    max_attempts: int = JOB_MAX_ATTEMPTS,
+    delay_seconds: int = 0
+) -> Job:
+    """
+    Masukkan job baru ke antrean
+    """
+    now = datetime.utcnow()
+    db_job = Job(
+        job_type=job_type,
+        claim_id=claim_id,
+        payload=payload or {},
+        status=JobStatus.QUEUED,
+        attempts=0,
+        max_attempts=max_attempts,
+        run_after=now + timedelta(seconds=delay_seconds),
+        created_at=now,
+        updated_at=now
+    )
+    db.add(db_job)
+    db.commit()
+    db.refresh(db_job)
+    return db_job
+
+def get_job(db: Session, job_id: uuid.UUID) -> Optional[Job]:
+    return db.query(Job).filter(Job.id == job_id).first()
+
+def get_jobs_by_claim(db: Session, claim_id: uuid.UUID) -> List[Job]:
+    return db.query(Job)\
+        .filter(Job.claim_id == claim_id)\
+        .order_by(Job.created_at.asc())\
+        .all()
+
+def has_active_job(db: Session, claim_id: uuid.UUID, job_type: str) -> bool:
+    """Cek apakah klaim masih punya job QUEUED/RUNNING dengan tipe tertentu"""
+    return db.query(Job.id)\
+        .filter(
+            Job.claim_id == claim_id,
+            Job.job_type == job_type,
+            Job.status.in_(ACTIVE_JOB_STATUSES)
+        )\
+        .first() is not None
+
+def claim_next_job(
+    db: Session,
+    worker_id: str,
+    job_types: List[str] = None,
+    visibility_timeout: int = JOB_VISIBILITY_TIMEOUT
+) -> Optional[Job]:
+    """
+    Ambil satu job yang siap dijalankan dan kunci untuk worker ini.
+
+    Job yang siap: QUEUED dengan run_after <= sekarang, atau RUNNING yang
+    lease-nya (locked_until) sudah habis. Di Postgres kandidat dikunci dengan
+    FOR UPDATE SKIP LOCKED; klaim akhirnya tetap memakai UPDATE bersyarat pada
+    `attempts` sehingga aman juga di SQLite yang tidak mendukung row lock.
+    """
+    now = datetime.utcnow()
+    query = db.query(Job)\
+        .filter(
+            or_(
+                and_(Job.status == JobStatus.QUEUED, Job.run_after <= now),
+                and_(Job.status == JobStatus.RUNNING, Job.locked_until < now)
+            )
+        )
+
+    if job_types:
+        query = query.filter(Job.job_type.in_(job_types))
+
+    candidates = query\
+        .order_by(Job.run_after.asc())\
+        .limit(5)\
+        .with_for_update(skip_locked=True)\
+        .all()
+
+    for job in candidates:
+        claimed = db.query(Job)\
+            .filter(
+                Job.id == job.id,
+                Job.status == job.status,
+                Job.attempts == job.attempts
+            )\
+            .update({
+                Job.status: JobStatus.RUNNING,
+                Job.attempts: job.attempts + 1,
+                Job.locked_by: worker_id,
+                Job.locked_until: now + timedelta(seconds=visibility_timeout),
+                Job.started_at: now,
+                Job.updated_at: now
+            }, synchronize_session=False)
+
+        if claimed:
+            db.commit()
+            db.refresh(job)
+            return job
+
+    db.rollback()
+    return None
+
+def extend_job_lease(db: Session, job_id: uuid.UUID, worker_id: str, visibility_timeout: int = JOB_VISIBILITY_TIMEOUT) -> bool:
+    """Perpanjang lease job yang sedang dikerjakan worker ini (heartbeat)"""
+    now = datetime.utcnow()
+    updated = db.query(Job)\
+        .filter(
+            Job.id == job_id,
+            Job.status == JobStatus.RUNNING,
+            Job.locked_by == worker_id
+        )\
+        .update({
+            Job.locked_until: now + timedelta(seconds=visibility_timeout),
+            Job.updated_at: now
+        }, synchronize_session=False)
+    db.commit()
+    return bool(updated)
+
+def complete_job(db: Session, job: Job, result: Dict[str, Any] = None) -> Job:
+    """
+    Tandai job selesai
+    """
+    now = datetime.utcnow()
+    job.status = JobStatus.SUCCEEDED
+    job.result = result
+    job.last_error = None
+    job.locked_by = None
+    job.locked_until = None
+    job.finished_at = now
+    job.updated_at = now
+    db.commit()
+    db.refresh(job)
+    return job
+
+def fail_job(db: Session, job: Job, error: str) -> Job:
+    """
+    Catat kegagalan job. Selama attempts < max_attempts job dijadwalkan ulang
+    dengan exponential backoff, setelah itu status menjadi FAILED.
+    """
+    now = datetime.utcnow()
+    job.last_error = error
+    job.locked_by = None
+    job.locked_until = None
+    job.updated_at = now
+
+    if job.attempts < job.max_attempts:
+        job.status = JobStatus.QUEUED
+        job.run_after = now + timedelta(seconds=retry_delay(job.attempts))
+    else:
+        job.status = JobStatus.FAILED
+        job.finished_at = now
+
+    db.commit()
+    db.refresh(job)
+    return job
+
+def serialize_job(job: Job) -> Dict[str, Any]:
+    """Ringkasan job untuk response API"""
+    return {
+        "job_id": str(job.id),
+        "job_type": job.job_type,
+        "status": job.status.value if hasattr(job.status, 'value') else job.status,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "run_after": job.run_after.isoformat() if job.run_after else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        "last_error": job.last_error
+    }
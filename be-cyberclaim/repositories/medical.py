@@ -1,8 +1,15 @@
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import or_
 import uuid
 from models.medical import SEP, RekamMedis, Diagnosis, Tindakan, TarifINACBGS
 from schemas.medical import SEPCreate, RekamMedisCreate, DiagnosisBase, TindakanBase, TarifINACBGSBase
+from repositories.tariff import bump_tariff_version, get_tariff_cache
+from repositories.search import apply_search, TRIGRAM, SUBSTRING
+
+# Kolom yang dicari parameter `search` SEP (index GIN pg_trgm di PostgreSQL)
+SEP_SEARCH_FIELDS = [
+    (SEP.sep_number, SUBSTRING),
+    (SEP.poli, TRIGRAM),
+]
 
 def get_sep(db: Session, sep_id: uuid.UUID):
     # ✅ Tambahkan eager loading
@@ -19,13 +26,7 @@ def get_seps(db: Session, skip: int = 0, limit: int = 100, search: str = None):
         joinedload(SEP.facility),
         joinedload(SEP.doctor)
     )
-    if search:
-        query = query.filter(
-            or_(
-                SEP.sep_number.ilike(f"%{search}%"),
-                SEP.poli.ilike(f"%{search}%")
-            )
-        )
+    query = apply_search(query, db, SEP_SEARCH_FIELDS, search, SEP.id)
     return query.offset(skip).limit(limit).all()
 
 def create_sep(db: Session, sep: SEPCreate):
@@ -120,7 +121,9 @@ def get_tarif_inacbgs_list(db: Session, skip: int = 0, limit: int = 100):
 def create_tarif_inacbgs(db: Session, tarif: TarifINACBGSBase):
     db_tarif = TarifINACBGS(**tarif.dict())
     db.add(db_tarif)
+    bump_tariff_version(db)
     db.commit()
+    get_tariff_cache().invalidate()
     db.refresh(db_tarif)
     return db_tarif
 
@@ -133,6 +136,8 @@ def update_tarif_inacbgs(db: Session, tarif_id: uuid.UUID, tarif_update):
     for field, value in update_data.items():
         setattr(db_tarif, field, value)
     
+    bump_tariff_version(db)
     db.commit()
+    get_tariff_cache().invalidate()
     db.refresh(db_tarif)
     return db_tarif
\ No newline at end of file
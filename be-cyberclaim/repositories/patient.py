@@ -1,22 +1,36 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
 import uuid
+from typing import Dict, List
 from models.patient import Patient
+from models.claim import ClaimSubmission
 from schemas.patient import PatientCreate, PatientUpdate
+from repositories.search import apply_search, TRIGRAM, SUBSTRING
+
+# Kolom yang dicari parameter `search` (index GIN pg_trgm di PostgreSQL)
+PATIENT_SEARCH_FIELDS = [
+    (Patient.name, TRIGRAM),
+    (Patient.nik, SUBSTRING),
+    (Patient.bpjs_number, SUBSTRING),
+]
 
 def get_patient(db: Session, patient_id: uuid.UUID):
     return db.query(Patient).filter(Patient.id == patient_id).first()
 
-def get_patients(db: Session, skip: int = 0, limit: int = 100, search: str = None):
+def get_patients_by_ids(db: Session, patient_ids: List[uuid.UUID]) -> Dict[uuid.UUID, Patient]:
+    """Ambil banyak pasien sekaligus (satu query IN), dikunci dengan id"""
+    if not patient_ids:
+        return {}
+    patients = db.query(Patient).filter(Patient.id.in_(set(patient_ids))).all()
+    return {patient.id: patient for patient in patients}
+
+def get_patients(db: Session, skip: int = 0, limit: int = 100, search: str = None, facility_id: uuid.UUID = None):
+    """Daftar pasien; dengan `search` diurutkan dari yang paling relevan, dengan `facility_id` hanya pasien yang pernah klaim di faskes tersebut"""
     query = db.query(Patient)
-    if search:
-        query = query.filter(
-            or_(
-                Patient.name.ilike(f"%{search}%"),
-                Patient.nik.ilike(f"%{search}%"),
-                Patient.bpjs_number.ilike(f"%{search}%")
-            )
-        )
+    if facility_id:
+        facility_patients = db.query(ClaimSubmission.patient_id)\
+            .filter(ClaimSubmission.facility_id == facility_id)
+        query = query.filter(Patient.id.in_(facility_patients))
+    query = apply_search(query, db, PATIENT_SEARCH_FIELDS, search, Patient.id)
     return query.offset(skip).limit(limit).all()
 
 def create_patient(db: Session, patient: PatientCreate):
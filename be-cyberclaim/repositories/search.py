@@ -0,0 +1,118 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import or_, and_, func, case, literal, literal_column, Float
+import os
+import re
+from typing import List, Optional, Tuple
+
+# ============================================================
+# PENCARIAN TEKS (TRIGRAM / FULL-TEXT)
+# ============================================================
+# PostgreSQL: kolom dicari lewat index GIN pg_trgm (ILIKE substring dan
+# operator similarity `%>`) atau tsvector untuk deskripsi panjang, lalu hasil
+# diurutkan berdasarkan relevansi. Index dibuat oleh migrasi
+# alembic/versions/0003_search_indexes.py.
+# Database lain (SQLite untuk development/test): LIKE substring biasa dengan
+# ranking sederhana (sama persis > awalan > substring).
+
+# Mode pencarian per kolom
+SUBSTRING = "substring"   # nomor/kode (NIK, BPJS, SEP): ILIKE substring
+TRIGRAM = "trigram"       # nama: ILIKE substring + fuzzy (salah ketik)
+FULLTEXT = "fulltext"     # teks panjang: tsvector, awalan per kata
+
+# Konfigurasi text search PostgreSQL; 'simple' karena teks campuran Indonesia/Inggris
+SEARCH_TS_CONFIG = re.sub(r"\W", "", os.getenv("SEARCH_TS_CONFIG", "simple"))
+SEARCH_MAX_LENGTH = 100
+
+# Urutan hasil pencarian yang bisa diminta endpoint
+SEARCH_ORDER_RELEVANCE = "relevance"
+SEARCH_ORDER_RECENT = "recent"
+
+SearchField = Tuple[object, str]
+
+def normalize_search(term: Optional[str]) -> Optional[str]:
+    """Rapikan kata kunci (spasi ganda, panjang maksimum); None jika kosong"""
+    if not term:
+        return None
+    term = " ".join(term.split())[:SEARCH_MAX_LENGTH]
+    return term or None
+
+def _escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def _tsquery(term: str) -> Optional[str]:
+    """'demam ber' -> 'demam:* & ber:*' (hanya karakter kata, aman untuk to_tsquery)"""
+    words = re.findall(r"\w+", term.lower())
+    return " & ".join(f"{word}:*" for word in words) or None
+
+def _like_rank(column, term: str):
+    """Ranking tanpa index khusus: sama persis 1.0, awalan 0.75, substring 0.5"""
+    lowered = func.lower(column)
+    term = term.lower()
+    escaped = _escape_like(term)
+    return case(
+        (lowered == term, 1.0),
+        (lowered.like(f"{escaped}%", escape="\\"), 0.75),
+        (lowered.like(f"%{escaped}%", escape="\\"), 0.5),
+        else_=0.0
+    )
+
+def _match_postgresql(column, mode: str, term: str):
+    pattern = f"%{_escape_like(term)}%"
+    if mode == FULLTEXT:
+        tsquery = _tsquery(term)
+        if not tsquery:
+            return None, None
+        # Ekspresi harus identik dengan index ix_fraud_detections_description_tsv
+        # (literal, bukan parameter) agar planner memakai index tersebut
+        config = literal_column(f"'{SEARCH_TS_CONFIG}'")
+        vector = func.to_tsvector(config, func.coalesce(column, literal_column("''")))
+        query = func.to_tsquery(config, tsquery)
+        return vector.op("@@")(query), func.ts_rank(vector, query)
+    if mode == TRIGRAM:
+        # `kolom %> term`: word_similarity(term, kolom) di atas threshold, didukung gin_trgm_ops
+        condition = or_(column.ilike(pattern, escape="\\"), column.op("%>")(term))
+        return condition, func.greatest(_like_rank(column, term), func.word_similarity(term, column))
+    return column.ilike(pattern, escape="\\"), _like_rank(column, term)
+
+def _match_fallback(column, mode: str, term: str):
+    if mode == FULLTEXT:
+        # Setiap kata harus muncul (mendekati semantik tsquery AND)
+        words = re.findall(r"\w+", term.lower())
+        if not words:
+            return None, None
+        lowered = func.lower(func.coalesce(column, ""))
+        return and_(*[lowered.like(f"%{_escape_like(word)}%", escape="\\") for word in words]), _like_rank(column, term)
+    return func.lower(column).like(f"%{_escape_like(term.lower())}%", escape="\\"), _like_rank(column, term)
+
+def search_condition(db: Session, fields: List[SearchField], term: str):
+    """
+    (kondisi WHERE, ekspresi rank) untuk `term` pada beberapa kolom. Baris cocok
+    jika salah satu kolom cocok; rank adalah rank kolom tertinggi.
+    """
+    matcher = _match_postgresql if db.get_bind().dialect.name == "postgresql" else _match_fallback
+    conditions, ranks = [], []
+    for column, mode in fields:
+        condition, rank = matcher(column, mode, term)
+        if condition is None:
+            continue
+        conditions.append(condition)
+        ranks.append(rank)
+
+    if not conditions:
+        return literal(False), literal(0.0, type_=Float)
+    if len(ranks) == 1:
+        return conditions[0], ranks[0]
+    greatest = func.greatest if db.get_bind().dialect.name == "postgresql" else func.max
+    return or_(*conditions), greatest(*ranks)
+
+def apply_search(query, db: Session, fields: List[SearchField], term: Optional[str], *tiebreak):
+    """
+    Filter `query` dengan `term` dan urutkan dari yang paling relevan, lalu
+    `tiebreak` (mis. Model.id) agar halaman offset stabil. Tanpa term query
+    dikembalikan apa adanya.
+    """
+    term = normalize_search(term)
+    if not term:
+        return query
+    condition, rank = search_condition(db, fields, term)
+    return query.filter(condition).order_by(rank.desc(), *tiebreak)
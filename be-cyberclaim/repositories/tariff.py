@@ -1,11 +1,129 @@
 from sqlalchemy.orm import Session
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, NamedTuple, Tuple
 from uuid import UUID
 from sqlalchemy import func
+import os
+import time
+import threading
 
 from models.medical import TarifINACBGS
+from models.cache_version import CacheVersion
 from schemas.medical import TarifINACBGSBase, TarifINACBGSUpdate
 
+# ============================================================
+# CACHE TARIF INA-CBG
+# ============================================================
+# Tabel tarif kecil dan jarang berubah, jadi tarif aktif dimuat sekali per
+# proses ke dict. Setiap penulisan tarif menaikkan versi di cache_versions;
+# proses lain membaca versi itu paling sering tiap TARIFF_CACHE_CHECK_INTERVAL
+# detik dan memuat ulang tabel jika versinya berbeda.
+TARIFF_CACHE_NAME = "tarif_inacbgs"
+TARIFF_CACHE_CHECK_INTERVAL = float(os.getenv("TARIFF_CACHE_CHECK_INTERVAL", "5"))
+
+
+class CachedTariff(NamedTuple):
+    """Salinan baris tarif aktif (tidak terikat session)"""
+    id: UUID
+    diagnosa_code: str
+    description: Optional[str]
+    tarif_inacbgs: int
+    is_active: bool
+
+
+TariffKey = Tuple[str, Optional[str]]
+
+
+class TariffCache:
+    """
+    Tarif aktif dikunci dengan (diagnosa_code, procedure). Tabel tarif belum
+    punya kolom procedure sehingga semua tarif tercatat di (kode, None) dan
+    lookup dengan procedure jatuh ke tarif diagnosa tersebut. Jika satu kode
+    punya beberapa tarif aktif, yang dibuat paling awal dipakai.
+    """
+
+    def __init__(self, check_interval: float = TARIFF_CACHE_CHECK_INTERVAL):
+        self.check_interval = check_interval
+        self.version: Optional[int] = None
+        self._tariffs: Dict[TariffKey, CachedTariff] = {}
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, diagnosis_code: str, procedure_code: Optional[str] = None) -> Optional[CachedTariff]:
+        if not diagnosis_code:
+            return None
+        tariffs = self._current(db)
+        return tariffs.get((diagnosis_code, procedure_code)) or tariffs.get((diagnosis_code, None))
+
+    def invalidate(self):
+        """Paksa cek versi (dan muat ulang) pada lookup berikutnya"""
+        with self._lock:
+            self.version = None
+            self._checked_at = 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {"version": self.version, "tariffs": len(self._tariffs)}
+
+    def _current(self, db: Session) -> Dict[TariffKey, CachedTariff]:
+        now = time.monotonic()
+        if self.version is not None and now - self._checked_at < self.check_interval:
+            return self._tariffs
+        with self._lock:
+            if self.version is not None and now - self._checked_at < self.check_interval:
+                return self._tariffs
+            version = get_tariff_version(db)
+            if version != self.version:
+                self._tariffs = self._load(db)
+                self.version = version
+                print(f"[INFO] Tariff cache dimuat: {len(self._tariffs)} tarif aktif (versi {version})")
+            self._checked_at = now
+            return self._tariffs
+
+    @staticmethod
+    def _load(db: Session) -> Dict[TariffKey, CachedTariff]:
+        rows = db.query(
+                TarifINACBGS.id,
+                TarifINACBGS.diagnosa_code,
+                TarifINACBGS.description,
+                TarifINACBGS.tarif_inacbgs,
+                TarifINACBGS.is_active
+            )\
+            .filter(TarifINACBGS.is_active == True)\
+            .order_by(TarifINACBGS.created_at.asc())\
+            .all()
+        tariffs: Dict[TariffKey, CachedTariff] = {}
+        for row in rows:
+            tariffs.setdefault((row.diagnosa_code, None), CachedTariff(*row))
+        return tariffs
+
+
+_tariff_cache = TariffCache()
+
+
+def get_tariff_cache() -> TariffCache:
+    return _tariff_cache
+
+
+def get_tariff_version(db: Session) -> int:
+    """Versi data tarif saat ini (0 jika belum pernah ada penulisan)"""
+    version = db.query(CacheVersion.version).filter(CacheVersion.name == TARIFF_CACHE_NAME).scalar()
+    return version or 0
+
+
+def bump_tariff_version(db: Session):
+    """
+    Naikkan versi tarif dalam transaksi yang sedang berjalan (commit oleh
+    pemanggil bersama perubahan tarifnya)
+    """
+    updated = db.query(CacheVersion)\
+        .filter(CacheVersion.name == TARIFF_CACHE_NAME)\
+        .update({CacheVersion.version: CacheVersion.version + 1}, synchronize_session=False)
+    if not updated:
+        db.add(CacheVersion(name=TARIFF_CACHE_NAME, version=1))
+
+# ============================================================
+# FUNGSI TARIFF REPOSITORY
+# ============================================================
+
 
 def get_tariff_by_id(db: Session, tariff_id: UUID) -> Optional[TarifINACBGS]:
     """
@@ -14,28 +132,31 @@ def get_tariff_by_id(db: Session, tariff_id: UUID) -> Optional[TarifINACBGS]:
     return db.query(TarifINACBGS).filter(TarifINACBGS.id == tariff_id).first()
 
 
-def get_tariff_by_diagnosis(db: Session, diagnosis_code: str) -> Optional[TarifINACBGS]:
+def get_tariff_by_diagnosis(db: Session, diagnosis_code: str) -> Optional[CachedTariff]:
     """
-    Get tariff by diagnosis code (ICD-10)
+    Get tariff by diagnosis code (ICD-10), dari cache tarif aktif
     """
-    return db.query(TarifINACBGS).filter(
-        TarifINACBGS.diagnosa_code == diagnosis_code
-    ).first()
+    return _tariff_cache.get(db, diagnosis_code)
 
 
-def get_tariff_by_diagnosis_procedure(db: Session, diagnosis_code: str, procedure_code: Optional[str] = None) -> Optional[TarifINACBGS]:
+def get_tariffs_by_diagnoses(db: Session, diagnosis_codes: List[str]) -> Dict[str, List[CachedTariff]]:
     """
-    Get tariff by diagnosis and procedure combination
+    Ambil tarif aktif untuk banyak kode diagnosa sekaligus dari cache,
+    dikelompokkan per kode diagnosa
     """
-    query = db.query(TarifINACBGS).filter(
-        TarifINACBGS.diagnosa_code == diagnosis_code
-    )
-    
-    # Untuk base tariff diagnosis saja (tanpa procedure)
-    if not procedure_code:
-        return query.filter(TarifINACBGS.is_active == True).first()
-    
-    return query.first()
+    tariffs: Dict[str, List[CachedTariff]] = {}
+    for code in {code for code in diagnosis_codes if code}:
+        tariff = _tariff_cache.get(db, code)
+        if tariff:
+            tariffs[code] = [tariff]
+    return tariffs
+
+
+def get_tariff_by_diagnosis_procedure(db: Session, diagnosis_code: str, procedure_code: Optional[str] = None) -> Optional[CachedTariff]:
+    """
+    Get tariff by diagnosis and procedure combination, dari cache tarif aktif
+    """
+    return _tariff_cache.get(db, diagnosis_code, procedure_code)
 
 
 def calculate_tariff_for_claim(db: Session, diagnosis_code: str, procedures: List[str] = None) -> Dict[str, Any]:
@@ -1,11 +1,77 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import and_
 from datetime import datetime
+from collections import OrderedDict
+from typing import Optional
+import os
+import time
 import uuid
+import threading
 from models.user import User, Role
-from schemas.user import UserCreate, UserUpdate
+from schemas.user import UserCreate, UserUpdate, UserResponse
 from utils.security import get_password_hash
 
+# ============================================================
+# CACHE USER UNTUK AUTENTIKASI
+# ============================================================
+# get_current_user dipanggil di setiap request. User yang sudah dimuat
+# disimpan per proses selama AUTH_USER_CACHE_TTL detik (0 = nonaktif) sehingga
+# request berikutnya tidak menyentuh database. update_user dan
+# update_user_last_login menghapus entri user tersebut di proses ini; proses
+# lain melihat perubahan paling lambat setelah TTL habis.
+AUTH_USER_CACHE_TTL = float(os.getenv("AUTH_USER_CACHE_TTL", "30"))
+AUTH_USER_CACHE_SIZE = int(os.getenv("AUTH_USER_CACHE_SIZE", "10000"))
+
+
+class UserCache:
+    """UserResponse per user_id dengan TTL; entri tertua dibuang jika penuh"""
+
+    def __init__(self, ttl: float = AUTH_USER_CACHE_TTL, max_size: int = AUTH_USER_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._users: "OrderedDict[uuid.UUID, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id: Optional[uuid.UUID]) -> Optional[UserResponse]:
+        if not user_id or self.ttl <= 0:
+            return None
+        with self._lock:
+            entry = self._users.get(user_id)
+            if entry is None:
+                return None
+            expires_at, user = entry
+            if expires_at < time.monotonic():
+                del self._users[user_id]
+                return None
+            return user
+
+    def put(self, user: UserResponse):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._users[user.id] = (time.monotonic() + self.ttl, user)
+            self._users.move_to_end(user.id)
+            while len(self._users) > self.max_size:
+                self._users.popitem(last=False)
+
+    def invalidate(self, user_id: Optional[uuid.UUID] = None):
+        """Hapus satu user, atau seluruh cache jika user_id None"""
+        with self._lock:
+            if user_id is None:
+                self._users.clear()
+            else:
+                self._users.pop(user_id, None)
+
+
+_user_cache = UserCache()
+
+def get_user_cache() -> UserCache:
+    return _user_cache
+
+def get_user_for_auth(db: Session, user_id: uuid.UUID):
+    """User beserta role dalam satu query (untuk UserResponse)"""
+    return db.query(User).options(joinedload(User.role)).filter(User.id == user_id).first()
+
 def get_user_by_username(db: Session, username: str):
     return db.query(User).filter(User.username == username).first()
 
@@ -47,14 +113,19 @@ def update_user(db: Session, user_id: uuid.UUID, user_update: UserUpdate):
     
     db_user.updated_at = datetime.utcnow()
     db.commit()
+    _user_cache.invalidate(db_user.id)
     db.refresh(db_user)
     return db_user
 
-def update_user_last_login(db: Session, user_id: uuid.UUID):
+def update_user_last_login(db: Session, user_id: uuid.UUID, password_hash: Optional[str] = None):
+    """Catat waktu login; `password_hash` diisi jika hash lama perlu diganti (rehash)"""
     db_user = db.query(User).filter(User.id == user_id).first()
     if db_user:
         db_user.last_login = datetime.utcnow()
+        if password_hash:
+            db_user.password = password_hash
         db.commit()
+        _user_cache.invalidate(db_user.id)
         db.refresh(db_user)
     return db_user
 
@@ -1,38 +1,25 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from datetime import timedelta
 
 from database import get_db
+from models.user import User
 from schemas.user import LoginRequest, Token, UserResponse
-from repositories.user import get_user_by_username, update_user_last_login
-from utils.security import verify_password, create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
+from repositories.user import update_user_last_login
+from utils.security import create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
 from services.auth import get_current_user
+from services.password_hasher import get_password_hasher, PasswordHasherBusyError
 
 router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
-@router.post("/login", response_model=Token)
-def login(
-    form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
-):
-    user = get_user_by_username(db, form_data.username)
-    if not user or not verify_password(form_data.password, user.password):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Incorrect username or password",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    if not user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Inactive user"
-        )
-    
-    # Update last login
-    update_user_last_login(db, user.id)
+def _get_login_user(db: Session, username: str):
+    return db.query(User).options(joinedload(User.role)).filter(User.username == username).first()
+
+def _complete_login(db: Session, user: User, new_hash):
+    update_user_last_login(db, user.id, new_hash)
     
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
@@ -51,6 +38,37 @@ def login(
         "user": UserResponse.from_orm(user)
     }
 
+@router.post("/login", response_model=Token)
+async def login(
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: Session = Depends(get_db)
+):
+    # Route async: query database di threadpool, bcrypt di executor terbatas
+    # (services/password_hasher.py) sehingga login bersamaan tidak menahan
+    # thread request lain selama hashing
+    user = await run_in_threadpool(_get_login_user, db, form_data.username)
+    password_valid, new_hash = False, None
+    if user:
+        try:
+            password_valid, new_hash = await get_password_hasher().verify_and_update(form_data.password, user.password)
+        except PasswordHasherBusyError as e:
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    if not password_valid:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect username or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Inactive user"
+        )
+    
+    # Update last login (+ simpan hash baru jika cost bcrypt berubah)
+    return await run_in_threadpool(_complete_login, db, user, new_hash)
+
 @router.get("/me", response_model=UserResponse)
 def read_users_me(current_user: UserResponse = Depends(get_current_user)):
     return current_user
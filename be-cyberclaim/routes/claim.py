@@ -1,30 +1,42 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 import uuid
 
 from database import get_db
 from services.auth import get_current_user
 from schemas.user import UserResponse
-from schemas.claim import ClaimSubmissionResponse, ClaimSubmissionUpdate, ClaimStatus
+from schemas.claim import ClaimSubmissionResponse, ClaimListItemResponse, ClaimSubmissionUpdate, ClaimStatus
 from repositories.claim import get_claim, get_claims, get_claims_by_facility, update_claim_status
+from utils.pagination import decode_cursor, next_cursor, NEXT_CURSOR_HEADER, MAX_PAGE_SIZE
 
 router = APIRouter()
 
-@router.get("/", response_model=List[ClaimSubmissionResponse])
+@router.get("/", response_model=List[ClaimListItemResponse])
 def read_claims(
+    response: Response,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description=f"Cursor halaman berikutnya dari header {NEXT_CURSOR_HEADER}"),
     current_user: UserResponse = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
+    try:
+        after = decode_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
     if current_user.role.name in ["admin", "superadmin"]:
-        claims = get_claims(db, skip=skip, limit=limit)
+        claims = get_claims(db, skip=skip, limit=limit, after=after)
     else:
-        claims = get_claims_by_facility(db, current_user.facility_id, skip=skip, limit=limit)
+        claims = get_claims_by_facility(db, current_user.facility_id, skip=skip, limit=limit, after=after)
+    
+    cursor_next = next_cursor(claims, limit, "upload_at")
+    if cursor_next:
+        response.headers[NEXT_CURSOR_HEADER] = cursor_next
     
     # Convert SQLAlchemy models to Pydantic response models with relations
-    return [ClaimSubmissionResponse.from_orm_with_relations(claim) for claim in claims]
+    return [ClaimListItemResponse.from_orm_with_relations(claim) for claim in claims]
 
 @router.get("/{claim_id}", response_model=ClaimSubmissionResponse)
 def read_claim(
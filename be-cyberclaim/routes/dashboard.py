@@ -1,15 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from sqlalchemy import func
 from typing import Dict, Any
 
 from database import get_db
 from services.auth import get_current_user
 from schemas.user import UserResponse
-from models.claim import ClaimSubmission, ClaimStatus
+from models.claim import ClaimSubmission
 from models.facility import Facility
 from models.patient import Patient
-from models.doctor import Doctor
+from models.medical import SEP
+from repositories.facility_stats import get_facility_stats, status_bucket
 
 router = APIRouter()
 
@@ -18,54 +19,59 @@ def get_dashboard_stats(
     current_user: UserResponse = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    # Base query based on user role
-    base_filter = []
-    
+    # Facility users can only see their facility's data
+    facility_id = None
     if current_user.role.name in ["uploader", "faskes"]:
-        # Facility users can only see their facility's data
-        base_filter.append(ClaimSubmission.facility_id == current_user.facility_id)
+        facility_id = current_user.facility_id
     
-    # Total claims by status
-    claims_by_status = db.query(
-        ClaimSubmission.status,
-        func.count(ClaimSubmission.id).label('count')
-    ).filter(*base_filter).group_by(ClaimSubmission.status).all()
+    # Counter klaim per faskes (facility_claim_stats), satu lookup
+    stats = get_facility_stats(db, facility_id)
     
     # Total facilities (only for admin/superadmin)
     total_facilities = 0
     if current_user.role.name in ["admin", "superadmin"]:
-        total_facilities = db.query(Facility).count()
-    
-    # Total patients
-    patient_filter = []
-    if current_user.role.name in ["uploader", "faskes"]:
-        # Facility users can only see patients from their claims
-        patient_subquery = db.query(ClaimSubmission.patient_id).filter(
-            ClaimSubmission.facility_id == current_user.facility_id
-        ).subquery()
-        patient_filter.append(Patient.id.in_(patient_subquery))
+        total_facilities = db.query(func.count(Facility.id)).scalar()
     
-    total_patients = db.query(Patient).filter(*patient_filter).count()
+    # Total patients: faskes dari counter, admin semua pasien terdaftar
+    if facility_id:
+        total_patients = stats["total_patients"]
+    else:
+        total_patients = db.query(func.count(Patient.id)).scalar()
     
-    # Recent claims
-    recent_claims = db.query(ClaimSubmission).filter(*base_filter)\
-        .order_by(ClaimSubmission.upload_at.desc())\
+    # Recent claims: satu query dengan join, tanpa lazy-load per klaim
+    recent_query = db.query(
+            ClaimSubmission.id,
+            SEP.sep_number,
+            Patient.name,
+            Facility.name,
+            ClaimSubmission.upload_at,
+            ClaimSubmission.status
+        )\
+        .outerjoin(SEP, SEP.id == ClaimSubmission.sep_id)\
+        .outerjoin(Patient, Patient.id == ClaimSubmission.patient_id)\
+        .outerjoin(Facility, Facility.id == ClaimSubmission.facility_id)
+    if facility_id:
+        recent_query = recent_query.filter(ClaimSubmission.facility_id == facility_id)
+    recent_claims = recent_query.order_by(ClaimSubmission.upload_at.desc())\
         .limit(10)\
         .all()
     
     return {
-        "claims_by_status": {status.value: count for status, count in claims_by_status},
+        "claims_by_status": stats["claims_by_status"],
+        "total_claims": stats["total_claims"],
+        "today_claims": stats["today_claims"],
+        "daily_claims": stats["daily_claims"],
         "total_facilities": total_facilities,
         "total_patients": total_patients,
         "recent_claims": [
             {
-                "id": str(claim.id),
-                "sep_number": claim.sep.sep_number,
-                "patient_name": claim.patient.name,
-                "facility_name": claim.facility.name,
-                "upload_date": claim.upload_at,
-                "status": claim.status.value
+                "id": str(claim_id),
+                "sep_number": sep_number,
+                "patient_name": patient_name,
+                "facility_name": facility_name,
+                "upload_date": upload_at,
+                "status": status_bucket(status)
             }
-            for claim in recent_claims
+            for claim_id, sep_number, patient_name, facility_name, upload_at, status in recent_claims
         ]
-    }
\ No newline at end of file
+    }
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 import uuid
@@ -6,12 +6,14 @@ from datetime import datetime
 
 from database import get_db
 from services.auth import get_current_user
+from utils.pagination import decode_cursor, next_cursor, NEXT_CURSOR_HEADER, MAX_PAGE_SIZE
 from schemas.user import UserResponse
 from schemas.fraud import (
     FraudDetectionResponse, 
     FraudDetectionCreate, 
     FraudDetectionUpdate,
-    FraudStatsResponse
+    FraudStatsResponse,
+    ClaimTariffScoreResponse
 )
 from repositories.fraud import (
     get_fraud_detections, 
@@ -20,14 +22,26 @@ from repositories.fraud import (
     get_fraud_detections_by_claim, 
     get_user_name_by_id,
     get_fraud_detection,
-    get_fraud_detections_by_risk_level,
     delete_fraud_detection,
     get_fraud_statistics,
-    search_fraud_detections
+    search_fraud_detections,
+    get_tariff_scores
 )
+from repositories.search import SEARCH_ORDER_RELEVANCE, SEARCH_ORDER_RECENT
 
 router = APIRouter()
 
+def _parse_cursor(cursor: Optional[str]):
+    try:
+        return decode_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def _set_next_cursor(response: Response, fraud_detections, limit: int):
+    cursor_next = next_cursor(fraud_detections, limit, "created_at")
+    if cursor_next:
+        response.headers[NEXT_CURSOR_HEADER] = cursor_next
+
 def convert_fraud_to_response(fraud, db: Session = None):
     """Convert SQLAlchemy fraud object to response format"""
     try:
@@ -51,8 +65,10 @@ def convert_fraud_to_response(fraud, db: Session = None):
             if hasattr(fraud.claim, 'facility') and fraud.claim.facility and hasattr(fraud.claim.facility, 'name'):
                 facility_name = fraud.claim.facility.name or "N/A"
         
-        # Access resolver name
-        if hasattr(fraud, 'resolved_by') and fraud.resolved_by and db:
+        # Access resolver name (relasi resolver sudah di-join oleh repository)
+        if getattr(fraud, 'resolver', None) is not None:
+            resolver_name = fraud.resolver.full_name
+        elif hasattr(fraud, 'resolved_by') and fraud.resolved_by and db:
             resolver_name = get_user_name_by_id(db, fraud.resolved_by)
         
         # Normalize values
@@ -119,8 +135,10 @@ def convert_fraud_to_response(fraud, db: Session = None):
 
 @router.get("/", response_model=List[FraudDetectionResponse])
 def read_fraud_detections(
+    response: Response,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description=f"Cursor halaman berikutnya dari header {NEXT_CURSOR_HEADER}"),
     resolved: Optional[bool] = Query(None, description="Filter by resolution status"),
     risk_level: Optional[str] = Query(None, description="Filter by risk level"),
     current_user: UserResponse = Depends(get_current_user),
@@ -128,18 +146,18 @@ def read_fraud_detections(
 ):
     if current_user.role.name not in ["admin", "superadmin", "validator"]:
         raise HTTPException(status_code=403, detail="Not enough permissions")
+    after = _parse_cursor(cursor)
     
-    if risk_level:
-        fraud_detections = get_fraud_detections_by_risk_level(db, risk_level)
-    else:
-        fraud_detections = get_fraud_detections(db, skip=skip, limit=limit, resolved=resolved)
+    fraud_detections = get_fraud_detections(db, skip=skip, limit=limit, resolved=resolved,
+                                            risk_level=risk_level, after=after)
+    _set_next_cursor(response, fraud_detections, limit)
     
     # Convert to response objects
     responses = []
     for fraud in fraud_detections:
-        response = convert_fraud_to_response(fraud, db)
-        if response:
-            responses.append(response)
+        response_item = convert_fraud_to_response(fraud, db)
+        if response_item:
+            responses.append(response_item)
     
     return responses
 
@@ -155,25 +173,75 @@ def get_fraud_statistics(
 
 @router.get("/search", response_model=List[FraudDetectionResponse])
 def search_fraud(
+    response: Response,
     query: str = Query(..., description="Search term"),
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    order: str = Query(SEARCH_ORDER_RELEVANCE, pattern=f"^({SEARCH_ORDER_RELEVANCE}|{SEARCH_ORDER_RECENT})$",
+                       description="relevance: paling relevan dulu; recent: terbaru dulu dengan cursor"),
+    cursor: Optional[str] = Query(None, description=f"Cursor halaman berikutnya dari header {NEXT_CURSOR_HEADER} (order=recent)"),
     current_user: UserResponse = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     if current_user.role.name not in ["admin", "superadmin", "validator"]:
         raise HTTPException(status_code=403, detail="Not enough permissions")
+    after = _parse_cursor(cursor)
     
-    fraud_detections = search_fraud_detections(db, query, skip=skip, limit=limit)
+    fraud_detections = search_fraud_detections(db, query, skip=skip, limit=limit, after=after, order=order)
+    if after or order == SEARCH_ORDER_RECENT:
+        _set_next_cursor(response, fraud_detections, limit)
     
     responses = []
     for fraud in fraud_detections:
-        response = convert_fraud_to_response(fraud, db)
-        if response:
-            responses.append(response)
+        response_item = convert_fraud_to_response(fraud, db)
+        if response_item:
+            responses.append(response_item)
     
     return responses
 
+@router.post("/tariff-scoring")
+def trigger_tariff_scoring(
+    start: Optional[datetime] = Query(None, description="Awal jendela upload_at (inklusif)"),
+    end: Optional[datetime] = Query(None, description="Akhir jendela upload_at (eksklusif)"),
+    current_user: UserResponse = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Jadwalkan scoring anomali tarif seluruh klaim di jendela waktu ke worker.
+    Hanya klaim dengan claimed_amount (diisi saat upload) yang di-score;
+    dokumen SEP/rekam medis tidak memuat nominal, jadi klaim tanpa nominal
+    dilewati dan hasilnya kosong sampai nominal klaim dicatat.
+    """
+    if current_user.role.name not in ["admin", "superadmin"]:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+    from services.claim_processing import enqueue_tariff_scoring
+
+    job = enqueue_tariff_scoring(db, start, end)
+    return {
+        "message": "Tariff scoring dijadwalkan",
+        "job_id": str(job.id),
+        "start": start,
+        "end": end
+    }
+
+@router.get("/tariff-scores", response_model=List[ClaimTariffScoreResponse])
+def read_tariff_scores(
+    skip: int = 0,
+    limit: int = 100,
+    anomalies_only: bool = True,
+    facility_id: Optional[uuid.UUID] = None,
+    diagnosa_code: Optional[str] = None,
+    current_user: UserResponse = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Skor anomali tarif terakhir (kosong jika belum ada klaim dengan claimed_amount)"""
+    if current_user.role.name not in ["admin", "superadmin", "validator"]:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+    return get_tariff_scores(db, skip=skip, limit=limit, anomalies_only=anomalies_only,
+                             facility_id=facility_id, diagnosa_code=diagnosa_code)
+
 @router.get("/claim/{claim_id}", response_model=List[FraudDetectionResponse])
 def read_fraud_detections_by_claim(
     claim_id: uuid.UUID,
@@ -24,16 +24,7 @@ def read_patients(
     # Filter berdasarkan role
     if current_user.role.name in ["uploader", "faskes"]:
         # Hanya pasien dari facility yang sama
-        from models.claim import ClaimSubmission
-        facility_patient_ids = db.query(ClaimSubmission.patient_id).filter(
-            ClaimSubmission.facility_id == current_user.facility_id
-        ).distinct().all()
-        facility_patient_ids = [pid[0] for pid in facility_patient_ids]
-        
-        patients = db.query(Patient).filter(Patient.id.in_(facility_patient_ids))
-        if search:
-            patients = patients.filter(Patient.name.ilike(f"%{search}%"))
-        patients = patients.offset(skip).limit(limit).all()
+        patients = get_patients(db, skip=skip, limit=limit, search=search, facility_id=current_user.facility_id)
     else:
         # Admin dan superadmin bisa lihat semua
         patients = get_patients(db, skip=skip, limit=limit, search=search)
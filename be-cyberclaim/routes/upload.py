@@ -1,11 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, BackgroundTasks, Query, Response
 from sqlalchemy.orm import Session
 import uuid
 import os
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import shutil
 from datetime import datetime
-import asyncio
 import json
 
 from database import get_db, SessionLocal
@@ -17,18 +16,41 @@ from schemas.claim import (
     SimpleClaimUpload, 
     SimpleClaimResponse,
     ClaimStatus,
-    DocumentValidationResponse
+    DocumentValidationResponse,
+    ClaimBatchResponse,
+    ClaimListItemResponse
 )
 from repositories.claim import (
     create_claim_submission, 
     update_claim_status,
     get_claim_by_id,
-    get_pending_verification_claims
+    get_pending_verification_claims,
+    get_pending_verification_claim_ids,
+    add_claim_file
+)
+from repositories.job import get_jobs_by_claim, serialize_job
+from repositories.claim_batch import (
+    create_claim_batch,
+    get_claim_batch,
+    get_claim_batch_progress,
+    get_claim_batch_items
+)
+from utils.upload_limits import MULTIPART_OVERHEAD
+from utils.pagination import decode_cursor, next_cursor, NEXT_CURSOR_HEADER, MAX_PAGE_SIZE
+from utils.file_utils import save_stream_with_checksum, list_archive_members, FileTooLargeError, ArchiveError
+from services.claim_document import ClaimDocument, close_claim_documents, open_archive_documents
+from services.claim_processing import (
+    enqueue_claim_validation,
+    enqueue_fraud_detection,
+    enqueue_fraud_detection_batches,
+    cleanup_extracted_files,
+    group_archive_claims,
+    acquire_validation_slot,
+    release_validation_slot,
+    JOB_CLAIM_VALIDATION,
+    ValidationBusyError
 )
-from utils.file_utils import validate_archive, extract_archive
-from services.fraud_detection import detect_fraud_patterns
 from services.validation import validate_claim_documents
-from services.file_processing import process_claim_files
 from models.claim import ClaimSubmission
 from models.medical import SEP, RekamMedis, Diagnosis, Tindakan, TarifINACBGS
 from models.patient import Patient
@@ -39,6 +61,23 @@ router = APIRouter()
 MAX_RAR_SIZE = 10 * 1024 * 1024  # 10MB
 ALLOWED_EXTENSIONS = {'.rar', '.zip'}
 
+# Upload bulk: satu arsip berisi banyak klaim (folder per klaim / PDF per klaim)
+MAX_BULK_ARCHIVE_SIZE = int(os.getenv("MAX_BULK_ARCHIVE_SIZE", str(1024 * 1024 * 1024)))  # 1GB
+MAX_BULK_CLAIMS = int(os.getenv("MAX_BULK_CLAIMS", "10000"))
+
+# Batas body per endpoint untuk UploadSizeLimitMiddleware (main.py). Pengecekan
+# max_bytes di handler berjalan setelah Starlette men-spool UploadFile; batas
+# ini yang menolak upload besar sebelum body diterima.
+UPLOAD_BODY_LIMITS = {
+    "/api/upload/claim": MAX_RAR_SIZE + MULTIPART_OVERHEAD,
+    "/api/upload/claims/bulk": MAX_BULK_ARCHIVE_SIZE + MULTIPART_OVERHEAD,
+}
+
+# Referensi pasien/SEP/RM sementara sampai data hasil ekstraksi dicocokkan ke DB
+DEFAULT_PATIENT_ID = "518904bd-3b42-48db-9074-51d3a1d9859e"
+DEFAULT_SEP_ID = "c90bf14f-7d0f-466d-b36d-55d4e7401b7f"
+DEFAULT_RM_ID = "033ba96c-d5cf-4ad8-9f82-abd0b7889262"
+
 def safe_uuid(val):
     if val is None:
         return None
@@ -115,210 +154,6 @@ def safe_serialize_validation_data(data: Any) -> Dict[str, Any]:
             "data_type": str(type(data))
         }
 
-# ============================================================
-# BACKGROUND TASKS WRAPPER
-# ============================================================
-
-async def process_claim_validation_wrapper(claim_id: uuid.UUID, extracted_files: List[str]):
-    """
-    Wrapper function untuk background task dengan database session management
-    """
-    db = SessionLocal()
-    try:
-        print(f"🔄 Memulai validasi klaim {claim_id}")
-        print(f"📁 Files to validate: {len(extracted_files)} files")
-        
-        # Validasi dokumen
-        validation_result = validate_claim_documents(extracted_files)
-        
-        if validation_result["valid"]:
-            print(f"✅ Validasi dokumen berhasil untuk klaim {claim_id}")
-            
-            # Process files untuk ekstraksi data lebih detail
-            processing_result = process_claim_files(extracted_files)
-            
-            # Simpan hasil validasi dan update status
-            update_data = {
-                "validation_data": validation_result,
-                "processing_result": processing_result,
-                "validated_at": datetime.utcnow(),
-                "extracted_data": processing_result
-            }
-            
-            # Update status ke MENUNGGU_VERIFIKASI
-            new_status = ClaimStatus.MENUNGGU_VERIFIKASI
-            
-            # Serialize data sebelum menyimpan
-            cleaned_data = safe_serialize_validation_data(update_data)
-            
-            updated_claim = update_claim_status(db, claim_id, new_status, cleaned_data)
-            
-            if updated_claim:
-                print(f"📁 Status klaim {claim_id} diupdate menjadi {new_status.value}")
-                
-                # Lanjutkan ke fraud detection
-                await process_fraud_detection_wrapper(claim_id)
-            else:
-                print(f"❌ Gagal update status klaim {claim_id}")
-            
-        else:
-            print(f"❌ Validasi dokumen gagal untuk klaim {claim_id}")
-            # Update status ke REJECTED (bukan validation_failed)
-            update_data = {
-                "validation_data": validation_result,
-                "validated_at": datetime.utcnow(),
-                "rejection_reason": "Document validation failed during background processing"
-            }
-            
-            # Serialize data sebelum menyimpan
-            cleaned_data = safe_serialize_validation_data(update_data)
-            
-            update_claim_status(db, claim_id, ClaimStatus.REJECTED, cleaned_data)
-            
-    except Exception as e:
-        print(f"🚨 Error processing claim validation: {str(e)}")
-        # Jika error, update status ke REJECTED
-        update_claim_status(db, claim_id, ClaimStatus.REJECTED, {"error": str(e)})
-    finally:
-        db.close()
-
-async def process_claim_validation(claim_id: uuid.UUID, extracted_files: List[str], db: Session):
-    """Background task untuk validasi klaim lengkap"""
-    try:
-        print(f"🔄 Memulai validasi klaim {claim_id}")
-        print(f"📁 Files to validate: {len(extracted_files)} files")
-        
-        # Validasi dokumen
-        validation_result = validate_claim_documents(extracted_files)
-        
-        if validation_result["valid"]:
-            print(f"✅ Validasi dokumen berhasil untuk klaim {claim_id}")
-            
-            # Process files untuk ekstraksi data lebih detail
-            processing_result = process_claim_files(extracted_files)
-            
-            # Simpan hasil validasi dan update status
-            update_data = {
-                "validation_data": validation_result,
-                "processing_result": processing_result,
-                "validated_at": datetime.utcnow(),
-                "extracted_data": processing_result
-            }
-            
-            # Gunakan status yang sesuai
-            new_status = ClaimStatus.MENUNGGU_VERIFIKASI
-            
-            updated_claim = update_claim_status(db, claim_id, new_status, update_data)
-            
-            if updated_claim:
-                print(f"📁 Status klaim {claim_id} diupdate menjadi {new_status.value}")
-                
-                # Lanjutkan ke fraud detection
-                await process_fraud_detection_wrapper(claim_id)
-            else:
-                print(f"❌ Gagal update status klaim {claim_id}")
-            
-        else:
-            print(f"❌ Validasi dokumen gagal untuk klaim {claim_id}")
-            # Update status rejected dengan detail error
-            update_data = {
-                "validation_data": validation_result,
-                "validated_at": datetime.utcnow()
-            }
-            update_claim_status(db, claim_id, ClaimStatus.REJECTED, update_data)
-            
-    except Exception as e:
-        print(f"🚨 Error processing claim validation: {str(e)}")
-        update_claim_status(db, claim_id, ClaimStatus.REJECTED, {"error": str(e)})
-
-async def process_fraud_detection_wrapper(claim_id: uuid.UUID):
-    """
-    Wrapper function untuk fraud detection background task
-    """
-    db = SessionLocal()
-    try:
-        await process_fraud_detection(claim_id, db)
-    except Exception as e:
-        print(f"🚨 Error in fraud detection background task: {str(e)}")
-    finally:
-        db.close()
-
-async def process_fraud_detection(claim_id: uuid.UUID, db: Session):
-    """Background task untuk deteksi fraud"""
-    try:
-        print(f"🕵️ Memulai fraud detection untuk klaim {claim_id}")
-        
-        claim = get_claim_by_id(db, claim_id)
-        if not claim:
-            print(f"❌ Klaim {claim_id} tidak ditemukan")
-            return
-        
-        # Cek status claim sebelum melanjutkan
-        claim.status = ClaimStatus.MENUNGGU_VERIFIKASI
-        if claim.status != ClaimStatus.MENUNGGU_VERIFIKASI:
-            print(f"⚠️ Klaim {claim_id} status bukan MENUNGGU_VERIFIKASI, skip fraud detection. Status: {claim.status}")
-            return
-        
-        # Lakukan pengecekan fraud patterns
-        fraud_detections = detect_fraud_patterns(db, claim_id)
-        
-        # Tentukan status baru berdasarkan hasil fraud detection
-        high_risk_fraud = any(
-            detection.get("risk_level") == "high" and detection.get("confidence", 0) > 0.7
-            for detection in fraud_detections
-        )
-        
-        medium_risk_fraud = any(
-            detection.get("risk_level") == "medium" and detection.get("confidence", 0) > 0.6
-            for detection in fraud_detections
-        )
-        
-        if high_risk_fraud:
-            new_status = ClaimStatus.REJECTED
-            status_message = "REJECTED (High Risk Fraud)"
-        elif medium_risk_fraud:
-            new_status = ClaimStatus.FRAUD_CHECK
-            status_message = "FRAUD_CHECK (Medium Risk)"
-        else:
-            new_status = ClaimStatus.APPROVED
-            status_message = "APPROVED"
-        
-        update_data = {
-            "fraud_detections": fraud_detections,
-            "fraud_checked_at": datetime.utcnow(),
-            "fraud_risk_level": "high" if high_risk_fraud else "medium" if medium_risk_fraud else "low"
-        }
-        
-        # Serialize data sebelum menyimpan
-        cleaned_data = safe_serialize_validation_data(update_data)
-        
-        update_claim_status(db, claim_id, new_status, cleaned_data)
-        print(f"🎯 Fraud detection selesai untuk klaim {claim_id}: {status_message}")
-        
-    except Exception as e:
-        print(f"🚨 Error processing fraud detection: {str(e)}")
-        # Jika error dalam fraud detection, tetap lanjutkan dengan status fraud_check untuk review manual
-        error_data = {
-            "fraud_check_error": str(e),
-            "fraud_checked_at": datetime.utcnow(),
-            "requires_manual_review": True
-        }
-        cleaned_error_data = safe_serialize_validation_data(error_data)
-        update_claim_status(db, claim_id, ClaimStatus.FRAUD_CHECK, cleaned_error_data)
-
-async def cleanup_extracted_files_wrapper(extract_dir: str):
-    """Wrapper untuk cleanup background task"""
-    await cleanup_extracted_files(extract_dir)
-
-async def cleanup_extracted_files(extract_dir: str):
-    """Cleanup extracted files directory"""
-    try:
-        if os.path.exists(extract_dir):
-            shutil.rmtree(extract_dir, ignore_errors=True)
-            print(f"🧹 Directory cleaned up: {extract_dir}")
-    except Exception as e:
-        print(f"⚠️ Cleanup error: {str(e)}")
-
 # ============================================================
 # ROUTES
 # ============================================================
@@ -332,14 +167,31 @@ def get_rm_by_number(db: Session, rm_number: str):
 def get_patient_by_bpjs_number(db: Session, bpjs_number: str):
     return db.query(Patient).filter(Patient.bpjs_number == bpjs_number).first()
 
+async def upload_validation_slot():
+    """
+    Dependency pembatas validasi dokumen paralel. Menunggu slot di event loop,
+    jadi request yang mengantre tidak menahan thread threadpool; 503 hanya
+    jika slot tidak didapat dalam UPLOAD_VALIDATION_WAIT detik.
+    """
+    try:
+        await acquire_validation_slot()
+    except ValidationBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+    try:
+        yield
+    finally:
+        release_validation_slot()
+
 
 
 @router.post("/claim", response_model=SimpleClaimResponse)
-async def upload_claim(
+def upload_claim(
     background_tasks: BackgroundTasks,
     rar_file: UploadFile = File(..., description="File RAR/ZIP berisi dokumen klaim"),
+    claimed_amount: Optional[float] = Form(None, gt=0, description="Total tarif yang ditagihkan faskes (Rupiah), dipakai scoring anomali tarif"),
     current_user: UserResponse = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    _validation_slot: None = Depends(upload_validation_slot)
 ):
     """
     Upload file klaim dalam format RAR/ZIP
@@ -362,6 +214,7 @@ async def upload_claim(
     # Initialize variables to avoid reference errors
     claim_id_value = None
     pdf_files = []
+    documents = []
     initial_status = ClaimStatus.MENUNGGU_VERIFIKASI
     quick_validation_result = {"valid": False, "message": "Validation not completed", "all_results": []}
     
@@ -374,37 +227,31 @@ async def upload_claim(
     file_path = os.path.join(upload_dir, filename)
     
     try:
-        # Simpan file dan validasi ukuran
-        file_size = 0
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(rar_file.file, buffer)
-            file_size = buffer.tell()
+        # Body sudah di-spool Starlette di sini (batas sebelum spool ada di
+        # UploadSizeLimitMiddleware); cek ini hanya menghindari salinan ke uploads/
+        if rar_file.size is not None and rar_file.size > MAX_RAR_SIZE:
+            raise FileTooLargeError(MAX_RAR_SIZE, rar_file.size)
         
-        if file_size > MAX_RAR_SIZE:
-            os.remove(file_path)
-            raise HTTPException(
-                status_code=400, 
-                detail=f"File size exceeds maximum limit of {MAX_RAR_SIZE/1024/1024}MB. Current size: {file_size/1024/1024:.2f}MB"
-            )
+        # Simpan file per chunk sambil menghitung SHA-256, berhenti begitu melewati batas
+        file_size, archive_checksum = save_stream_with_checksum(rar_file.file, file_path, max_bytes=MAX_RAR_SIZE)
         
-        print(f"📁 File disimpan: {file_path} ({file_size/1024/1024:.2f}MB)")
+        print(f"📁 File disimpan: {file_path} ({file_size/1024/1024:.2f}MB, sha256 {archive_checksum[:12]})")
         
-        # Validasi file RAR/ZIP
-        if not validate_archive(file_path):
+        # Baca arsip: ZIP divalidasi (CRC) dan dibaca ke memori dalam satu pass,
+        # RAR divalidasi lalu diekstrak
+        extract_dir = f"uploads/temp/{uuid.uuid4()}"
+        try:
+            documents = open_archive_documents(file_path, extract_dir)
+        except ArchiveError:
             os.remove(file_path)
+            shutil.rmtree(extract_dir, ignore_errors=True)
             raise HTTPException(
                 status_code=400, 
                 detail="Invalid or corrupted archive file"
             )
         
-        # Extract file
-        extract_dir = f"uploads/temp/{uuid.uuid4()}"
-        extracted_files = extract_archive(file_path, extract_dir)
-        
-        print(f"📦 File diekstrak: {len(extracted_files)} files")
-        
         # Validasi ada file PDF
-        pdf_files = [f for f in extracted_files if f.lower().endswith('.pdf')]
+        pdf_files = [doc.filename if isinstance(doc, ClaimDocument) else os.path.basename(doc) for doc in documents]
         if not pdf_files:
             shutil.rmtree(extract_dir, ignore_errors=True)
             os.remove(file_path)
@@ -415,8 +262,8 @@ async def upload_claim(
         
         print(f"📄 PDF files ditemukan: {len(pdf_files)} files")
         
-        # Quick validation structure PDF
-        quick_validation_result = validate_claim_documents(pdf_files)
+        # Quick validation structure PDF (slot validasi dipegang upload_validation_slot)
+        quick_validation_result = validate_claim_documents(documents)
         
         # DEBUG: Print hasil validasi
         print(f"🔍 Quick validation result: {quick_validation_result}")
@@ -442,9 +289,9 @@ async def upload_claim(
         # sep_id = sep_data.get("id")  # atau query SEP jika perlu
         # rm_id = rm_data.get("id")    # atau query RM jika perlu
         
-        patient_id = "518904bd-3b42-48db-9074-51d3a1d9859e"
-        sep_id = "c90bf14f-7d0f-466d-b36d-55d4e7401b7f" # atau query SEP jika perlu
-        rm_id = "033ba96c-d5cf-4ad8-9f82-abd0b7889262"  # atau query RM jika perlu
+        patient_id = DEFAULT_PATIENT_ID
+        sep_id = DEFAULT_SEP_ID  # atau query SEP jika perlu
+        rm_id = DEFAULT_RM_ID    # atau query RM jika perlu
 
         # FIX: Validate that we have the required IDs before creating UUIDs
         if not patient_id:
@@ -455,7 +302,8 @@ async def upload_claim(
             patient_id=safe_uuid(patient_id),
             sep_id=safe_uuid(sep_id),
             rm_id=safe_uuid(rm_id),
-            rar_file_path=file_path
+            rar_file_path=file_path,
+            claimed_amount=claimed_amount
         )
 
 
@@ -469,6 +317,9 @@ async def upload_claim(
         claim_id_value = str(claim.id)
         print(f"🎫 Klaim dibuat dengan ID: {claim_id_value}")
         
+        # Catat arsip klaim beserta checksum yang dihitung saat upload
+        add_claim_file(db, claim.id, "archive", file_path, archive_checksum)
+        
         # Tentukan status awal berdasarkan hasil validasi
         initial_status = ClaimStatus.MENUNGGU_VERIFIKASI if quick_validation_result["valid"] else ClaimStatus.REJECTED
         
@@ -480,26 +331,25 @@ async def upload_claim(
         
         updated_claim = update_claim_status(db, claim.id, initial_status, update_data)
         
-        # Proses validasi lengkap di background hanya jika dokumen valid
+        # Validasi lengkap diproses worker hanya jika dokumen valid;
+        # extracted files dibersihkan oleh worker setelah job selesai
         if quick_validation_result["valid"]:
-            print(f"🔄 Memulai background validation untuk klaim {claim.id}")
-            background_tasks.add_task(
-                process_claim_validation_wrapper, 
-                claim.id, 
-                pdf_files
-            )
+            # PDF yang hanya ada di memori dibaca ulang dari arsip oleh worker
+            disk_files = [] if any(isinstance(doc, ClaimDocument) and doc.in_memory for doc in documents) else [
+                doc.path if isinstance(doc, ClaimDocument) else doc for doc in documents
+            ]
+            job = enqueue_claim_validation(db, claim.id, disk_files, extract_dir)
+            print(f"🔄 Validasi klaim {claim.id} masuk antrean (job {job.id})")
         else:
             print(f"⏸️ Dokumen tidak valid, skip background validation untuk klaim {claim.id}")
-        
-        # Cleanup extracted files setelah proses background dimulai
-        background_tasks.add_task(cleanup_extracted_files_wrapper, extract_dir)
+            background_tasks.add_task(cleanup_extracted_files, extract_dir)
         
         # FIX: Get validation result data for response
         validation_status = "validated" if quick_validation_result["valid"] else "invalid"
         
         return SimpleClaimResponse(
             claim_id=claim_id_value,
-            files=[os.path.basename(f) for f in pdf_files],
+            files=pdf_files,
             message="Claim uploaded successfully with extracted data",
             validation_status=validation_status,
             validation_result=DocumentValidationResponse(
@@ -517,6 +367,11 @@ async def upload_claim(
     except HTTPException:
         # Re-raise HTTP exceptions
         raise
+    except FileTooLargeError as e:
+        raise HTTPException(
+            status_code=400, 
+            detail=f"File size exceeds maximum limit of {MAX_RAR_SIZE/1024/1024}MB. Current size: at least {e.received_bytes/1024/1024:.2f}MB"
+        )
     except Exception as e:
         print(f"🚨 Error in upload_claim: {e}")
         
@@ -530,11 +385,146 @@ async def upload_claim(
             status_code=500, 
             detail=f"Error processing claim: {str(e)}"
         )
+    finally:
+        close_claim_documents(documents)
+        
+@router.post("/claims/bulk", response_model=ClaimBatchResponse)
+def upload_claims_bulk(
+    archive_file: UploadFile = File(..., description="File RAR/ZIP berisi banyak klaim (satu folder atau satu PDF per klaim)"),
+    current_user: UserResponse = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Upload banyak klaim sekaligus dalam satu arsip RAR/ZIP.
+
+    Setiap folder teratas di arsip (atau setiap PDF di root arsip) menjadi satu
+    klaim. Arsip hanya didaftar isinya, tidak dibaca ke memori; semua klaim dibuat
+    dalam satu transaksi dan validasinya dimasukkan ke antrean worker per klaim.
+    Progress dipantau lewat GET /api/upload/batch/{batch_id}.
+    """
+    if not current_user.facility_id:
+        raise HTTPException(
+            status_code=400, 
+            detail="User must be associated with a facility"
+        )
+    
+    file_extension = os.path.splitext(archive_file.filename.lower())[1]
+    if file_extension not in ALLOWED_EXTENSIONS:
+        raise HTTPException(
+            status_code=400, 
+            detail=f"Only {', '.join(ALLOWED_EXTENSIONS)} files are allowed"
+        )
+    
+    upload_dir = f"uploads/claims/{current_user.facility_id}/batches"
+    os.makedirs(upload_dir, exist_ok=True)
+    file_path = os.path.join(upload_dir, f"{uuid.uuid4()}{file_extension}")
+    
+    try:
+        if archive_file.size is not None and archive_file.size > MAX_BULK_ARCHIVE_SIZE:
+            raise FileTooLargeError(MAX_BULK_ARCHIVE_SIZE, archive_file.size)
+        
+        file_size, archive_checksum = save_stream_with_checksum(
+            archive_file.file, file_path, max_bytes=MAX_BULK_ARCHIVE_SIZE
+        )
+        print(f"📁 Arsip bulk disimpan: {file_path} ({file_size/1024/1024:.2f}MB, sha256 {archive_checksum[:12]})")
+        
+        # Hanya daftar member; isi PDF dibaca worker per klaim (CRC diverifikasi saat itu)
+        try:
+            member_names = [name for name, _ in list_archive_members(file_path)]
+        except ArchiveError:
+            raise HTTPException(status_code=400, detail="Invalid or corrupted archive file")
+        
+        claims = group_archive_claims(member_names)
+        if not claims:
+            raise HTTPException(
+                status_code=400, 
+                detail="No PDF files found in archive. Archive must contain PDF documents."
+            )
+        if len(claims) > MAX_BULK_CLAIMS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Archive contains {len(claims)} claims, maximum is {MAX_BULK_CLAIMS} per batch"
+            )
         
+        batch = create_claim_batch(
+            db,
+            facility_id=current_user.facility_id,
+            user_id=current_user.id,
+            archive_path=file_path,
+            archive_checksum=archive_checksum,
+            claims=claims,
+            claim_defaults={
+                "patient_id": safe_uuid(DEFAULT_PATIENT_ID),
+                "sep_id": safe_uuid(DEFAULT_SEP_ID),
+                "rm_id": safe_uuid(DEFAULT_RM_ID)
+            },
+            job_type=JOB_CLAIM_VALIDATION,
+            extract_root="uploads/temp"
+        )
+        print(f"📦 Batch {batch.id}: {batch.total_claims} klaim masuk antrean validasi")
+        
+        return ClaimBatchResponse(
+            batch_id=str(batch.id),
+            total_claims=batch.total_claims,
+            message=f"{batch.total_claims} claims uploaded and queued for validation",
+            status_url=f"/api/upload/batch/{batch.id}"
+        )
+        
+    except HTTPException:
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        raise
+    except FileTooLargeError as e:
+        raise HTTPException(
+            status_code=400, 
+            detail=f"File size exceeds maximum limit of {MAX_BULK_ARCHIVE_SIZE/1024/1024}MB. Current size: at least {e.received_bytes/1024/1024:.2f}MB"
+        )
+    except Exception as e:
+        print(f"🚨 Error in upload_claims_bulk: {e}")
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        raise HTTPException(
+            status_code=500, 
+            detail=f"Error processing claim batch: {str(e)}"
+        )
+
+@router.get("/batch/{batch_id}")
+def get_batch_status(
+    batch_id: str,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    after_position: Optional[int] = Query(None, description="Lanjut setelah posisi ini (next_after_position halaman sebelumnya)"),
+    current_user: UserResponse = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Progress upload bulk: ringkasan per status dan status per klaim
+    (paginasi keyset pada posisi klaim; skip/limit untuk klien lama)
+    """
+    batch = get_claim_batch(db, uuid.UUID(batch_id))
+    if not batch:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    
+    if (current_user.role not in ["admin", "superadmin"] and 
+        batch.facility_id != current_user.facility_id):
+        raise HTTPException(status_code=403, detail="Not authorized to view this batch")
+    
+    items = get_claim_batch_items(db, batch.id, skip=skip, limit=limit, after_position=after_position)
+    
+    return {
+        "batch_id": str(batch.id),
+        "total_claims": batch.total_claims,
+        "created_at": batch.created_at.isoformat() if batch.created_at else None,
+        "progress": get_claim_batch_progress(db, batch.id),
+        "items": items,
+        "next_after_position": items[-1]["position"] if len(items) == limit else None,
+        "skip": skip,
+        "limit": limit
+    }
+
 @router.post("/validate-fraud/{claim_id}")
-async def validate_fraud(
+def validate_fraud(
     claim_id: str,
-    background_tasks: BackgroundTasks,
     current_user: UserResponse = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -560,17 +550,18 @@ async def validate_fraud(
             detail=f"Claim is not in pending verification status. Current status: {claim.status}"
         )
     
-    # Proses fraud detection di background
-    background_tasks.add_task(process_fraud_detection_wrapper, uuid.UUID(claim_id))
+    # Proses fraud detection lewat antrean job
+    job = enqueue_fraud_detection(db, claim.id)
     
     return {
-        "message": "Fraud validation started", 
+        "message": "Fraud validation started" if job else "Fraud validation already queued", 
         "claim_id": claim_id,
+        "job_id": str(job.id) if job else None,
         "status": "processing"
     }
 
 @router.get("/status/{claim_id}")
-async def get_upload_status(
+def get_upload_status(
     claim_id: str,
     current_user: UserResponse = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -603,11 +594,15 @@ async def get_upload_status(
     if hasattr(claim, 'fraud_detections') and claim.fraud_detections:
         response_data["fraud_detections"] = claim.fraud_detections
     
+    # Status job antrean (validasi / fraud detection)
+    jobs = get_jobs_by_claim(db, claim.id)
+    response_data["jobs"] = [serialize_job(job) for job in jobs]
+    response_data["processing"] = any(job["status"] in ("queued", "running") for job in response_data["jobs"])
+    
     return response_data
 
 @router.post("/batch-validate-fraud")
-async def batch_validate_fraud(
-    background_tasks: BackgroundTasks,
+def batch_validate_fraud(
     current_user: UserResponse = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -621,23 +616,50 @@ async def batch_validate_fraud(
             detail="Only admin or verifikator can validate fraud"
         )
     
-    pending_claims = get_pending_verification_claims(db)
+    pending_claim_ids = get_pending_verification_claim_ids(db)
     
-    if not pending_claims:
+    if not pending_claim_ids:
         return {"message": "No pending claims for fraud validation"}
     
-    # Process each claim in background
-    for claim in pending_claims:
-        background_tasks.add_task(process_fraud_detection_wrapper, claim.id)
+    # Klaim diproses per batch (query IN + bulk insert), bukan satu job per klaim
+    jobs = enqueue_fraud_detection_batches(db, pending_claim_ids)
     
     return {
-        "message": f"Fraud validation started for {len(pending_claims)} claims",
-        "claims_processed": len(pending_claims),
+        "message": f"Fraud validation started for {len(pending_claim_ids)} claims",
+        "claims_processed": len(pending_claim_ids),
+        "job_ids": [str(job.id) for job in jobs],
         "status": "batch_processing"
     }
 
+@router.get("/pending", response_model=List[ClaimListItemResponse])
+def list_pending_verification(
+    response: Response,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description=f"Cursor halaman berikutnya dari header {NEXT_CURSOR_HEADER}"),
+    current_user: UserResponse = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Antrean klaim MENUNGGU_VERIFIKASI (terbaru dulu), paginasi cursor
+    """
+    try:
+        after = decode_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    facility_id = None
+    if current_user.role.name in ["uploader", "faskes"]:
+        facility_id = current_user.facility_id
+    
+    claims = get_pending_verification_claims(db, facility_id=facility_id, limit=limit, after=after)
+    cursor_next = next_cursor(claims, limit, "upload_at")
+    if cursor_next:
+        response.headers[NEXT_CURSOR_HEADER] = cursor_next
+    
+    return [ClaimListItemResponse.from_orm_with_relations(claim) for claim in claims]
+
 @router.get("/details/{claim_id}", response_model=ClaimSubmissionResponse)
-async def get_claim_details(
+def get_claim_details(
     claim_id: str,
     current_user: UserResponse = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -657,37 +679,54 @@ async def get_claim_details(
     return ClaimSubmissionResponse.from_orm_with_relations(claim)
 
 @router.post("/quick-validate")
-async def quick_validate_documents(
+def quick_validate_documents(
     files: List[UploadFile] = File(..., description="PDF files untuk validasi cepat"),
-    current_user: UserResponse = Depends(get_current_user)
+    current_user: UserResponse = Depends(get_current_user),
+    _validation_slot: None = Depends(upload_validation_slot)
 ):
     """
     Validasi cepat struktur dokumen tanpa menyimpan ke database
     """
     try:
-        # Simpan file temporary
+        # Simpan file temporary; checksum dihitung saat menulis dan dipakai
+        # langsung sebagai key extraction cache
         temp_files = []
-        for file in files:
-            if not file.filename.lower().endswith('.pdf'):
-                raise HTTPException(
-                    status_code=400, 
-                    detail="Only PDF files are allowed for validation"
-                )
+        documents = []
+        os.makedirs("uploads/temp", exist_ok=True)
+        try:
+            for file in files:
+                if not file.filename.lower().endswith('.pdf'):
+                    raise HTTPException(
+                        status_code=400, 
+                        detail="Only PDF files are allowed for validation"
+                    )
+                
+                temp_path = f"uploads/temp/{uuid.uuid4()}.pdf"
+                try:
+                    _, checksum = save_stream_with_checksum(file.file, temp_path, max_bytes=MAX_RAR_SIZE)
+                except FileTooLargeError:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"File {file.filename} exceeds maximum limit of {MAX_RAR_SIZE/1024/1024}MB"
+                    )
+                temp_files.append(temp_path)
+                
+                try:
+                    documents.append(ClaimDocument(path=temp_path, filename=file.filename, checksum=checksum))
+                except Exception as e:
+                    print(f"[WARNING] Gagal membuka PDF {file.filename}: {e}")
+                    documents.append(temp_path)
             
-            temp_path = f"uploads/temp/{uuid.uuid4()}.pdf"
-            with open(temp_path, "wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
-            temp_files.append(temp_path)
-        
-        # Validasi dokumen
-        validation_result = validate_claim_documents(temp_files)
-        
-        # Cleanup temporary files
-        for temp_file in temp_files:
-            try:
-                os.remove(temp_file)
-            except:
-                pass
+            # Validasi dokumen
+            validation_result = validate_claim_documents(documents)
+        finally:
+            close_claim_documents(documents)
+            # Cleanup temporary files
+            for temp_file in temp_files:
+                try:
+                    os.remove(temp_file)
+                except:
+                    pass
         
         return {
             "valid": validation_result["valid"],
@@ -20,6 +20,7 @@ class ClaimSubmissionBase(BaseModel):
     sep_id: uuid.UUID
     rm_id: uuid.UUID
     rar_file_path: str
+    claimed_amount: Optional[float] = None  # nominal yang ditagihkan faskes (Rupiah)
 
 class ClaimSubmissionCreate(ClaimSubmissionBase):
     pass
@@ -92,6 +93,52 @@ class ClaimSubmissionResponse(ClaimSubmissionBase):
         }
         return cls(**response_data)
 
+# Listing klaim (tabel): tanpa validation_data dan path arsip
+class ClaimListItemResponse(BaseModel):
+    id: uuid.UUID
+    facility_id: uuid.UUID
+    user_id: uuid.UUID
+    patient_id: uuid.UUID
+    sep_id: uuid.UUID
+    rm_id: uuid.UUID
+    upload_at: datetime
+    status: ClaimStatus
+    notes: Optional[str]
+    validated_by: Optional[uuid.UUID]
+    validated_at: Optional[datetime]
+    
+    facility_name: Optional[str] = None
+    user_name: Optional[str] = None
+    patient_name: Optional[str] = None
+    sep_number: Optional[str] = None
+    validator_name: Optional[str] = None
+    claim_files: List[ClaimFilesResponse] = []
+    
+    model_config = ConfigDict(from_attributes=True)
+    
+    @classmethod
+    def from_orm_with_relations(cls, obj):
+        """Sama dengan ClaimSubmissionResponse.from_orm_with_relations untuk kolom listing"""
+        return cls(
+            id=obj.id,
+            facility_id=obj.facility_id,
+            user_id=obj.user_id,
+            patient_id=obj.patient_id,
+            sep_id=obj.sep_id,
+            rm_id=obj.rm_id,
+            upload_at=obj.upload_at,
+            status=obj.status.value if hasattr(obj.status, 'value') else obj.status,
+            notes=obj.notes,
+            validated_by=obj.validated_by,
+            validated_at=obj.validated_at,
+            facility_name=obj.facility.name if obj.facility else None,
+            user_name=obj.user.full_name if obj.user else None,
+            patient_name=obj.patient.name if obj.patient else None,
+            sep_number=obj.sep.sep_number if obj.sep else None,
+            validator_name=obj.validator.full_name if obj.validator else None,
+            claim_files=[ClaimFilesResponse.model_validate(file) for file in obj.claim_files] if obj.claim_files else []
+        )
+
 # Additional Schemas for Document Validation
 class DocumentValidationResponse(BaseModel):
     valid: bool
@@ -120,4 +167,11 @@ class SimpleClaimResponse(BaseModel):
     status: Optional[str] = None  # Status claim di database
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# Bulk upload (satu arsip berisi banyak klaim)
+class ClaimBatchResponse(BaseModel):
+    batch_id: str
+    total_claims: int
+    message: str
+    status_url: str
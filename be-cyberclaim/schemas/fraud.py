@@ -78,4 +78,27 @@ class FraudStatsResponse(BaseModel):
     unresolved_count: int
     by_risk_level: Dict[str, int]
     by_detection_type: Dict[str, int]
-    high_confidence_count: int
\ No newline at end of file
+    high_confidence_count: int
+
+class ClaimTariffScoreResponse(BaseModel):
+    claim_id: uuid.UUID
+    facility_id: Optional[uuid.UUID] = None
+    diagnosa_code: Optional[str] = None
+    claimed_amount: float
+    standard_tariff: Optional[float] = None
+    tariff_ratio: Optional[float] = None
+    diagnosis_claims: Optional[int] = None
+    diagnosis_median: Optional[float] = None
+    diagnosis_robust_z: Optional[float] = None
+    diagnosis_percentile: Optional[float] = None
+    facility_claims: Optional[int] = None
+    facility_median_ratio: Optional[float] = None
+    facility_robust_z: Optional[float] = None
+    facility_percentile: Optional[float] = None
+    anomaly_score: Optional[float] = None
+    is_anomaly: bool
+    run_id: str
+    scored_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
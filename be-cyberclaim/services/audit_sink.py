@@ -0,0 +1,265 @@
+import os
+import json
+import time
+import queue
+import atexit
+import sqlite3
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+
+# ============================================================
+# KONFIGURASI AUDIT SINK
+# ============================================================
+# Hasil validasi tidak lagi ditulis langsung dari request path. Baris
+# dimasukkan ke antrean terbatas lalu ditulis per batch oleh satu thread
+# background lewat satu koneksi SQLite (WAL) yang hidup sepanjang proses.
+# Path database absolut agar semua worker menulis ke file yang sama
+# apa pun working directory-nya.
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+AUDIT_DB_PATH = os.path.abspath(
+    os.getenv("VALIDATION_DB_PATH", os.path.join(BASE_DIR, "validation_results.db"))
+)
+AUDIT_QUEUE_SIZE = int(os.getenv("AUDIT_QUEUE_SIZE", "10000"))
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "200"))
+AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", "1.0"))      # detik
+# Lama maksimal pemanggil menunggu saat antrean penuh sebelum baris dibuang
+AUDIT_ENQUEUE_TIMEOUT = float(os.getenv("AUDIT_ENQUEUE_TIMEOUT", "0.5"))    # detik
+
+VALIDATION_RESULTS_DDL = '''
+    CREATE TABLE IF NOT EXISTS validation_results (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        filename TEXT NOT NULL,
+        file_path TEXT NOT NULL,
+        validation_status TEXT NOT NULL,
+        validation_message TEXT,
+        total_files_processed INTEGER,
+        files_valid INTEGER,
+        files_failed INTEGER,
+        validation_details TEXT,
+        extracted_data TEXT,
+        errors TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+'''
+
+INSERT_SQL = '''
+    INSERT INTO validation_results (
+        filename, file_path, validation_status, validation_message,
+        total_files_processed, files_valid, files_failed,
+        validation_details, extracted_data, errors, created_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+AuditRow = Tuple[Any, ...]
+
+
+def connect_audit_db(path: str = AUDIT_DB_PATH) -> sqlite3.Connection:
+    """Buka database hasil validasi dalam mode WAL dan pastikan tabelnya ada"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    # WAL + NORMAL: commit tidak fsync per transaksi, tetap aman dari korupsi
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(VALIDATION_RESULTS_DDL)
+    conn.commit()
+    return conn
+
+
+def validation_row(validation_result: Dict[str, Any]) -> AuditRow:
+    """
+    Ubah dict hasil validasi menjadi satu baris validation_results.
+    Dilakukan saat enqueue agar perubahan dict oleh pemanggil setelahnya
+    tidak ikut tertulis.
+    """
+    filename = validation_result.get('filename', '')
+    if not filename and 'file_path' in validation_result:
+        filename = os.path.basename(validation_result['file_path'])
+
+    return (
+        filename,
+        validation_result.get('file_path', ''),
+        'SUCCESS' if validation_result.get('valid') else 'FAILED',
+        validation_result.get('message', ''),
+        validation_result.get('total_files_processed', 0),
+        validation_result.get('files_valid', 0),
+        validation_result.get('files_failed', 0),
+        json.dumps(validation_result.get('validation_details', {}), default=str),
+        json.dumps(validation_result.get('extracted_data', {}), default=str),
+        json.dumps(validation_result.get('errors', []), default=str),
+        time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())
+    )
+
+
+class AuditSink:
+    """
+    Penulis hasil validasi ber-batch di thread background.
+
+    `submit` hanya memasukkan baris ke antrean terbatas (`queue_size`). Thread
+    writer mengambil sampai `batch_size` baris sekaligus, atau apa pun yang
+    ada setiap `flush_interval` detik, lalu menulisnya dalam satu transaksi.
+    Jika antrean penuh pemanggil menunggu paling lama `enqueue_timeout` detik
+    (backpressure); setelah itu baris dibuang dan dihitung di `stats()`.
+    """
+
+    def __init__(self, path: str = AUDIT_DB_PATH, queue_size: int = AUDIT_QUEUE_SIZE,
+                 batch_size: int = AUDIT_BATCH_SIZE, flush_interval: float = AUDIT_FLUSH_INTERVAL,
+                 enqueue_timeout: float = AUDIT_ENQUEUE_TIMEOUT):
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self._queue: "queue.Queue[Optional[AuditRow]]" = queue.Queue(maxsize=max(1, queue_size))
+        self._conn: Optional[sqlite3.Connection] = None
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "enqueued": 0,
+            "written": 0,
+            "dropped": 0,
+            "failed": 0,
+            "batches": 0,
+            "blocked_submits": 0,
+            "blocked_ms": 0.0,
+            "max_queue_depth": 0,
+            "last_batch_size": 0,
+            "last_flush_ms": 0.0,
+        }
+
+    # ------------------------------------------------------------
+    # Producer
+    # ------------------------------------------------------------
+    def submit(self, validation_result: Dict[str, Any]) -> bool:
+        """Masukkan hasil validasi ke antrean. False jika antrean penuh dan baris dibuang"""
+        self._ensure_started()
+        row = validation_row(validation_result)
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            start = time.perf_counter()
+            try:
+                self._queue.put(row, timeout=self.enqueue_timeout)
+            except queue.Full:
+                self._count(dropped=1, blocked_submits=1,
+                            blocked_ms=(time.perf_counter() - start) * 1000)
+                print(f"[WARNING] Antrean audit penuh, hasil validasi dibuang: {row[0]}")
+                return False
+            self._count(blocked_submits=1, blocked_ms=(time.perf_counter() - start) * 1000)
+
+        depth = self._queue.qsize()
+        with self._stats_lock:
+            self._stats["enqueued"] += 1
+            if depth > self._stats["max_queue_depth"]:
+                self._stats["max_queue_depth"] = depth
+        return True
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Tunggu sampai semua baris di antrean tertulis (untuk shutdown / script)"""
+        if self._thread is None:
+            return True
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return not self._queue.unfinished_tasks
+
+    def close(self, timeout: float = 10.0):
+        """Tulis sisa antrean lalu hentikan thread writer"""
+        thread = self._thread
+        if thread is None:
+            return
+        self.flush(timeout)
+        self._queue.put(None)
+        thread.join(timeout)
+        self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Metrik antrean untuk monitoring backpressure"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["queue_depth"] = self._queue.qsize()
+        stats["queue_capacity"] = self._queue.maxsize
+        stats["running"] = self._thread is not None and self._thread.is_alive()
+        return stats
+
+    # ------------------------------------------------------------
+    # Writer thread
+    # ------------------------------------------------------------
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+                thread.start()
+                self._thread = thread
+
+    def _count(self, **deltas):
+        with self._stats_lock:
+            for key, value in deltas.items():
+                self._stats[key] += value
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            batch: List[Optional[AuditRow]] = [first]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            rows = [row for row in batch if row is not None]
+            stopping = len(rows) != len(batch)
+            try:
+                if rows:
+                    self._write(rows)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _write(self, rows: List[AuditRow]):
+        start = time.perf_counter()
+        try:
+            if self._conn is None:
+                self._conn = connect_audit_db(self.path)
+            with self._conn:
+                self._conn.executemany(INSERT_SQL, rows)
+        except Exception as e:
+            self._count(failed=len(rows))
+            print(f"[ERROR] Gagal menulis {len(rows)} hasil validasi: {e}")
+            # Koneksi dibuka ulang pada batch berikutnya
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            return
+
+        with self._stats_lock:
+            self._stats["written"] += len(rows)
+            self._stats["batches"] += 1
+            self._stats["last_batch_size"] = len(rows)
+            self._stats["last_flush_ms"] = round((time.perf_counter() - start) * 1000, 2)
+
+
+_sink: Optional[AuditSink] = None
+_sink_lock = threading.Lock()
+
+
+def get_audit_sink() -> AuditSink:
+    """Ambil instance AuditSink global (sisa antrean ditulis saat proses keluar)"""
+    global _sink
+    with _sink_lock:
+        if _sink is None:
+            _sink = AuditSink()
+            atexit.register(_sink.close)
+        return _sink
@@ -1,16 +1,17 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
 
 from database import get_db
-from repositories.user import get_user_by_username
+from repositories.user import get_user_by_username, get_user_for_auth, get_user_cache
 from schemas.user import UserResponse, TokenData
 from utils.security import SECRET_KEY, ALGORITHM, verify_token
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
-async def get_current_user(
+def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
 ) -> UserResponse:
@@ -35,14 +36,31 @@ async def get_current_user(
             role=payload.get("role"),
             facility_id=payload.get("facility_id")
         )
-    except JWTError:
+    except (JWTError, ValidationError):
         raise credentials_exception
     
-    user = get_user_by_username(db, username=token_data.username)
+    # Token ditandatangani server saat login, jadi user_id/role/facility_id di
+    # dalamnya dipercaya; database hanya dibaca jika user belum ada di cache
+    cache = get_user_cache()
+    user = cache.get(token_data.user_id)
     if user is None:
+        if token_data.user_id:
+            db_user = get_user_for_auth(db, token_data.user_id)
+        else:
+            # Token lama tanpa user_id
+            db_user = get_user_by_username(db, username=token_data.username)
+        if db_user is None:
+            raise credentials_exception
+        user = UserResponse.from_orm(db_user)
+        cache.put(user)
+    
+    # Role/faskes yang diubah setelah login membuat token lama tidak berlaku
+    if user.username != token_data.username or (
+        "role" in payload and (token_data.role != user.role.name or token_data.facility_id != user.facility_id)
+    ):
         raise credentials_exception
     
-    return UserResponse.from_orm(user)
+    return user
 
 async def get_current_active_user(current_user: UserResponse = Depends(get_current_user)):
     if not current_user.is_active:
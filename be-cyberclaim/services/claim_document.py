@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import os
+import mmap
+import hashlib
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Tuple, Union
+
+# PyMuPDF & PIL di-import saat dokumen pertama dibuka/di-render
+if TYPE_CHECKING:
+    from PIL import Image
+
+
+class ClaimDocument:
+    """
+    Satu dokumen PDF klaim yang dibuka sekali dan dipakai di seluruh
+    rantai validasi + processing.
+
+    File di-memory-map bila memungkinkan (fallback: PyMuPDF membaca dari path),
+    teks digital per halaman di-cache setelah dibaca pertama kali dan
+    raster halaman dibuat hanya saat diminta.
+    """
+
+    def __init__(self, path: Optional[str] = None, data: Optional[bytes] = None,
+                 filename: Optional[str] = None, checksum: Optional[str] = None):
+        if path is None and data is None:
+            raise ValueError("ClaimDocument membutuhkan path atau data")
+
+        self.path = path or filename or "<memory>"
+        self.filename = filename or os.path.basename(self.path)
+        self._checksum = checksum
+        self._file = None
+        self._mmap = None
+        self._buffer = None
+        self._page_texts: Dict[int, str] = {}
+        # True jika dokumen hanya ada di memori (mis. member ZIP), tanpa file di disk
+        self.in_memory = data is not None
+
+        if data is not None:
+            self._buffer = memoryview(data)
+        else:
+            try:
+                self._file = open(path, "rb")
+                self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+                self._buffer = memoryview(self._mmap)
+            except (ValueError, OSError):
+                # File kosong atau mmap tidak tersedia
+                self._release_buffer()
+
+        import fitz  # PyMuPDF
+
+        try:
+            if self._buffer is not None:
+                self._doc = fitz.open(stream=self._buffer, filetype="pdf")
+            else:
+                self._doc = fitz.open(path)
+        except Exception:
+            self._doc = None
+            self._release_buffer()
+            raise
+
+    @classmethod
+    def open(cls, path: str) -> "ClaimDocument":
+        return cls(path=path)
+
+    # ------------------------------------------------------------
+    # Informasi dokumen
+    # ------------------------------------------------------------
+    @property
+    def page_count(self) -> int:
+        return self._doc.page_count
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        return dict(self._doc.metadata or {})
+
+    @property
+    def checksum(self) -> str:
+        """SHA-256 isi dokumen, dihitung sekali dari buffer yang sudah dipetakan"""
+        if self._checksum is None:
+            if self._buffer is not None:
+                self._checksum = hashlib.sha256(self._buffer).hexdigest()
+            else:
+                from utils.file_utils import calculate_checksum
+                self._checksum = calculate_checksum(self.path)
+        return self._checksum
+
+    # ------------------------------------------------------------
+    # Akses halaman
+    # ------------------------------------------------------------
+    def page_text(self, index: int) -> str:
+        """Teks digital halaman `index` (0-based)"""
+        if index not in self._page_texts:
+            self._page_texts[index] = self._doc.load_page(index).get_text()
+        return self._page_texts[index]
+
+    def page_texts(self) -> List[str]:
+        return [self.page_text(i) for i in range(self.page_count)]
+
+    def page_size(self, index: int) -> Tuple[float, float]:
+        """Ukuran halaman `index` dalam point PDF (lebar, tinggi)"""
+        rect = self._doc.load_page(index).rect
+        return rect.width, rect.height
+
+    def render_page(self, index: int, dpi: int = 300,
+                    clip: Optional[Tuple[float, float, float, float]] = None) -> Image.Image:
+        """
+        Raster halaman `index` pada DPI tertentu. `clip` (x0, y0, x1, y1) dalam
+        point PDF, relatif terhadap pojok kiri atas halaman, membatasi area yang di-render.
+        """
+        import fitz  # PyMuPDF
+        from PIL import Image
+
+        page = self._doc.load_page(index)
+        if clip is not None:
+            x0, y0, x1, y1 = clip
+            origin = page.rect
+            clip = fitz.Rect(origin.x0 + x0, origin.y0 + y0, origin.x0 + x1, origin.y0 + y1) & origin
+        pix = page.get_pixmap(dpi=dpi, alpha=False, clip=clip)
+        mode = "L" if pix.n == 1 else "RGB"
+        return Image.frombytes(mode, (pix.width, pix.height), pix.samples)
+
+    # ------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------
+    def _release_buffer(self):
+        if self._buffer is not None:
+            try:
+                self._buffer.release()
+            except BufferError:
+                pass
+            self._buffer = None
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                pass
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def close(self):
+        if self._doc is not None:
+            self._doc.close()
+            self._doc = None
+        self._release_buffer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __repr__(self):
+        return f"<ClaimDocument {self.filename}>"
+
+
+DocumentSource = Union[str, ClaimDocument]
+
+
+def open_document(source: DocumentSource):
+    """
+    Kembalikan (ClaimDocument, owned). `owned` True jika dokumen dibuka di sini
+    dan harus ditutup oleh pemanggil.
+    """
+    if isinstance(source, ClaimDocument):
+        return source, False
+    return ClaimDocument.open(source), True
+
+
+def open_claim_documents(pdf_files: List[DocumentSource]) -> List[DocumentSource]:
+    """
+    Buka semua PDF klaim sekali untuk dipakai validasi dan processing.
+    File yang gagal dibuka dikembalikan sebagai path agar error-nya
+    dilaporkan oleh validasi seperti biasa. ClaimDocument yang sudah
+    terbuka dipakai apa adanya.
+    """
+    documents = []
+    for pdf_file in pdf_files:
+        if isinstance(pdf_file, ClaimDocument):
+            documents.append(pdf_file)
+            continue
+        try:
+            documents.append(ClaimDocument.open(pdf_file))
+        except Exception as e:
+            print(f"[WARNING] Gagal membuka PDF {pdf_file}: {e}")
+            documents.append(pdf_file)
+    return documents
+
+
+def close_claim_documents(documents: List[DocumentSource]):
+    for document in documents:
+        if not isinstance(document, ClaimDocument):
+            continue
+        try:
+            document.close()
+        except Exception as e:
+            print(f"[WARNING] Gagal menutup dokumen {document.filename}: {e}")
+
+
+def _log_archive_progress(name: str, index: int, total: Optional[int]):
+    print(f"📦 [{index}/{total or '?'}] {name}")
+
+
+def open_archive_documents(archive_path: str, extract_dir: str,
+                           members: Optional[List[str]] = None,
+                           shared_dir: Optional[str] = None) -> List[DocumentSource]:
+    """
+    Buka semua PDF di dalam arsip klaim dalam satu pass.
+
+    ZIP dibaca langsung dengan verifikasi CRC + SHA-256 dan PDF-nya dibuka dari
+    memori; hanya member besar yang di-spill ke `extract_dir`. RAR diekstrak
+    dengan satu kali `unrar x` ke `extract_dir`. `members` membatasi PDF yang dibuka,
+    mis. satu klaim dari arsip bulk; untuk RAR bulk `shared_dir` berisi hasil
+    ekstraksi seluruh arsip (dibuat sekali per batch) dan member dibaca dari sana.
+    Raises ArchiveError jika arsip rusak atau format tidak didukung.
+    """
+    from utils.file_utils import read_zip_members, read_rar_members, extract_rar_shared, ArchiveError
+
+    archive_lower = archive_path.lower()
+    if archive_lower.endswith(".rar") and members and shared_dir:
+        extract_rar_shared(archive_path, shared_dir, progress=_log_archive_progress)
+        documents = []
+        for name in members:
+            path = os.path.join(shared_dir, *name.split("/"))
+            # Nama berasal dari arsip upload: jangan keluar dari shared_dir
+            inside = os.path.realpath(path).startswith(os.path.realpath(shared_dir) + os.sep)
+            if not inside or not os.path.isfile(path):
+                raise ArchiveError(f"Member {name} tidak ditemukan di hasil ekstraksi arsip")
+            try:
+                documents.append(ClaimDocument(path=path))
+            except Exception as e:
+                print(f"[WARNING] Gagal membuka PDF {name}: {e}")
+                documents.append(path)
+        return documents
+
+    if archive_lower.endswith(".zip"):
+        archive_members = read_zip_members(archive_path, spill_dir=extract_dir,
+                                           progress=_log_archive_progress, names=members)
+    elif archive_lower.endswith(".rar"):
+        archive_members = read_rar_members(archive_path, spill_dir=extract_dir,
+                                           progress=_log_archive_progress, names=members)
+    else:
+        raise ArchiveError("Unsupported archive format (only .rar & .zip allowed)")
+
+    documents = []
+    for member in archive_members:
+        try:
+            if member.data is not None:
+                documents.append(ClaimDocument(data=member.data, filename=member.name, checksum=member.checksum))
+            else:
+                documents.append(ClaimDocument(path=member.path, checksum=member.checksum))
+        except Exception as e:
+            print(f"[WARNING] Gagal membuka PDF {member.name}: {e}")
+            documents.append(member.path or member.name)
+    return documents
@@ -0,0 +1,422 @@
+import os
+import uuid
+import shutil
+import asyncio
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from models.claim import ClaimStatus, ClaimSubmission
+from models.job import Job
+from repositories.claim import get_claim_by_id, update_claim_status, update_claims_bulk, safe_serialize_validation_data
+from repositories.job import enqueue_job, has_active_job
+from repositories.claim_batch import count_unfinished_batch_jobs
+from services.fraud_detection import detect_fraud_patterns, detect_fraud_patterns_batch
+from services.validation import validate_claim_documents
+from services.file_processing import process_claim_files
+from services.claim_document import (
+    DocumentSource, open_claim_documents, close_claim_documents, open_archive_documents
+)
+
+# ============================================================
+# KONFIGURASI
+# ============================================================
+# Jumlah request upload yang boleh memvalidasi dokumen (PDF + OCR) bersamaan
+# di proses API. Request lain mengantre di event loop (bukan di thread
+# threadpool anyio) maksimal UPLOAD_VALIDATION_WAIT detik sebelum ditolak 503.
+UPLOAD_VALIDATION_CONCURRENCY = int(os.getenv("UPLOAD_VALIDATION_CONCURRENCY", "2"))
+UPLOAD_VALIDATION_WAIT = float(os.getenv("UPLOAD_VALIDATION_WAIT", "60"))
+
+_validation_slots = asyncio.Semaphore(max(1, UPLOAD_VALIDATION_CONCURRENCY))
+
+
+class ValidationBusyError(Exception):
+    """Semua slot validasi sedang dipakai lebih lama dari batas tunggu"""
+
+
+async def acquire_validation_slot():
+    """
+    Tunggu slot validasi tanpa menahan thread: dipanggil dari dependency async
+    sehingga route sync baru mendapat thread threadpool setelah slot didapat.
+    Pasangkan dengan release_validation_slot().
+    """
+    if UPLOAD_VALIDATION_WAIT <= 0:
+        if _validation_slots.locked():
+            raise ValidationBusyError("Server sedang memproses banyak dokumen, silakan coba lagi")
+        await _validation_slots.acquire()
+        return
+    try:
+        await asyncio.wait_for(_validation_slots.acquire(), timeout=UPLOAD_VALIDATION_WAIT)
+    except asyncio.TimeoutError:
+        raise ValidationBusyError("Server sedang memproses banyak dokumen, silakan coba lagi")
+
+
+def release_validation_slot():
+    _validation_slots.release()
+
+# ============================================================
+# JOB TYPES
+# ============================================================
+JOB_CLAIM_VALIDATION = "claim_validation"
+JOB_FRAUD_DETECTION = "fraud_detection"
+JOB_FRAUD_DETECTION_BATCH = "fraud_detection_batch"
+JOB_TARIFF_SCORING = "tariff_scoring"
+
+# Jumlah klaim per job fraud detection batch
+FRAUD_BATCH_SIZE = int(os.getenv("FRAUD_BATCH_SIZE", "200"))
+
+
+def enqueue_claim_validation(db: Session, claim_id: uuid.UUID, pdf_files: List[str], extract_dir: str = None) -> Job:
+    """Masukkan validasi lengkap klaim ke antrean job"""
+    return enqueue_job(
+        db,
+        JOB_CLAIM_VALIDATION,
+        claim_id=claim_id,
+        payload={"pdf_files": pdf_files, "extract_dir": extract_dir}
+    )
+
+
+def enqueue_fraud_detection(db: Session, claim_id: uuid.UUID) -> Optional[Job]:
+    """Masukkan fraud detection klaim ke antrean, skip jika sudah ada job aktif"""
+    if has_active_job(db, claim_id, JOB_FRAUD_DETECTION):
+        print(f"⏭️ Fraud detection untuk klaim {claim_id} sudah ada di antrean")
+        return None
+    return enqueue_job(db, JOB_FRAUD_DETECTION, claim_id=claim_id)
+
+
+def group_archive_claims(member_names: List[str]) -> List[Tuple[str, List[str]]]:
+    """
+    Kelompokkan PDF di dalam arsip bulk per klaim: setiap folder teratas
+    adalah satu klaim (semua PDF di bawahnya), setiap PDF di root arsip
+    adalah satu klaim sendiri. Urutan mengikuti kemunculan di arsip.
+    """
+    claims: Dict[str, List[str]] = {}
+    for name in member_names:
+        parts = [part for part in name.replace("\\", "/").split("/") if part]
+        # Lewati folder metadata macOS
+        if not parts or parts[0] == "__MACOSX":
+            continue
+        key = parts[0] if len(parts) > 1 else name
+        claims.setdefault(key, []).append(name)
+    return list(claims.items())
+
+
+def enqueue_fraud_detection_batches(db: Session, claim_ids: List[uuid.UUID],
+                                    batch_size: int = FRAUD_BATCH_SIZE) -> List[Job]:
+    """Masukkan fraud detection banyak klaim ke antrean, `batch_size` klaim per job"""
+    jobs = []
+    for start in range(0, len(claim_ids), max(1, batch_size)):
+        chunk = claim_ids[start:start + batch_size]
+        jobs.append(enqueue_job(
+            db,
+            JOB_FRAUD_DETECTION_BATCH,
+            payload={"claim_ids": [str(claim_id) for claim_id in chunk]}
+        ))
+    return jobs
+
+
+def enqueue_tariff_scoring(db: Session, start: Optional[datetime] = None, end: Optional[datetime] = None) -> Job:
+    """Masukkan scoring anomali tarif seluruh populasi klaim [start, end) ke antrean"""
+    return enqueue_job(
+        db,
+        JOB_TARIFF_SCORING,
+        payload={
+            "start": start.isoformat() if start else None,
+            "end": end.isoformat() if end else None
+        }
+    )
+
+
+def cleanup_extracted_files(extract_dir: str):
+    """Cleanup extracted files directory"""
+    try:
+        if extract_dir and os.path.exists(extract_dir):
+            shutil.rmtree(extract_dir, ignore_errors=True)
+            print(f"🧹 Directory cleaned up: {extract_dir}")
+    except Exception as e:
+        print(f"⚠️ Cleanup error: {str(e)}")
+
+# ============================================================
+# PIPELINE VALIDASI & FRAUD DETECTION
+# ============================================================
+
+def process_claim_validation(db: Session, claim_id: uuid.UUID, extracted_files: List[DocumentSource]) -> Dict[str, Any]:
+    """
+    Validasi lengkap klaim. Jika dokumen valid, status menjadi MENUNGGU_VERIFIKASI
+    dan fraud detection dimasukkan ke antrean; jika tidak valid, klaim di-REJECT.
+
+    Exception dibiarkan naik agar job bisa di-retry oleh worker.
+    """
+    print(f"🔄 Memulai validasi klaim {claim_id}")
+    print(f"📁 Files to validate: {len(extracted_files)} files")
+
+    # Buka setiap PDF sekali untuk validasi dan processing
+    documents = open_claim_documents(extracted_files)
+    try:
+        # Validasi dokumen
+        validation_result = validate_claim_documents(documents)
+
+        if validation_result["valid"]:
+            print(f"✅ Validasi dokumen berhasil untuk klaim {claim_id}")
+
+            # Process files untuk ekstraksi data lebih detail
+            processing_result = process_claim_files(documents)
+        else:
+            processing_result = None
+    finally:
+        close_claim_documents(documents)
+
+    if validation_result["valid"]:
+        update_data = {
+            "validation_data": validation_result,
+            "processing_result": processing_result,
+            "validated_at": datetime.utcnow(),
+            "extracted_data": processing_result
+        }
+
+        # Update status ke MENUNGGU_VERIFIKASI
+        new_status = ClaimStatus.MENUNGGU_VERIFIKASI
+        updated_claim = update_claim_status(db, claim_id, new_status, safe_serialize_validation_data(update_data))
+        if not updated_claim:
+            raise Exception(f"Gagal update status klaim {claim_id}")
+
+        print(f"📁 Status klaim {claim_id} diupdate menjadi {new_status.value}")
+
+        # Lanjutkan ke fraud detection lewat antrean
+        enqueue_fraud_detection(db, claim_id)
+        return {"valid": True, "status": new_status.value}
+
+    print(f"❌ Validasi dokumen gagal untuk klaim {claim_id}")
+    update_data = {
+        "validation_data": validation_result,
+        "validated_at": datetime.utcnow(),
+        "rejection_reason": "Document validation failed during background processing"
+    }
+    update_claim_status(db, claim_id, ClaimStatus.REJECTED, safe_serialize_validation_data(update_data))
+    return {"valid": False, "status": ClaimStatus.REJECTED.value}
+
+
+def process_fraud_detection(db: Session, claim_id: uuid.UUID) -> Dict[str, Any]:
+    """
+    Deteksi fraud untuk satu klaim dan tentukan status akhirnya.
+    Exception dibiarkan naik agar job bisa di-retry oleh worker.
+    """
+    print(f"🕵️ Memulai fraud detection untuk klaim {claim_id}")
+
+    claim = get_claim_by_id(db, claim_id)
+    if not claim:
+        print(f"❌ Klaim {claim_id} tidak ditemukan")
+        return {"skipped": True, "reason": "claim not found"}
+
+    # Lakukan pengecekan fraud patterns
+    fraud_detections = detect_fraud_patterns(db, claim_id)
+
+    # Tentukan status baru berdasarkan hasil fraud detection
+    new_status, risk_level, status_message = fraud_outcome(fraud_detections)
+    update_data = with_fraud_result(claim.validation_data, {
+        "fraud_detections": fraud_detections,
+        "fraud_checked_at": datetime.utcnow(),
+        "fraud_risk_level": risk_level
+    })
+
+    update_claim_status(db, claim_id, new_status, safe_serialize_validation_data(update_data))
+    print(f"🎯 Fraud detection selesai untuk klaim {claim_id}: {status_message}")
+    return {"status": new_status.value, "fraud_risk_level": risk_level, "detections": len(fraud_detections)}
+
+
+def with_fraud_result(validation_data: Any, fraud_result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Gabungkan hasil fraud detection ke validation_data yang ada, sehingga data
+    ekstraksi dokumen tetap tersimpan (dipakai pengecekan riwayat klaim berikutnya)
+    """
+    merged = dict(validation_data) if isinstance(validation_data, dict) else {}
+    merged.update(fraud_result)
+    return merged
+
+
+def fraud_outcome(fraud_detections: List[Dict[str, Any]]) -> Tuple[ClaimStatus, str, str]:
+    """Status klaim, tingkat risiko dan pesan status dari hasil fraud detection"""
+    high_risk_fraud = any(
+        detection.get("risk_level") == "high" and detection.get("confidence", 0) > 0.7
+        for detection in fraud_detections
+    )
+
+    medium_risk_fraud = any(
+        detection.get("risk_level") == "medium" and detection.get("confidence", 0) > 0.6
+        for detection in fraud_detections
+    )
+
+    if high_risk_fraud:
+        return ClaimStatus.REJECTED, "high", "REJECTED (High Risk Fraud)"
+    if medium_risk_fraud:
+        return ClaimStatus.FRAUD_CHECK, "medium", "FRAUD_CHECK (Medium Risk)"
+    return ClaimStatus.APPROVED, "low", "APPROVED"
+
+
+def process_fraud_detection_batch(db: Session, claim_ids: List[uuid.UUID]) -> Dict[str, Any]:
+    """
+    Fraud detection untuk banyak klaim: deteksi lewat detect_fraud_patterns_batch,
+    lalu status semua klaim diupdate dengan satu UPDATE executemany.
+    INSERT FraudDetection dan UPDATE status di-commit dalam satu transaksi,
+    sehingga retry job tidak menduplikasi baris deteksi.
+    Exception dibiarkan naik agar job bisa di-retry oleh worker.
+    """
+    print(f"🕵️ Memulai fraud detection batch untuk {len(claim_ids)} klaim")
+    try:
+        results = detect_fraud_patterns_batch(db, claim_ids, commit=False)
+
+        checked_at = datetime.utcnow()
+        updates = []
+        summary: Dict[str, int] = {}
+        for claim_id, fraud_detections in results.items():
+            new_status, risk_level, _ = fraud_outcome(fraud_detections)
+            # Klaim sudah dimuat detect_fraud_patterns_batch (identity map, tanpa query)
+            claim = db.get(ClaimSubmission, claim_id)
+            updates.append({
+                "id": claim_id,
+                "status": new_status,
+                "validated_at": checked_at,
+                "validation_data": safe_serialize_validation_data(with_fraud_result(
+                    claim.validation_data if claim else None, {
+                        "fraud_detections": fraud_detections,
+                        "fraud_checked_at": checked_at,
+                        "fraud_risk_level": risk_level
+                    }
+                ))
+            })
+            summary[new_status.value] = summary.get(new_status.value, 0) + 1
+
+        update_claims_bulk(db, updates, commit=False)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    print(f"🎯 Fraud detection batch selesai: {summary}")
+    return {"claims": len(results), "status_counts": summary}
+
+# ============================================================
+# JOB HANDLERS (dipakai worker.py)
+# ============================================================
+
+def _resolve_documents(db: Session, job: Job) -> List[DocumentSource]:
+    """
+    Ambil dokumen klaim untuk job. Jika payload tidak berisi path PDF di disk
+    (PDF ZIP dibaca di memori saat upload) atau file ekstraksi sudah hilang
+    (mis. worker berjalan di host lain), arsip klaim dibaca ulang.
+    """
+    payload = job.payload or {}
+    pdf_files = payload.get("pdf_files") or []
+    if pdf_files and all(os.path.exists(f) for f in pdf_files):
+        return pdf_files
+
+    # Klaim dari upload bulk: hanya member PDF klaim ini yang dibaca dari arsip batch
+    # (RAR: dari hasil ekstraksi bersama batch, diekstrak sekali oleh job pertama)
+    if payload.get("members"):
+        archive_path = payload.get("archive_path")
+        if not archive_path or not os.path.exists(archive_path):
+            raise Exception("Arsip batch tidak ditemukan untuk diproses")
+        return open_archive_documents(
+            archive_path, payload.get("extract_dir"), members=payload["members"],
+            shared_dir=_batch_extract_dir(payload)
+        )
+
+    claim = get_claim_by_id(db, job.claim_id)
+    if not claim or not claim.rar_file_path or not os.path.exists(claim.rar_file_path):
+        raise Exception("File klaim tidak ditemukan untuk diproses ulang")
+
+    extract_dir = payload.get("extract_dir") or f"uploads/temp/{uuid.uuid4()}"
+    documents = open_archive_documents(claim.rar_file_path, extract_dir)
+    print(f"📦 Arsip klaim {job.claim_id} dibaca ulang: {len(documents)} PDF")
+    return documents
+
+
+def _batch_extract_dir(payload: Dict[str, Any]) -> Optional[str]:
+    """Direktori ekstraksi bersama batch; job lama tanpa key diturunkan dari extract_dir"""
+    if payload.get("archive_extract_dir"):
+        return payload["archive_extract_dir"]
+    if payload.get("batch_id") and payload.get("extract_dir"):
+        return os.path.join(os.path.dirname(payload["extract_dir"]), "archive")
+    return None
+
+
+def _cleanup_batch_extraction(db: Session, job: Job):
+    """Hapus ekstraksi bersama batch setelah job validasi terakhirnya selesai"""
+    payload = job.payload or {}
+    shared_dir = _batch_extract_dir(payload)
+    if not shared_dir or not os.path.exists(shared_dir):
+        return
+    if count_unfinished_batch_jobs(db, uuid.UUID(payload["batch_id"]), exclude_job_id=job.id) == 0:
+        cleanup_extracted_files(shared_dir)
+
+
+def run_claim_validation_job(db: Session, job: Job) -> Dict[str, Any]:
+    result = process_claim_validation(db, job.claim_id, _resolve_documents(db, job))
+    cleanup_extracted_files((job.payload or {}).get("extract_dir"))
+    _cleanup_batch_extraction(db, job)
+    return result
+
+
+def on_claim_validation_failed(db: Session, job: Job):
+    """Retry habis: klaim di-REJECT dengan error terakhir"""
+    update_claim_status(db, job.claim_id, ClaimStatus.REJECTED, {"error": job.last_error})
+    cleanup_extracted_files((job.payload or {}).get("extract_dir"))
+    _cleanup_batch_extraction(db, job)
+
+
+def run_fraud_detection_job(db: Session, job: Job) -> Dict[str, Any]:
+    return process_fraud_detection(db, job.claim_id)
+
+
+def on_fraud_detection_failed(db: Session, job: Job):
+    """Retry habis: klaim masuk FRAUD_CHECK untuk review manual"""
+    error_data = {
+        "fraud_check_error": job.last_error,
+        "fraud_checked_at": datetime.utcnow(),
+        "requires_manual_review": True
+    }
+    update_claim_status(db, job.claim_id, ClaimStatus.FRAUD_CHECK, safe_serialize_validation_data(error_data))
+
+
+def _batch_claim_ids(job: Job) -> List[uuid.UUID]:
+    return [uuid.UUID(claim_id) for claim_id in (job.payload or {}).get("claim_ids", [])]
+
+
+def run_fraud_detection_batch_job(db: Session, job: Job) -> Dict[str, Any]:
+    return process_fraud_detection_batch(db, _batch_claim_ids(job))
+
+
+def on_fraud_detection_batch_failed(db: Session, job: Job):
+    """Retry habis: semua klaim di batch masuk FRAUD_CHECK untuk review manual"""
+    checked_at = datetime.utcnow()
+    error_data = safe_serialize_validation_data({
+        "fraud_check_error": job.last_error,
+        "fraud_checked_at": checked_at,
+        "requires_manual_review": True
+    })
+    update_claims_bulk(db, [
+        {"id": claim_id, "status": ClaimStatus.FRAUD_CHECK, "validation_data": error_data}
+        for claim_id in _batch_claim_ids(job)
+    ])
+
+
+def run_tariff_scoring_job(db: Session, job: Job) -> Dict[str, Any]:
+    from services.tariff_scoring import run_tariff_scoring
+
+    payload = job.payload or {}
+    start = datetime.fromisoformat(payload["start"]) if payload.get("start") else None
+    end = datetime.fromisoformat(payload["end"]) if payload.get("end") else None
+    return run_tariff_scoring(db, start, end)
+
+
+def on_tariff_scoring_failed(db: Session, job: Job):
+    """Retry habis: skor run sebelumnya tetap dipakai"""
+    print(f"[ERROR] Tariff scoring job {job.id} gagal: {job.last_error}")
+
+
+JOB_HANDLERS = {
+    JOB_CLAIM_VALIDATION: {"run": run_claim_validation_job, "on_failure": on_claim_validation_failed},
+    JOB_FRAUD_DETECTION: {"run": run_fraud_detection_job, "on_failure": on_fraud_detection_failed},
+    JOB_FRAUD_DETECTION_BATCH: {"run": run_fraud_detection_batch_job, "on_failure": on_fraud_detection_batch_failed},
+    JOB_TARIFF_SCORING: {"run": run_tariff_scoring_job, "on_failure": on_tariff_scoring_failed},
+}
@@ -0,0 +1,142 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import Dict, Any, List, Optional
+
+# ============================================================
+# KONFIGURASI EXTRACTION CACHE
+# ============================================================
+# Naikkan versi ini jika cara ekstraksi/OCR berubah agar entri lama diabaikan
+EXTRACTION_ENGINE_VERSION = "fitz-tesseract-roi-3"
+
+CACHE_PATH = os.getenv(
+    "EXTRACTION_CACHE_PATH",
+    os.path.join(os.getenv("UPLOAD_DIR", "uploads"), "cache", "extraction_cache.db")
+)
+CACHE_MAX_BYTES = int(os.getenv("EXTRACTION_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))  # 256MB
+
+
+class ExtractionCache:
+    """
+    Cache persisten hasil ekstraksi teks PDF, dikunci dengan SHA-256 file.
+
+    Setiap entri menyimpan teks per halaman, metode ekstraksi per halaman
+    ("digital" atau "ocr") dan versi engine. Ukuran total dibatasi `max_bytes`,
+    entri yang paling lama tidak diakses dihapus lebih dulu (LRU).
+    """
+
+    def __init__(self, path: str = CACHE_PATH, max_bytes: int = CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS extraction_cache (
+                    checksum TEXT PRIMARY KEY,
+                    engine_version TEXT NOT NULL,
+                    pages TEXT NOT NULL,
+                    methods TEXT NOT NULL,
+                    size_bytes INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            ''')
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_extraction_cache_last_access "
+                "ON extraction_cache (last_access)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(self, checksum: str) -> Optional[Dict[str, Any]]:
+        """Ambil hasil ekstraksi dari cache, None jika tidak ada atau versi engine berbeda"""
+        if not checksum:
+            return None
+        try:
+            with self._lock:
+                conn = self._connect()
+                row = conn.execute(
+                    "SELECT engine_version, pages, methods FROM extraction_cache WHERE checksum = ?",
+                    (checksum,)
+                ).fetchone()
+                if row is None or row[0] != EXTRACTION_ENGINE_VERSION:
+                    return None
+                conn.execute(
+                    "UPDATE extraction_cache SET last_access = ? WHERE checksum = ?",
+                    (time.time(), checksum)
+                )
+                conn.commit()
+            return {
+                "checksum": checksum,
+                "engine_version": row[0],
+                "pages": json.loads(row[1]),
+                "methods": json.loads(row[2])
+            }
+        except Exception as e:
+            print(f"[WARNING] Gagal membaca extraction cache: {e}")
+            return None
+
+    def put(self, checksum: str, pages: List[str], methods: List[str]) -> bool:
+        """Simpan hasil ekstraksi ke cache lalu jalankan eviction LRU jika perlu"""
+        if not checksum:
+            return False
+        try:
+            pages_json = json.dumps(pages)
+            methods_json = json.dumps(methods)
+            size_bytes = len(pages_json.encode("utf-8")) + len(methods_json)
+            now = time.time()
+            with self._lock:
+                conn = self._connect()
+                conn.execute('''
+                    INSERT OR REPLACE INTO extraction_cache (
+                        checksum, engine_version, pages, methods,
+                        size_bytes, created_at, last_access
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', (checksum, EXTRACTION_ENGINE_VERSION, pages_json, methods_json, size_bytes, now, now))
+                self._evict(conn)
+                conn.commit()
+            return True
+        except Exception as e:
+            print(f"[WARNING] Gagal menyimpan extraction cache: {e}")
+            return False
+
+    def _evict(self, conn: sqlite3.Connection):
+        total = conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM extraction_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        rows = conn.execute(
+            "SELECT checksum, size_bytes FROM extraction_cache ORDER BY last_access ASC"
+        ).fetchall()
+        evicted = []
+        for checksum, size_bytes in rows:
+            if total <= self.max_bytes:
+                break
+            evicted.append((checksum,))
+            total -= size_bytes
+        conn.executemany("DELETE FROM extraction_cache WHERE checksum = ?", evicted)
+        print(f"[INFO] Extraction cache eviction: {len(evicted)} entri dihapus")
+
+
+_cache: Optional[ExtractionCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_extraction_cache() -> ExtractionCache:
+    """Ambil instance ExtractionCache global"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ExtractionCache()
+        return _cache
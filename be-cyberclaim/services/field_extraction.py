@@ -0,0 +1,208 @@
+import re
+from typing import Dict, List, Optional, Tuple, Union
+
+# ============================================================
+# FIELD EXTRACTION ENGINE
+# ============================================================
+# Setiap jenis dokumen mendeklarasikan field-nya sekali dan pattern-nya
+# dikompilasi saat import. Teks halaman di-casefold satu kali; setiap pattern
+# alternatif hanya dicoba (`match`) di posisi kemunculan prefix literalnya
+# yang dicari dengan str.find, bukan di setiap karakter halaman.
+
+FIRST = "first"   # alternatif pertama (urutan deklarasi) yang cocok, kemunculan pertamanya
+ALL = "all"       # semua kemunculan setiap alternatif (seperti findall per pattern)
+
+Groups = Tuple[Optional[str], ...]
+FieldResult = Union[Optional[Groups], List[Groups]]
+
+# Karakter yang cocok dengan huruf ASCII pada re.IGNORECASE tetapi lower()-nya bukan huruf itu
+_FOLD_FIXES = str.maketrans({"ı": "i", "ſ": "s"})
+# Escape yang mewakili satu karakter literal
+_LITERAL_ESCAPES = set(".-:/()[]{}?*+|^$\\ ")
+
+
+def fold_text(text: str) -> Optional[str]:
+    """
+    Salinan huruf kecil halaman dengan indeks yang sama dengan teks asli,
+    dipakai untuk mencari prefix literal pattern IGNORECASE. None jika
+    lower() mengubah panjang teks (indeks tidak lagi sejajar).
+    """
+    folded = text.lower()
+    if not folded.isascii():
+        folded = folded.translate(_FOLD_FIXES)
+    return folded if len(folded) == len(text) else None
+
+
+def _has_top_level_alternation(pattern: str) -> bool:
+    depth = 0
+    in_class = False
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "\\":
+            i += 2
+            continue
+        if in_class:
+            in_class = c != "]"
+        elif c == "[":
+            in_class = True
+            # ']' tepat setelah '[' atau '[^' adalah anggota class
+            if pattern[i + 1:i + 2] == "^":
+                i += 1
+            if pattern[i + 1:i + 2] == "]":
+                i += 1
+        elif c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+        elif c == "|" and depth == 0:
+            return True
+        i += 1
+    return False
+
+
+def literal_prefix(pattern: str) -> str:
+    """
+    Prefix literal wajib dari sebuah pattern, mis. 'No\\.?SEP\\s*:' -> 'No'.
+    String kosong jika pattern diawali class/grup/escape non-literal atau
+    punya alternation `|` di level teratas.
+    """
+    if _has_top_level_alternation(pattern):
+        return ""
+    chars = []
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "\\":
+            if i + 1 >= len(pattern) or pattern[i + 1] not in _LITERAL_ESCAPES:
+                break
+            literal, i = pattern[i + 1], i + 2
+        elif c.isalnum() or c in " :-/,":
+            literal, i = c, i + 1
+        else:
+            break
+        # Karakter dengan quantifier opsional bukan bagian prefix wajib
+        if i < len(pattern) and pattern[i] in "?*{":
+            break
+        chars.append(literal)
+        if i < len(pattern) and pattern[i] == "+":
+            break
+    return "".join(chars)
+
+
+class _Alternative:
+    __slots__ = ("regex", "literal", "ignorecase", "whole")
+
+    def __init__(self, pattern: str, flags: int):
+        self.regex = re.compile(pattern, flags)
+        self.ignorecase = bool(flags & re.IGNORECASE)
+        literal = literal_prefix(pattern)
+        self.literal = literal.lower() if self.ignorecase else literal
+        # Tanpa grup, hasil berupa seluruh teks match (seperti findall)
+        self.whole = self.regex.groups == 0
+
+    def groups(self, match: re.Match) -> Groups:
+        return (match.group(0),) if self.whole else match.groups()
+
+    def _haystack(self, text: str, folded: Optional[str]) -> Optional[str]:
+        if not self.literal:
+            return None
+        return folded if self.ignorecase else text
+
+    def first(self, text: str, folded: Optional[str]) -> Optional[re.Match]:
+        haystack = self._haystack(text, folded)
+        if haystack is None:
+            return self.regex.search(text)
+        literal, match_at = self.literal, self.regex.match
+        pos = haystack.find(literal)
+        while pos != -1:
+            match = match_at(text, pos)
+            if match:
+                return match
+            pos = haystack.find(literal, pos + 1)
+        return None
+
+    def all(self, text: str, folded: Optional[str]) -> List[re.Match]:
+        haystack = self._haystack(text, folded)
+        if haystack is None:
+            return list(self.regex.finditer(text))
+        matches = []
+        literal, match_at = self.literal, self.regex.match
+        pos = haystack.find(literal)
+        while pos != -1:
+            match = match_at(text, pos)
+            if match:
+                matches.append(match)
+                # Non-overlapping seperti findall; prefix literal tidak pernah kosong
+                pos = haystack.find(literal, match.end())
+            else:
+                pos = haystack.find(literal, pos + 1)
+        return matches
+
+
+class FieldSpec:
+    """
+    Deklarasi satu field: daftar pattern alternatif berurutan prioritas.
+
+    mode FIRST: sama dengan `re.search` tiap pattern secara berurutan, ambil
+    yang pertama cocok. mode ALL: sama dengan `re.findall` tiap pattern,
+    hasil digabung sesuai urutan pattern.
+
+    Hasil berupa tuple isi grup pattern (atau seluruh teks match jika pattern
+    tidak punya grup). Field `on_demand` tidak ikut DocumentSpec.extract dan
+    hanya di-scan jika dipanggil langsung, mis. untuk fallback.
+    """
+
+    def __init__(self, name: str, patterns: List[str], flags: int = re.IGNORECASE,
+                 mode: str = FIRST, on_demand: bool = False):
+        if mode not in (FIRST, ALL):
+            raise ValueError(f"Mode field tidak dikenal: {mode}")
+        self.name = name
+        self.patterns = list(patterns)
+        self.flags = flags
+        self.mode = mode
+        self.on_demand = on_demand
+        self._alternatives = [_Alternative(p, flags) for p in self.patterns]
+
+    def first(self, text: str, folded: Optional[str] = None) -> Optional[Groups]:
+        if folded is None:
+            folded = fold_text(text)
+        for alternative in self._alternatives:
+            match = alternative.first(text, folded)
+            if match:
+                return alternative.groups(match)
+        return None
+
+    def all(self, text: str, folded: Optional[str] = None) -> List[Groups]:
+        if folded is None:
+            folded = fold_text(text)
+        return [
+            alternative.groups(match)
+            for alternative in self._alternatives
+            for match in alternative.all(text, folded)
+        ]
+
+    def extract(self, text: str, folded: Optional[str] = None) -> FieldResult:
+        if self.mode == FIRST:
+            return self.first(text, folded)
+        return self.all(text, folded)
+
+
+class DocumentSpec:
+    """Kumpulan field untuk satu jenis dokumen (SEP, rujukan, rekam medis)"""
+
+    def __init__(self, name: str, fields: List[FieldSpec]):
+        self.name = name
+        self.fields = {field.name: field for field in fields}
+
+    def extract(self, text: str) -> Dict[str, FieldResult]:
+        """Ekstrak semua field (kecuali on_demand) dari satu halaman"""
+        folded = fold_text(text)
+        return {
+            name: field.extract(text, folded)
+            for name, field in self.fields.items()
+            if not field.on_demand
+        }
+
+    def __getitem__(self, name: str) -> FieldSpec:
+        return self.fields[name]
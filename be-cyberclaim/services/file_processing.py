@@ -1,14 +1,18 @@
 import os
 import hashlib
-from typing import List, Dict, Any
-import PyPDF2
+from typing import List, Dict, Any, Optional
 import tempfile
 
+from services.extraction_cache import get_extraction_cache
+from utils.file_utils import CHUNK_SIZE
+from services.claim_document import ClaimDocument, DocumentSource, open_document
+from services.validation import page_has_text
+
 def calculate_checksum(file_path: str) -> str:
     """Calculate SHA256 checksum of a file"""
     sha256_hash = hashlib.sha256()
     with open(file_path, "rb") as f:
-        for byte_block in iter(lambda: f.read(4096), b""):
+        for byte_block in iter(lambda: f.read(CHUNK_SIZE), b""):
             sha256_hash.update(byte_block)
     return sha256_hash.hexdigest()
 
@@ -21,20 +25,33 @@ def get_file_size(file_path: str) -> int:
     """Get file size in bytes"""
     return os.path.getsize(file_path)
 
-def extract_pdf_pages(pdf_path: str) -> Dict[str, str]:
+def extract_pdf_pages(pdf: DocumentSource, checksum: Optional[str] = None) -> Dict[str, str]:
     """
     Extract text from PDF and separate by pages
     Returns dict with page texts
+
+    The extraction cache (keyed by SHA-256) is consulted first, so files that
+    were already read during validation are not parsed again. On a miss the
+    result is stored only when every page has digital text: scanned pages are
+    not OCR'd here, and caching their empty text would make read_pages skip OCR.
+    An already opened ClaimDocument is reused as-is.
     """
     try:
-        with open(pdf_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            
-            pages_text = {}
-            for i, page in enumerate(pdf_reader.pages):
-                pages_text[f"page_{i+1}"] = page.extract_text()
+        doc, owned = open_document(pdf)
+        try:
+            cache = get_extraction_cache()
+            key = checksum or doc.checksum
+            cached = cache.get(key)
+            if cached:
+                return {f"page_{i+1}": text for i, text in enumerate(cached["pages"])}
             
-            return pages_text
+            pages = doc.page_texts()
+            if pages and all(page_has_text(text) for text in pages):
+                cache.put(key, pages, ["digital"] * len(pages))
+            return {f"page_{i+1}": text for i, text in enumerate(pages)}
+        finally:
+            if owned:
+                doc.close()
     except Exception as e:
         raise Exception(f"Failed to extract PDF pages: {str(e)}")
 
@@ -79,21 +96,30 @@ def identify_document_pages(pages_text: Dict[str, str]) -> Dict[str, Any]:
     
     return identified_pages
 
-def process_claim_files(pdf_files: List[str]) -> Dict[str, Any]:
+def process_claim_files(pdf_files: List[DocumentSource]) -> Dict[str, Any]:
     """
     Process claim PDF files and identify document structure
     """
     processing_results = {}
     
     for pdf_file in pdf_files:
+        file_path = pdf_file.path if isinstance(pdf_file, ClaimDocument) else pdf_file
         try:
-            # Extract pages from PDF
-            pages_text = extract_pdf_pages(pdf_file)
+            doc, owned = open_document(pdf_file)
+            try:
+                checksum = doc.checksum
+                
+                # Extract pages from PDF (cached by checksum)
+                pages_text = extract_pdf_pages(doc, checksum=checksum)
+            finally:
+                if owned:
+                    doc.close()
             
             # Identify document types in pages
             identified_docs = identify_document_pages(pages_text)
             
-            processing_results[pdf_file] = {
+            processing_results[file_path] = {
+                "checksum": checksum,
                 "total_pages": len(pages_text),
                 "identified_documents": identified_docs,
                 "pages_text": pages_text,
@@ -101,9 +127,9 @@ def process_claim_files(pdf_files: List[str]) -> Dict[str, Any]:
             }
             
         except Exception as e:
-            processing_results[pdf_file] = {
+            processing_results[file_path] = {
                 "processing_success": False,
                 "error": str(e)
             }
     
-    return processing_results
\ No newline at end of file
+    return processing_results
@@ -1,26 +1,195 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Iterable
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
 import uuid
 from schemas.claim import ClaimStatus
 
+# ============================================================
+# PREFETCH DATA FRAUD DETECTION
+# ============================================================
+# Semua data referensi yang dibutuhkan keempat pengecekan (pasien, dokter
+# DPJP, tarif, riwayat klaim pasien) diambil sekali per batch klaim dengan
+# query IN, lalu pengecekan berjalan di memori tanpa query per klaim.
+
+def _first_code(entries) -> Optional[str]:
+    """Kode ICD pertama dari daftar diagnosa hasil ekstraksi ({'kode': ...})"""
+    for entry in entries or []:
+        if isinstance(entry, dict) and entry.get("kode"):
+            return entry["kode"]
+    return None
+
+def get_extracted_data(claim) -> Dict[str, Any]:
+    """
+    Data hasil ekstraksi dokumen klaim dalam format yang dipakai pengecekan
+    fraud ({"sep", "rekam_medis", "rujukan"}), kosong jika belum ada.
+
+    Sumbernya hasil validasi yang disimpan process_claim_validation di
+    validation_data["validation_data"]["all_results"][*]["extracted_data"]
+    (field SEP/rujukan/rekam medis per file PDF); file pertama yang punya
+    data ekstraksi dipakai.
+    """
+    validation_data = getattr(claim, "validation_data", None)
+    if not isinstance(validation_data, dict):
+        return {}
+    document_validation = validation_data.get("validation_data") or {}
+    results = document_validation.get("all_results") or document_validation.get("valid_files") or []
+
+    extracted = next(
+        (result["extracted_data"] for result in results
+         if isinstance(result, dict) and result.get("extracted_data")),
+        None
+    )
+    if not extracted:
+        return {}
+
+    sep = extracted.get("sep") or {}
+    rm = extracted.get("rekam_medis") or {}
+    rujukan = extracted.get("rujukan") or {}
+    return {
+        "sep": {
+            "no_sep": sep.get("no_sep"),
+            "tgl_sep": sep.get("tgl_sep"),
+            "nama_pasien": sep.get("nama_pasien"),
+            "diagnosa": _first_code(sep.get("diagnosa")),
+        },
+        "rekam_medis": {
+            "no_rekam_medis": rm.get("no_rekam_medis"),
+            "nama_pasien": rm.get("nama_pasien_rm"),
+            "dokter_dpjp": rm.get("dokter_dpip"),
+            "diagnosa": _first_code(rm.get("diagnosa_rm")),
+            "tindakan": [t["kode_icd9"] for t in rm.get("tindakan_medis") or [] if t.get("kode_icd9")],
+        },
+        "rujukan": {
+            "no_rujukan": rujukan.get("no_rujukan"),
+            "diagnosa": _first_code(rujukan.get("diagnosa_rujukan")),
+        },
+    }
+
+
+class FraudLookups:
+    """Data referensi untuk sekumpulan klaim, hasil prefetch"""
+
+    def __init__(self, patients: Dict[uuid.UUID, Any] = None, doctors: Dict[str, Any] = None,
+                 tariffs: Dict[str, List[Any]] = None, histories: Dict[uuid.UUID, List[Any]] = None):
+        self.patients = patients or {}
+        self.doctors = doctors or {}
+        self.tariffs = tariffs or {}
+        self.histories = histories or {}
+
+    @classmethod
+    def prefetch(cls, db: Session, claims: List[Any], history_limit: int = 10) -> "FraudLookups":
+        """
+        Satu query IN untuk pasien, dokter, riwayat klaim, dan tarif semua
+        diagnosa (klaim ini maupun klaim sebelumnya di riwayat)
+        """
+        from repositories.patient import get_patients_by_ids
+        from repositories.doctor import get_doctors_by_names
+        from repositories.tariff import get_tariffs_by_diagnoses
+        from repositories.claim import get_patient_claim_histories
+
+        patient_ids = [claim.patient_id for claim in claims if claim.patient_id]
+        doctor_names = []
+        diagnoses = []
+        for claim in claims:
+            rm_data = get_extracted_data(claim).get("rekam_medis") or {}
+            doctor_names.append(rm_data.get("dokter_dpjp"))
+            diagnoses.append(rm_data.get("diagnosa"))
+
+        histories = get_patient_claim_histories(db, patient_ids, limit=history_limit)
+        for history in histories.values():
+            for previous in history:
+                diagnoses.append((get_extracted_data(previous).get("rekam_medis") or {}).get("diagnosa"))
+
+        return cls(
+            patients=get_patients_by_ids(db, patient_ids),
+            doctors=get_doctors_by_names(db, doctor_names),
+            tariffs=get_tariffs_by_diagnoses(db, diagnoses),
+            histories=histories
+        )
+
+    def patient(self, patient_id):
+        return self.patients.get(patient_id)
+
+    def doctor(self, name: str):
+        return self.doctors.get(name.strip().lower()) if name else None
+
+    def tariff(self, diagnosis_code: str, procedure_code: Optional[str] = None):
+        """Sama dengan get_tariff_by_diagnosis_procedure: tanpa procedure hanya tarif aktif"""
+        tariffs = self.tariffs.get(diagnosis_code) or []
+        if not procedure_code:
+            tariffs = [tariff for tariff in tariffs if tariff.is_active]
+        return tariffs[0] if tariffs else None
+
+    def tariff_by_diagnosis(self, diagnosis_code: str):
+        """Sama dengan get_tariff_by_diagnosis"""
+        tariffs = self.tariffs.get(diagnosis_code) or []
+        return tariffs[0] if tariffs else None
+
+    def history(self, patient_id) -> List[Any]:
+        return self.histories.get(patient_id, [])
+
+# ============================================================
+# FRAUD DETECTION
+# ============================================================
+
 def detect_fraud_patterns(db: Session, claim_id: uuid.UUID) -> List[Dict[str, Any]]:
     """
     Detect various fraud patterns in a claim sesuai spesifikasi
     """
-    fraud_detections = []
-    
-    # Get claim data
-    from repositories.claim import get_claim
-    from repositories.fraud import create_fraud_detection
+    return detect_fraud_patterns_batch(db, [claim_id]).get(claim_id, [])
+
+def detect_fraud_patterns_batch(db: Session, claim_ids: Iterable[uuid.UUID], commit: bool = True) -> Dict[uuid.UUID, List[Dict[str, Any]]]:
+    """
+    Deteksi fraud untuk banyak klaim sekaligus.
+
+    Klaim dan data referensinya diambil dengan beberapa query IN (FraudLookups),
+    keempat pattern dicek di memori, lalu semua FraudDetection disimpan dengan
+    satu INSERT multi-row. Mengembalikan hasil deteksi per claim_id.
+    commit=False membiarkan INSERT di transaksi caller.
+    """
+    from repositories.claim import get_claims_by_ids
+    from repositories.fraud import bulk_insert_fraud_detections
+
+    claims = get_claims_by_ids(db, list(claim_ids))
+    if not claims:
+        return {}
+
+    lookups = FraudLookups.prefetch(db, claims)
+    results = {}
+    detections = []
+    for claim in claims:
+        claim_detections = evaluate_claim(claim, lookups)
+        results[claim.id] = [detection.model_dump() for detection in claim_detections]
+        detections.extend(claim_detections)
+
+    # Save fraud detections to database
+    bulk_insert_fraud_detections(db, detections, commit=commit)
+    print(f"🕵️ Fraud detection batch: {len(claims)} klaim, {len(detections)} deteksi")
+    return results
+
+def evaluate_claim(claim, lookups: FraudLookups) -> List[Any]:
+    """Jalankan keempat pengecekan fraud untuk satu klaim memakai data prefetch"""
     from schemas.fraud import FraudDetectionCreate
-    
-    claim = get_claim(db, claim_id)
-    if not claim:
-        return fraud_detections
-    
+
+    fraud_detections = []
+    claim_id = claim.id
+
+    # Tanpa data ekstraksi pengecekan di bawah tidak bisa berjalan: klaim
+    # diarahkan ke review manual (FRAUD_CHECK), bukan disetujui otomatis
+    if not get_extracted_data(claim):
+        fraud_detections.append(
+            FraudDetectionCreate(
+                claim_id=claim_id,
+                detection_type="missing_extracted_data",
+                risk_level="medium",
+                confidence=0.70,
+                description="Data hasil ekstraksi dokumen tidak tersedia, perlu review manual",
+                details={"source": "validation_data.validation_data.all_results[*].extracted_data"}
+            )
+        )
+
     # Pattern 1: Pengecekan data rekam medis dengan database
-    rm_validation = validate_medical_record_data(db, claim)
+    rm_validation = validate_medical_record_data(None, claim, lookups)
     if rm_validation["is_fraud"]:
         fraud_detections.append(
             FraudDetectionCreate(
@@ -32,9 +201,9 @@ def detect_fraud_patterns(db: Session, claim_id: uuid.UUID) -> List[Dict[str, An
                 details=rm_validation["details"]
             )
         )
-    
+
     # Pattern 2: Pengecekan tarif INACBGS
-    tariff_validation = validate_inacbgs_tariff(db, claim)
+    tariff_validation = validate_inacbgs_tariff(None, claim, lookups)
     if tariff_validation["anomaly_detected"]:
         fraud_detections.append(
             FraudDetectionCreate(
@@ -46,7 +215,7 @@ def detect_fraud_patterns(db: Session, claim_id: uuid.UUID) -> List[Dict[str, An
                 details=tariff_validation["details"]
             )
         )
-    
+
     # Pattern 3: Pengecekan konsistensi data
     consistency_validation = validate_data_consistency(claim)
     if consistency_validation["inconsistencies"]:
@@ -60,9 +229,9 @@ def detect_fraud_patterns(db: Session, claim_id: uuid.UUID) -> List[Dict[str, An
                 details=consistency_validation
             )
         )
-    
+
     # Pattern 4: Pengecekan manipulasi diagnosa
-    diagnosis_manipulation = check_diagnosis_manipulation(db, claim)
+    diagnosis_manipulation = check_diagnosis_manipulation(None, claim, lookups)
     if diagnosis_manipulation["manipulation_detected"]:
         fraud_detections.append(
             FraudDetectionCreate(
@@ -74,91 +243,91 @@ def detect_fraud_patterns(db: Session, claim_id: uuid.UUID) -> List[Dict[str, An
                 details=diagnosis_manipulation
             )
         )
-    
-    # Save fraud detections to database
-    for detection in fraud_detections:
-        create_fraud_detection(db, detection)
-    
+
     return fraud_detections
 
-def validate_medical_record_data(db: Session, claim) -> Dict[str, Any]:
+def _lookups_for(db: Session, claim, lookups: Optional[FraudLookups]) -> FraudLookups:
+    return lookups if lookups is not None else FraudLookups.prefetch(db, [claim])
+
+def validate_medical_record_data(db: Session, claim, lookups: FraudLookups = None) -> Dict[str, Any]:
     """
     Validasi data rekam medis dengan database
     """
+    lookups = _lookups_for(db, claim, lookups)
     details = {}
     is_fraud = False
-    
+    extracted_data = get_extracted_data(claim)
+
     # Cek data pasien di rekam medis
-    from repositories.patient import get_patient_by_id
-    patient = get_patient_by_id(db, claim.patient_id)
-    
+    patient = lookups.patient(claim.patient_id)
+
     if not patient:
         details["patient_check"] = "Data pasien tidak ditemukan di database"
         is_fraud = True
     else:
         # Bandingkan data pasien dengan rekam medis
-        if claim.extracted_data and claim.extracted_data.get("rekam_medis"):
-            rm_data = claim.extracted_data["rekam_medis"]
-            
+        if extracted_data.get("rekam_medis"):
+            rm_data = extracted_data["rekam_medis"]
+
             # Cek nama pasien
             if rm_data.get("nama_pasien") and patient.name:
                 if rm_data["nama_pasien"].lower() != patient.name.lower():
                     details["name_mismatch"] = f"Nama tidak match: DB={patient.name}, RM={rm_data['nama_pasien']}"
                     is_fraud = True
-            
+
             # Cek nomor rekam medis
-            if rm_data.get("no_rekam_medis") and patient.medical_record_number:
-                if rm_data["no_rekam_medis"] != patient.medical_record_number:
-                    details["mr_number_mismatch"] = f"Nomor RM tidak match: DB={patient.medical_record_number}, RM={rm_data['no_rekam_medis']}"
+            medical_record_number = getattr(patient, "medical_record_number", None)
+            if rm_data.get("no_rekam_medis") and medical_record_number:
+                if rm_data["no_rekam_medis"] != medical_record_number:
+                    details["mr_number_mismatch"] = f"Nomor RM tidak match: DB={medical_record_number}, RM={rm_data['no_rekam_medis']}"
                     is_fraud = True
-    
+
     # Cek dokter DPJP
-    from repositories.doctor import get_doctor_by_name
-    if claim.extracted_data and claim.extracted_data.get("rekam_medis"):
-        dpjp_name = claim.extracted_data["rekam_medis"].get("dokter_dpjp")
+    if extracted_data.get("rekam_medis"):
+        dpjp_name = extracted_data["rekam_medis"].get("dokter_dpjp")
         if dpjp_name:
-            doctor = get_doctor_by_name(db, dpjp_name)
+            doctor = lookups.doctor(dpjp_name)
             if not doctor:
                 details["doctor_check"] = f"Dokter DPJP {dpjp_name} tidak terdaftar"
                 is_fraud = True
-            elif not doctor.is_licensed:
+            elif not doctor.is_active:
                 details["doctor_license"] = f"Dokter {dpjp_name} tidak memiliki lisensi aktif"
                 is_fraud = True
-    
+
     return {
         "is_fraud": is_fraud,
         "details": details
     }
 
-def validate_inacbgs_tariff(db: Session, claim) -> Dict[str, Any]:
+def validate_inacbgs_tariff(db: Session, claim, lookups: FraudLookups = None) -> Dict[str, Any]:
     """
     Validasi tarif berdasarkan INACBGS
     """
+    lookups = _lookups_for(db, claim, lookups)
     details = {}
     anomaly_detected = False
-    
-    from repositories.tariff import get_tariff_by_diagnosis_procedure
-    
-    if claim.extracted_data and claim.extracted_data.get("rekam_medis"):
-        rm_data = claim.extracted_data["rekam_medis"]
+    extracted_data = get_extracted_data(claim)
+
+    if extracted_data.get("rekam_medis"):
+        rm_data = extracted_data["rekam_medis"]
         diagnosa = rm_data.get("diagnosa", "")
         tindakan = rm_data.get("tindakan", [])
-        
+
         # Hitung tarif standar
         total_standard_tariff = 0
-        claimed_tariff = claim.claimed_amount or 0
-        
+        claimed_tariff = getattr(claim, "claimed_amount", None) or 0
+
         # Tarif untuk diagnosa
-        diagnosa_tariff = get_tariff_by_diagnosis_procedure(db, diagnosa, None)
+        diagnosa_tariff = lookups.tariff(diagnosa, None)
         if diagnosa_tariff:
-            total_standard_tariff += diagnosa_tariff.tarif_dasar
-        
+            total_standard_tariff += diagnosa_tariff.tarif_inacbgs
+
         # Tarif untuk tindakan
         for procedure in tindakan:
-            procedure_tariff = get_tariff_by_diagnosis_procedure(db, diagnosa, procedure)
+            procedure_tariff = lookups.tariff(diagnosa, procedure)
             if procedure_tariff:
-                total_standard_tariff += procedure_tariff.tarif_dasar
-        
+                total_standard_tariff += procedure_tariff.tarif_inacbgs
+
         # Bandingkan dengan tarif yang diklaim
         if claimed_tariff > 0:
             variance = abs(claimed_tariff - total_standard_tariff) / total_standard_tariff if total_standard_tariff > 0 else 1
@@ -169,7 +338,7 @@ def validate_inacbgs_tariff(db: Session, claim) -> Dict[str, Any]:
                     "standard": total_standard_tariff,
                     "variance_percent": variance * 100
                 }
-    
+
     return {
         "anomaly_detected": anomaly_detected,
         "details": details
@@ -180,73 +349,75 @@ def validate_data_consistency(claim) -> Dict[str, Any]:
     Validasi konsistensi data antara SEP, Rekam Medis, dan Surat Rujukan
     """
     inconsistencies = []
-    
-    if claim.extracted_data:
-        sep_data = claim.extracted_data.get("sep", {})
-        rm_data = claim.extracted_data.get("rekam_medis", {})
-        rujukan_data = claim.extracted_data.get("rujukan", {})
-        
+    extracted_data = get_extracted_data(claim)
+
+    if extracted_data:
+        sep_data = extracted_data.get("sep", {})
+        rm_data = extracted_data.get("rekam_medis", {})
+        rujukan_data = extracted_data.get("rujukan", {})
+
         # Cek konsistensi diagnosa
         diagnosa_sep = sep_data.get("diagnosa", "")
         diagnosa_rm = rm_data.get("diagnosa", "")
         diagnosa_rujukan = rujukan_data.get("diagnosa", "")
-        
+
         if diagnosa_sep and diagnosa_rm and diagnosa_sep != diagnosa_rm:
             inconsistencies.append(f"Diagnosa SEP ({diagnosa_sep}) tidak match dengan Rekam Medis ({diagnosa_rm})")
-        
+
         # Cek konsistensi tanggal
         tgl_sep = sep_data.get("tgl_sep")
         tgl_masuk = rm_data.get("tgl_masuk")
-        
+
         if tgl_sep and tgl_masuk:
             try:
                 tgl_sep_date = datetime.strptime(tgl_sep, "%Y-%m-%d")
                 tgl_masuk_date = datetime.strptime(tgl_masuk, "%Y-%m-%d")
-                
+
                 if tgl_sep_date != tgl_masuk_date:
                     inconsistencies.append(f"Tanggal SEP ({tgl_sep}) tidak match dengan tanggal masuk ({tgl_masuk})")
             except:
                 pass
-        
+
         # Cek konsistensi dokter DPJP
         dokter_sep = sep_data.get("dokter_dpjp", "")
         dokter_rm = rm_data.get("dokter_dpjp", "")
-        
+
         if dokter_sep and dokter_rm and dokter_sep != dokter_rm:
             inconsistencies.append(f"Dokter DPJP SEP ({dokter_sep}) tidak match dengan Rekam Medis ({dokter_rm})")
-    
+
     return {
         "inconsistencies": inconsistencies,
         "inconsistency_count": len(inconsistencies)
     }
 
-def check_diagnosis_manipulation(db: Session, claim) -> Dict[str, Any]:
+def check_diagnosis_manipulation(db: Session, claim, lookups: FraudLookups = None) -> Dict[str, Any]:
     """
     Deteksi manipulasi diagnosa
     """
+    lookups = _lookups_for(db, claim, lookups)
     manipulation_detected = False
     details = {}
-    
+
     # Cek riwayat diagnosa pasien
-    from repositories.claim import get_patient_claim_history
-    claim_history = get_patient_claim_history(db, claim.patient_id)
-    
+    claim_history = lookups.history(claim.patient_id)
+
     current_diagnosis = ""
-    if claim.extracted_data and claim.extracted_data.get("rekam_medis"):
-        current_diagnosis = claim.extracted_data["rekam_medis"].get("diagnosa", "")
-    
+    extracted_data = get_extracted_data(claim)
+    if extracted_data.get("rekam_medis"):
+        current_diagnosis = extracted_data["rekam_medis"].get("diagnosa", "")
+
     if current_diagnosis and claim_history:
         # Cek perubahan diagnosa yang mencurigakan
         previous_claims = [ch for ch in claim_history if ch.id != claim.id]
         if previous_claims:
             latest_claim = previous_claims[0]
-            previous_diagnosis = latest_claim.extracted_data.get("rekam_medis", {}).get("diagnosa", "") if latest_claim.extracted_data else ""
-            
+            previous_diagnosis = get_extracted_data(latest_claim).get("rekam_medis", {}).get("diagnosa", "")
+
             if previous_diagnosis and current_diagnosis != previous_diagnosis:
                 # Deteksi perubahan ke diagnosa dengan tarif lebih tinggi
-                current_tariff = get_diagnosis_tariff(db, current_diagnosis)
-                previous_tariff = get_diagnosis_tariff(db, previous_diagnosis)
-                
+                current_tariff = get_diagnosis_tariff(db, current_diagnosis, lookups)
+                previous_tariff = get_diagnosis_tariff(db, previous_diagnosis, lookups)
+
                 if current_tariff and previous_tariff:
                     if current_tariff > previous_tariff * 1.5:  # 50% increase
                         manipulation_detected = True
@@ -255,16 +426,19 @@ def check_diagnosis_manipulation(db: Session, claim) -> Dict[str, Any]:
                             "current_diagnosis": current_diagnosis,
                             "tariff_increase_percent": ((current_tariff - previous_tariff) / previous_tariff) * 100
                         }
-    
+
     return {
         "manipulation_detected": manipulation_detected,
         "details": details
     }
 
-def get_diagnosis_tariff(db: Session, diagnosis: str) -> float:
+def get_diagnosis_tariff(db: Session, diagnosis: str, lookups: FraudLookups = None) -> float:
     """
     Get tariff for a diagnosis
     """
-    from repositories.tariff import get_tariff_by_diagnosis
-    tariff = get_tariff_by_diagnosis(db, diagnosis)
-    return tariff.tarif_dasar if tariff else 0
\ No newline at end of file
+    if lookups is not None:
+        tariff = lookups.tariff_by_diagnosis(diagnosis)
+    else:
+        from repositories.tariff import get_tariff_by_diagnosis
+        tariff = get_tariff_by_diagnosis(db, diagnosis)
+    return tariff.tarif_inacbgs if tariff else 0
@@ -0,0 +1,562 @@
+import os
+import csv
+import json
+import mmap
+import zlib
+import struct
+import threading
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from collections.abc import Mapping
+from typing import Dict, Any, List, Optional, Tuple, Iterable, Iterator
+
+# ============================================================
+# ICD INDEX
+# ============================================================
+# Kode ICD-10 dan ICD-9 disimpan di bawah key kanonik (huruf besar, tanpa
+# titik) sehingga "A01.03", "a0103" dan "A0103" menunjuk entri yang sama.
+# Lookup hanya berupa operasi string + satu dict/hash lookup, tanpa regex.
+
+ICD10 = "ICD-10"
+ICD9 = "ICD-9"
+ICD_SYSTEMS = (ICD10, ICD9)
+
+ICD10_CSV_PATH = os.getenv("ICD10_CSV_PATH", "Code_ICD_10.csv")
+ICD9_CSV_PATH = os.getenv("ICD9_CSV_PATH", "Code_ICD_9.csv")
+ICD_INDEX_PATH = os.getenv(
+    "ICD_INDEX_PATH",
+    os.path.join(os.getenv("UPLOAD_DIR", "uploads"), "cache", "icd_index.bin")
+)
+
+ValidationResult = Tuple[bool, str, Optional[str]]
+ICDEntry = Tuple[str, Dict[str, Any]]
+
+# Kode umum yang tidak selalu ada di CSV
+COMMON_ICD10_CODES = {
+    'A01.03': {
+        'short_description': 'Typhoid pneumonia',
+        'long_description': 'Typhoid pneumonia, stage 1',
+        'system': 'ICD-10'
+    },
+    'N18.5': {
+        'short_description': 'Chronic kidney disease, stage 5',
+        'long_description': 'Chronic kidney disease, stage 5 (end-stage renal disease)',
+        'system': 'ICD-10'
+    },
+    'N18.9': {
+        'short_description': 'Chronic kidney disease, unspecified',
+        'long_description': 'Chronic kidney disease, unspecified',
+        'system': 'ICD-10'
+    },
+    'I10': {
+        'short_description': 'Essential (primary) hypertension',
+        'long_description': 'Essential (primary) hypertension',
+        'system': 'ICD-10'
+    }
+}
+
+COMMON_ICD9_CODES = {
+    '38.95': {
+        'short_description': 'Venous catheterization',
+        'long_description': 'Venous catheterization, not elsewhere classified',
+        'system': 'ICD-9'
+    },
+    '39.95': {
+        'short_description': 'Hemodialysis',
+        'long_description': 'Hemodialysis',
+        'system': 'ICD-9'
+    },
+    '4800': {
+        'short_description': 'Pneumonia due to adenovirus',
+        'long_description': 'Pneumonia due to adenovirus',
+        'system': 'ICD-9'
+    }
+}
+
+
+def canonical_icd_key(code: str) -> str:
+    """Key kanonik: huruf besar, tanpa spasi di tepi dan tanpa titik"""
+    return code.strip().upper().replace(".", "")
+
+
+def _is_ascii_digits(value: str) -> bool:
+    return value.isascii() and value.isdigit()
+
+
+def classify_icd_code(code: str) -> Optional[str]:
+    """
+    Tentukan sistem kode dari formatnya (kode sudah huruf besar):
+    ICD-10: A01, A01.0, A01.03, A0103, A01031
+    ICD-9 : 4800, 38.95, 001
+    None jika format tidak dikenali.
+    """
+    head, dot, tail = code.partition(".")
+    if dot and not (_is_ascii_digits(tail) and len(tail) <= 2):
+        return None
+
+    if head and "A" <= head[0] <= "Z" and _is_ascii_digits(head[1:]):
+        digits = len(head) - 1
+        if digits == 2 or (not dot and digits in (3, 4)):
+            return ICD10
+        return None
+
+    if _is_ascii_digits(head) and 1 <= len(head) <= 4:
+        return ICD9
+    return None
+
+# ============================================================
+# LOAD CSV ICD
+# ============================================================
+
+def read_icd10_csv(csv_path: str = ICD10_CSV_PATH) -> Dict[str, Dict[str, Any]]:
+    """Baca CSV ICD-10 (delimiter ';': CODE; SHORT DESCRIPTION; LONG DESCRIPTION)"""
+    icd_database = {}
+    if not os.path.exists(csv_path):
+        print(f"[WARNING] File ICD-10 tidak ditemukan: {csv_path}")
+        return icd_database
+    try:
+        with open(csv_path, 'r', encoding='utf-8', newline='') as file:
+            reader = csv.reader(file, delimiter=';')
+            next(reader, None)
+            for row in reader:
+                if len(row) >= 3:
+                    icd_database[row[0].strip()] = {
+                        'short_description': row[1].strip(),
+                        'long_description': row[2].strip(),
+                        'system': ICD10
+                    }
+        print(f"[INFO] Loaded {len(icd_database)} kode ICD-10 dari CSV")
+    except Exception as e:
+        print(f"[ERROR] Gagal load database ICD-10: {e}")
+    return icd_database
+
+
+def read_icd9_csv(csv_path: str = ICD9_CSV_PATH) -> Dict[str, Dict[str, Any]]:
+    """Baca CSV ICD-9 (delimiter ',': CODE, LONG DESCRIPTION)"""
+    icd9_database = {}
+    if not os.path.exists(csv_path):
+        print(f"[WARNING] File ICD-9 tidak ditemukan: {csv_path}")
+        return icd9_database
+    try:
+        with open(csv_path, 'r', encoding='utf-8', newline='') as file:
+            reader = csv.reader(file)
+            next(reader, None)
+            for row in reader:
+                if len(row) >= 2:
+                    long_desc = row[1].strip()
+                    icd9_database[row[0].strip()] = {
+                        'short_description': long_desc[:100] + "..." if len(long_desc) > 100 else long_desc,
+                        'long_description': long_desc,
+                        'system': ICD9
+                    }
+        print(f"[INFO] Loaded {len(icd9_database)} kode ICD-9 dari CSV")
+    except Exception as e:
+        print(f"[ERROR] Gagal load database ICD-9: {e}")
+    return icd9_database
+
+
+def load_icd_sources(icd10_csv: str = ICD10_CSV_PATH, icd9_csv: str = ICD9_CSV_PATH):
+    """CSV ICD-10 & ICD-9 ditambah kode umum yang belum ada"""
+    icd10_database = read_icd10_csv(icd10_csv)
+    icd9_database = read_icd9_csv(icd9_csv)
+    for code, desc in COMMON_ICD10_CODES.items():
+        icd10_database.setdefault(code, desc)
+    for code, desc in COMMON_ICD9_CODES.items():
+        icd9_database.setdefault(code, desc)
+    return icd10_database, icd9_database
+
+# ============================================================
+# INDEX
+# ============================================================
+
+class BaseICDIndex(ABC):
+    """Validasi di atas `_get(system, key)`; subclass menentukan penyimpanannya"""
+
+    @abstractmethod
+    def _get(self, system: str, key: str) -> Optional[ICDEntry]:
+        """Entri untuk key kanonik, atau None"""
+
+    @abstractmethod
+    def _prefix(self, system: str, key: str) -> List[ICDEntry]:
+        """Semua entri yang key-nya diawali `key`, terurut"""
+
+    def lookup(self, code: str, system: Optional[str] = None) -> Optional[Tuple[str, str, Dict[str, Any]]]:
+        """Cari kode; return (sistem, kode di database, info) atau None"""
+        if not code:
+            return None
+        code = code.strip().upper()
+        system = system or classify_icd_code(code)
+        if system is None:
+            return None
+        entry = self._get(system, code.replace(".", ""))
+        if entry is None:
+            return None
+        return system, entry[0], entry[1]
+
+    def validate(self, code: str) -> ValidationResult:
+        """Validasi satu kode, format hasil sama dengan validate_icd_code"""
+        if not code:
+            return False, "Kode ICD kosong", None
+
+        code = code.upper().strip()
+        system = classify_icd_code(code)
+        if system is None:
+            return False, "Format kode ICD tidak valid", None
+
+        entry = self._get(system, code.replace(".", ""))
+        if entry is None:
+            return False, f"Kode {system} tidak ditemukan dalam database", system
+        return True, f"Valid {system} - {entry[1]['short_description']}", system
+
+    def validate_many(self, codes: Iterable[str]) -> List[ValidationResult]:
+        """Validasi banyak kode sekaligus; kode yang sama hanya divalidasi sekali"""
+        seen: Dict[str, ValidationResult] = {}
+        results = []
+        for code in codes:
+            result = seen.get(code)
+            if result is None:
+                result = seen[code] = self.validate(code)
+            results.append(result)
+        return results
+
+    def children(self, prefix: str, system: Optional[str] = None) -> List[ICDEntry]:
+        """Semua kode yang key kanoniknya diawali prefix, urut berdasarkan key"""
+        key = canonical_icd_key(prefix)
+        if not key:
+            return []
+        if system is None:
+            system = ICD10 if "A" <= key[0] <= "Z" else ICD9
+        return self._prefix(system, key)
+
+
+class ICDIndex(BaseICDIndex):
+    """
+    Index ICD di memori dari dict {kode: info}.
+
+    - lookup(code): O(1), menerima format dengan/tanpa titik dan huruf kecil
+    - validate(code) / validate_many(codes): hasil sama format dengan validate_icd_code
+    - children(prefix): semua kode di bawah kategori/prefix, mis. "A01" -> A01.0, A01.03, ...
+    """
+
+    def __init__(self, icd10_database: Dict[str, Dict[str, Any]], icd9_database: Dict[str, Dict[str, Any]]):
+        self._entries: Dict[str, Dict[str, ICDEntry]] = {ICD10: {}, ICD9: {}}
+        self._sorted_keys: Dict[str, List[str]] = {}
+
+        for system, database in ((ICD10, icd10_database), (ICD9, icd9_database)):
+            entries = self._entries[system]
+            for code, info in database.items():
+                key = canonical_icd_key(code)
+                # Jika dua format menunjuk key yang sama (A01.03 & A0103), yang pertama dipakai
+                entries.setdefault(key, (code, info))
+            self._sorted_keys[system] = sorted(entries)
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._entries.values())
+
+    def count(self, system: str) -> int:
+        return len(self._entries[system])
+
+    def keys(self, system: str) -> List[str]:
+        return self._sorted_keys[system]
+
+    def _get(self, system: str, key: str) -> Optional[ICDEntry]:
+        return self._entries[system].get(key)
+
+    def _prefix(self, system: str, key: str) -> List[ICDEntry]:
+        entries = self._entries[system]
+        keys = self._sorted_keys[system]
+        results = []
+        for i in range(bisect_left(keys, key), len(keys)):
+            if not keys[i].startswith(key):
+                break
+            results.append(entries[keys[i]])
+        return results
+
+# ============================================================
+# ARTEFAK BINER (mmap)
+# ============================================================
+# Layout file:
+#   header   : magic "ICDX" | versi u32 | panjang meta u32 | meta JSON
+#   per sistem (offset di meta, semua little-endian):
+#     keys   : N x KEY_WIDTH byte, key kanonik ASCII di-pad \0, terurut
+#     records: N x (offset blob u32, len kode u16, len short u16, len long u16)
+#     hash   : M slot u32 (indeks + 1, 0 = kosong), crc32(key) & (M-1), linear probing
+#     blob   : kode + short + long description UTF-8 berurutan
+# File dibuka read-only dengan mmap sehingga page-nya dipakai bersama oleh
+# semua proses worker di host yang sama.
+
+ICD_ARTIFACT_MAGIC = b"ICDX"
+ICD_ARTIFACT_VERSION = 1
+KEY_WIDTH = 8
+_HEADER = struct.Struct("<4sII")
+_RECORD = struct.Struct("<IHHH")
+_SLOT = struct.Struct("<I")
+
+
+def source_fingerprint(paths: Iterable[str]) -> List[List[Any]]:
+    """
+    Path (sesuai konfigurasi) + ukuran + mtime file sumber; artefak dibangun
+    ulang jika berubah
+    """
+    fingerprint = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            fingerprint.append([path, stat.st_size, stat.st_mtime_ns])
+        except OSError:
+            fingerprint.append([path, None, None])
+    return fingerprint
+
+
+def _encode_text(value: str, limit: int = 0xFFFF) -> bytes:
+    data = (value or "").encode("utf-8")
+    if len(data) > limit:
+        data = data[:limit].decode("utf-8", "ignore").encode("utf-8")
+    return data
+
+
+def build_icd_artifact(
+    out_path: str = ICD_INDEX_PATH,
+    icd10_csv: str = ICD10_CSV_PATH,
+    icd9_csv: str = ICD9_CSV_PATH
+) -> Dict[str, Any]:
+    """
+    Kompilasi CSV ICD ke artefak biner. File ditulis ke file sementara lalu
+    di-rename (atomic) sehingga proses lain tidak pernah membaca file setengah jadi.
+    """
+    index = ICDIndex(*load_icd_sources(icd10_csv, icd9_csv))
+    meta = {"sources": source_fingerprint([icd10_csv, icd9_csv]), "systems": {}}
+    sections = []
+    offset = 0
+
+    for system in ICD_SYSTEMS:
+        keys = [key for key in index.keys(system) if key.isascii() and len(key) <= KEY_WIDTH]
+        skipped = index.count(system) - len(keys)
+        if skipped:
+            print(f"[WARNING] {skipped} kode {system} dilewati (key > {KEY_WIDTH} karakter)")
+
+        key_block = b"".join(key.encode("ascii").ljust(KEY_WIDTH, b"\0") for key in keys)
+
+        records = bytearray()
+        blob = bytearray()
+        for key in keys:
+            code, info = index._get(system, key)
+            parts = [_encode_text(code), _encode_text(info.get('short_description')),
+                     _encode_text(info.get('long_description'))]
+            records += _RECORD.pack(len(blob), *(len(part) for part in parts))
+            for part in parts:
+                blob += part
+
+        slots = 1
+        while slots < max(2 * len(keys), 8):
+            slots *= 2
+        table = [0] * slots
+        for i, key in enumerate(keys):
+            h = zlib.crc32(key.encode("ascii")) & (slots - 1)
+            while table[h]:
+                h = (h + 1) & (slots - 1)
+            table[h] = i + 1
+        table_block = struct.pack(f"<{slots}I", *table)
+
+        meta["systems"][system] = {
+            "count": len(keys),
+            "slots": slots,
+            "keys": offset,
+            "records": offset + len(key_block),
+            "table": offset + len(key_block) + len(records),
+            "blob": offset + len(key_block) + len(records) + len(table_block),
+        }
+        sections += [key_block, bytes(records), table_block, bytes(blob)]
+        offset += len(key_block) + len(records) + len(table_block) + len(blob)
+
+    # Offset section relatif terhadap awal data (setelah header + meta)
+    meta_bytes = json.dumps(meta).encode("utf-8")
+
+    directory = os.path.dirname(out_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{out_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(ICD_ARTIFACT_MAGIC, ICD_ARTIFACT_VERSION, len(meta_bytes)))
+        f.write(meta_bytes)
+        for section in sections:
+            f.write(section)
+    os.replace(tmp_path, out_path)
+
+    counts = {system: meta["systems"][system]["count"] for system in ICD_SYSTEMS}
+    print(f"[INFO] Artefak ICD ditulis: {out_path} ({counts[ICD10]} ICD-10, {counts[ICD9]} ICD-9)")
+    return {"path": out_path, "bytes": _HEADER.size + len(meta_bytes) + offset, **counts}
+
+
+class CompiledICDIndex(BaseICDIndex):
+    """Index ICD read-only di atas artefak biner yang di-mmap"""
+
+    def __init__(self, path: str = ICD_INDEX_PATH):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, meta_len = _HEADER.unpack_from(self._mm, 0)
+        if magic != ICD_ARTIFACT_MAGIC or version != ICD_ARTIFACT_VERSION:
+            self._mm.close()
+            raise ValueError(f"Artefak ICD tidak dikenali: {path}")
+        self.meta = json.loads(self._mm[_HEADER.size:_HEADER.size + meta_len])
+        data_start = _HEADER.size + meta_len
+        self._systems = {
+            system: {
+                "count": section["count"],
+                "slots": section["slots"],
+                **{f"{name}_abs": data_start + section[name] for name in ("keys", "records", "table", "blob")}
+            }
+            for system, section in self.meta["systems"].items()
+        }
+
+    def close(self):
+        self._mm.close()
+
+    def __len__(self) -> int:
+        return sum(system["count"] for system in self._systems.values())
+
+    def count(self, system: str) -> int:
+        return self._systems[system]["count"]
+
+    def source_paths(self) -> List[str]:
+        """CSV sumber yang dipakai saat artefak dibangun (ICD-10, ICD-9)"""
+        return [source[0] for source in self.meta.get("sources", [])]
+
+    def is_fresh(self) -> bool:
+        """True jika CSV sumber yang tercatat di artefak tidak berubah"""
+        paths = self.source_paths()
+        return bool(paths) and self.meta.get("sources") == source_fingerprint(paths)
+
+    def _key(self, section: Dict[str, int], i: int) -> bytes:
+        start = section["keys_abs"] + i * KEY_WIDTH
+        return self._mm[start:start + KEY_WIDTH]
+
+    def _entry(self, system: str, section: Dict[str, int], i: int) -> ICDEntry:
+        offset, code_len, short_len, long_len = _RECORD.unpack_from(
+            self._mm, section["records_abs"] + i * _RECORD.size
+        )
+        start = section["blob_abs"] + offset
+        data = self._mm[start:start + code_len + short_len + long_len]
+        code = data[:code_len].decode("utf-8")
+        info = {
+            'short_description': data[code_len:code_len + short_len].decode("utf-8"),
+            'long_description': data[code_len + short_len:].decode("utf-8"),
+            'system': system
+        }
+        return code, info
+
+    def _get(self, system: str, key: str) -> Optional[ICDEntry]:
+        if len(key) > KEY_WIDTH or not key.isascii():
+            return None
+        section = self._systems[system]
+        key_bytes = key.encode("ascii")
+        padded = key_bytes.ljust(KEY_WIDTH, b"\0")
+        mask = section["slots"] - 1
+        h = zlib.crc32(key_bytes) & mask
+        while True:
+            (slot,) = _SLOT.unpack_from(self._mm, section["table_abs"] + h * _SLOT.size)
+            if not slot:
+                return None
+            if self._key(section, slot - 1) == padded:
+                return self._entry(system, section, slot - 1)
+            h = (h + 1) & mask
+
+    def _prefix(self, system: str, key: str) -> List[ICDEntry]:
+        if not key.isascii():
+            return []
+        section = self._systems[system]
+        prefix = key.encode("ascii")[:KEY_WIDTH]
+        # bisect_left manual di atas key terurut dalam mmap
+        lo, hi = 0, section["count"]
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(section, mid) < prefix:
+                lo = mid + 1
+            else:
+                hi = mid
+        results = []
+        for i in range(lo, section["count"]):
+            if not self._key(section, i).startswith(prefix):
+                break
+            results.append(self._entry(system, section, i))
+        return results
+
+# ============================================================
+# INDEX GLOBAL (LAZY)
+# ============================================================
+_icd_index: Optional[BaseICDIndex] = None
+_icd_index_lock = threading.Lock()
+
+
+def load_icd_index(
+    path: str = ICD_INDEX_PATH,
+    icd10_csv: str = ICD10_CSV_PATH,
+    icd9_csv: str = ICD9_CSV_PATH
+) -> BaseICDIndex:
+    """
+    Buka artefak ICD; dibangun ulang jika belum ada atau CSV sumber berubah.
+    Artefak yang sudah ada dicek (dan dibangun ulang) terhadap CSV yang
+    tercatat di dalamnya, sehingga artefak dari `manage.py build-icd-index
+    --icd10 ... --icd9 ...` tidak ditimpa oleh CSV default. `icd10_csv` /
+    `icd9_csv` hanya dipakai jika artefak belum ada.
+    Jika artefak tidak bisa ditulis/dibaca, index dibangun di memori dari CSV.
+    """
+    try:
+        if os.path.exists(path):
+            index = CompiledICDIndex(path)
+            if index.is_fresh():
+                return index
+            sources = index.source_paths()
+            if len(sources) == 2:
+                icd10_csv, icd9_csv = sources
+            print(f"[INFO] CSV ICD berubah, artefak dibangun ulang: {path}")
+            index.close()
+        build_icd_artifact(path, icd10_csv, icd9_csv)
+        return CompiledICDIndex(path)
+    except Exception as e:
+        print(f"[WARNING] Artefak ICD tidak dapat dipakai ({e}), index dibangun di memori")
+        return ICDIndex(*load_icd_sources(icd10_csv, icd9_csv))
+
+
+def get_icd_index() -> BaseICDIndex:
+    """Index ICD global, dimuat saat pertama kali dipakai"""
+    global _icd_index
+    if _icd_index is None:
+        with _icd_index_lock:
+            if _icd_index is None:
+                _icd_index = load_icd_index()
+    return _icd_index
+
+
+def reset_icd_index():
+    """Lupakan index global (mis. setelah artefak dibangun ulang)"""
+    global _icd_index
+    with _icd_index_lock:
+        _icd_index = None
+
+
+class ICDDatabaseView(Mapping):
+    """
+    Tampilan dict {kode kanonik: info} satu sistem ICD di atas index global,
+    pengganti ICD10_DB/ICD9_DB yang dulu dimuat penuh saat import.
+    """
+
+    def __init__(self, system: str):
+        self.system = system
+
+    def __getitem__(self, code: str) -> Dict[str, Any]:
+        entry = get_icd_index()._get(self.system, canonical_icd_key(code))
+        if entry is None:
+            raise KeyError(code)
+        return entry[1]
+
+    def __contains__(self, code) -> bool:
+        return isinstance(code, str) and get_icd_index()._get(self.system, canonical_icd_key(code)) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        for code, _ in get_icd_index()._prefix(self.system, ""):
+            yield code
+
+    def __len__(self) -> int:
+        return get_icd_index().count(self.system)
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import os
+import atexit
+import threading
+from concurrent.futures import ProcessPoolExecutor, Future
+from typing import TYPE_CHECKING, Callable, List, Optional, Tuple
+
+# pytesseract (ikut meng-import pandas) dan PIL di-import saat pertama dipakai
+if TYPE_CHECKING:
+    from PIL import Image
+
+# ============================================================
+# KONFIGURASI OCR ENGINE
+# ============================================================
+OCR_LANG = "ind+eng"
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", str(max(1, (os.cpu_count() or 2) - 1))))
+OCR_MAX_PENDING = int(os.getenv("OCR_MAX_PENDING", str(OCR_WORKERS * 2)))
+
+OCR_FAILED_TEXT = "[OCR GAGAL]"
+
+# Path binary tesseract (key .env yang sama dengan sebelumnya); default dari PATH
+TESSERACT_CMD = os.getenv("TESSERACT_PATH") or "tesseract"
+
+# Payload halaman yang dikirim ke worker: (mode, (width, height), raw bytes)
+PagePayload = Tuple[str, Tuple[int, int], bytes]
+
+# Satu baris hasil layout OCR: (teks, (left, top, right, bottom)) dalam pixel
+OCRLine = Tuple[str, Tuple[int, int, int, int]]
+
+
+def _init_ocr_worker(tesseract_cmd: Optional[str]):
+    """Initializer untuk setiap proses worker OCR"""
+    import pytesseract
+
+    if tesseract_cmd:
+        pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+
+
+def _ocr_page_worker(payload: PagePayload, lang: str) -> str:
+    """OCR satu halaman di proses worker, gambar diterima langsung dari memori"""
+    import pytesseract
+    from PIL import Image
+
+    mode, size, data = payload
+    try:
+        image = Image.frombytes(mode, size, data)
+        return pytesseract.image_to_string(image, lang=lang)
+    except Exception as e:
+        # Beberapa exception pytesseract tidak bisa di-pickle dan akan merusak pool
+        raise RuntimeError(f"{type(e).__name__}: {e}") from None
+
+
+def _ocr_layout_worker(payload: PagePayload, lang: str) -> List[OCRLine]:
+    """OCR layout satu halaman: kembalikan baris teks beserta bounding box-nya"""
+    import pytesseract
+    from PIL import Image
+
+    mode, size, data = payload
+    try:
+        image = Image.frombytes(mode, size, data)
+        result = pytesseract.image_to_data(image, lang=lang, output_type=pytesseract.Output.DICT)
+    except Exception as e:
+        raise RuntimeError(f"{type(e).__name__}: {e}") from None
+
+    lines = {}
+    for i, word in enumerate(result["text"]):
+        if not word or not word.strip():
+            continue
+        key = (result["block_num"][i], result["par_num"][i], result["line_num"][i])
+        left, top = result["left"][i], result["top"][i]
+        right, bottom = left + result["width"][i], top + result["height"][i]
+        if key in lines:
+            words, (l, t, r, b) = lines[key]
+            words.append(word)
+            lines[key] = (words, (min(l, left), min(t, top), max(r, right), max(b, bottom)))
+        else:
+            lines[key] = ([word], (left, top, right, bottom))
+
+    ordered = sorted(lines.values(), key=lambda line: (line[1][1], line[1][0]))
+    return [(" ".join(words), box) for words, box in ordered]
+
+
+def image_to_payload(image: Image.Image) -> PagePayload:
+    """Konversi PIL image ke payload ringan (grayscale) untuk dikirim ke worker"""
+    if image.mode != "L":
+        image = image.convert("L")
+    return image.mode, image.size, image.tobytes()
+
+
+class OCREngine:
+    """
+    Engine OCR berbasis process pool.
+
+    Halaman dikirim ke worker sebagai bytes di memori (tanpa file PNG sementara),
+    jumlah halaman yang sedang antre dibatasi oleh `max_pending` sehingga producer
+    akan menunggu ketika antrean penuh.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = OCR_WORKERS,
+        max_pending: int = OCR_MAX_PENDING,
+        lang: str = OCR_LANG,
+        tesseract_cmd: Optional[str] = None
+    ):
+        self.max_workers = max(0, max_workers)
+        self.max_pending = max(1, max_pending)
+        self.lang = lang
+        self.tesseract_cmd = tesseract_cmd or TESSERACT_CMD
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    initializer=_init_ocr_worker,
+                    initargs=(self.tesseract_cmd,)
+                )
+            return self._executor
+
+    def _submit(self, worker: Callable, image: Image.Image) -> Future:
+        """Kirim satu gambar ke pool; blocking jika antrean sudah penuh"""
+        payload = image_to_payload(image)
+
+        if self.max_workers == 0:
+            # Mode inline (tanpa process pool), berguna untuk debugging
+            future = Future()
+            try:
+                _init_ocr_worker(self.tesseract_cmd)
+                future.set_result(worker(payload, self.lang))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+
+        self._slots.acquire()
+        try:
+            future = self._get_executor().submit(worker, payload, self.lang)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def submit_page(self, image: Image.Image) -> Future:
+        """Kirim satu halaman (atau potongan halaman) untuk di-OCR"""
+        return self._submit(_ocr_page_worker, image)
+
+    def submit_layout(self, image: Image.Image) -> Future:
+        """Kirim satu halaman untuk OCR layout (baris + bounding box)"""
+        return self._submit(_ocr_layout_worker, image)
+
+    def ocr_pages(self, images: List[Image.Image]) -> List[str]:
+        """OCR banyak halaman secara paralel, hasil dikembalikan sesuai urutan halaman"""
+        futures = [self.submit_page(image) for image in images]
+
+        texts = []
+        for i, future in enumerate(futures):
+            try:
+                texts.append(future.result())
+            except Exception as e:
+                print(f"[ERROR] OCR halaman {i+1} gagal: {e}")
+                texts.append(OCR_FAILED_TEXT)
+        return texts
+
+    def ocr_layouts(self, images: List[Image.Image]) -> List[Optional[List[OCRLine]]]:
+        """OCR layout banyak halaman secara paralel; None untuk halaman yang gagal"""
+        futures = [self.submit_layout(image) for image in images]
+
+        layouts = []
+        for i, future in enumerate(futures):
+            try:
+                layouts.append(future.result())
+            except Exception as e:
+                print(f"[ERROR] OCR layout halaman {i+1} gagal: {e}")
+                layouts.append(None)
+        return layouts
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait)
+                self._executor = None
+
+
+_engine: Optional[OCREngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_ocr_engine() -> OCREngine:
+    """Ambil instance OCREngine global (dibuat saat pertama kali dipakai)"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = OCREngine()
+            atexit.register(_engine.shutdown, False)
+        return _engine
@@ -0,0 +1,136 @@
+import os
+import time
+import atexit
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Dict, Any, Optional, Tuple, Callable
+
+from utils.security import pwd_context
+
+# ============================================================
+# KONFIGURASI PASSWORD HASHER
+# ============================================================
+# bcrypt sengaja mahal (± puluhan-ratusan ms per verifikasi). Saat banyak
+# user login bersamaan (pergantian shift), verifikasi dijalankan di executor
+# khusus dengan jumlah thread tetap agar tidak memakan seluruh CPU/thread
+# pool request lain. Jumlah verifikasi yang menunggu dibatasi; selebihnya
+# ditolak 503 supaya antrean tidak tumbuh tanpa batas.
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_QUEUE_SIZE = int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", "64"))
+
+
+class PasswordHasherBusyError(Exception):
+    """Antrean verifikasi password penuh"""
+
+
+class PasswordHasher:
+    """
+    Executor bcrypt terbatas. `queue_size` adalah jumlah maksimum pekerjaan
+    yang menunggu thread (di luar yang sedang berjalan); `stats()` memberi
+    kedalaman antrean dan waktu tunggu untuk monitoring.
+    """
+
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, queue_size: int = PASSWORD_HASH_QUEUE_SIZE):
+        self.workers = max(1, workers)
+        self.queue_size = max(0, queue_size)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._stats = {
+            "submitted": 0,
+            "completed": 0,
+            "rejected": 0,
+            "rehashed": 0,
+            "max_queue_depth": 0,
+            "wait_ms_total": 0.0,
+            "hash_ms_total": 0.0,
+        }
+
+    def submit(self, func: Callable, *args) -> Future:
+        """Jalankan func(*args) di executor; PasswordHasherBusyError jika antrean penuh"""
+        executor = self._ensure_started()
+        with self._stats_lock:
+            if self._running >= self.workers and self._queued >= self.queue_size:
+                self._stats["rejected"] += 1
+                raise PasswordHasherBusyError("Terlalu banyak login bersamaan, silakan coba lagi")
+            self._queued += 1
+            self._stats["submitted"] += 1
+            self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], self._queued)
+        return executor.submit(self._run, time.perf_counter(), func, args)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        (valid, hash_baru). hash_baru terisi jika hash tersimpan tidak sesuai
+        kebijakan saat ini (mis. BCRYPT_ROUNDS berubah) dan perlu disimpan ulang.
+        """
+        valid, new_hash = await asyncio.wrap_future(
+            self.submit(pwd_context.verify_and_update, password, hashed_password)
+        )
+        if new_hash:
+            self._count(rehashed=1)
+        return valid, new_hash
+
+    async def hash(self, password: str) -> str:
+        return await asyncio.wrap_future(self.submit(pwd_context.hash, password))
+
+    def stats(self) -> Dict[str, Any]:
+        """Metrik antrean untuk monitoring"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+            stats["queue_depth"] = self._queued
+            stats["running"] = self._running
+        completed = stats["completed"]
+        stats["workers"] = self.workers
+        stats["queue_capacity"] = self.queue_size
+        stats["avg_wait_ms"] = round(stats.pop("wait_ms_total") / completed, 2) if completed else 0.0
+        stats["avg_hash_ms"] = round(stats.pop("hash_ms_total") / completed, 2) if completed else 0.0
+        return stats
+
+    def close(self):
+        executor = self._executor
+        if executor is not None:
+            executor.shutdown(wait=True)
+            self._executor = None
+
+    def _ensure_started(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._start_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        return self._executor
+
+    def _run(self, submitted_at: float, func: Callable, args):
+        start = time.perf_counter()
+        with self._stats_lock:
+            self._queued -= 1
+            self._running += 1
+            self._stats["wait_ms_total"] += (start - submitted_at) * 1000
+        try:
+            return func(*args)
+        finally:
+            with self._stats_lock:
+                self._running -= 1
+                self._stats["completed"] += 1
+                self._stats["hash_ms_total"] += (time.perf_counter() - start) * 1000
+
+    def _count(self, **deltas):
+        with self._stats_lock:
+            for key, value in deltas.items():
+                self._stats[key] += value
+
+
+_hasher: Optional[PasswordHasher] = None
+_hasher_lock = threading.Lock()
+
+
+def get_password_hasher() -> PasswordHasher:
+    """Ambil instance PasswordHasher global"""
+    global _hasher
+    with _hasher_lock:
+        if _hasher is None:
+            _hasher = PasswordHasher()
+            atexit.register(_hasher.close)
+        return _hasher
@@ -0,0 +1,150 @@
+import os
+import re
+from typing import Callable, Dict, List, Optional, Tuple
+
+from services.claim_document import ClaimDocument
+from services.ocr_engine import get_ocr_engine, OCRLine, OCR_FAILED_TEXT
+
+# ============================================================
+# KONFIGURASI ROI OCR
+# ============================================================
+# "roi": layout pass DPI rendah + OCR region DPI tinggi, "full": OCR halaman penuh
+OCR_MODE = os.getenv("OCR_MODE", "roi").lower()
+OCR_DPI = int(os.getenv("OCR_DPI", "300"))
+OCR_LAYOUT_DPI = int(os.getenv("OCR_LAYOUT_DPI", "100"))
+
+# Region yang menutupi lebih dari fraksi ini dari tinggi halaman tidak
+# memberi penghematan, langsung OCR halaman penuh
+ROI_MAX_COVERAGE = float(os.getenv("OCR_ROI_MAX_COVERAGE", "0.7"))
+ROI_PADDING_PT = 6.0
+
+# Anchor (label field) per halaman klaim: (pattern, jumlah baris setelah anchor
+# yang ikut diambil). Urutan halaman mengikuti REQUIRED_PAGES: SEP, rujukan, RM.
+PAGE_ANCHORS: Dict[int, List[Tuple[str, int]]] = {
+    0: [  # SEP
+        (r'SEP', 0),
+        (r'Kartu', 0),
+        (r'Nama', 0),
+        (r'Diagnosa', 1),
+    ],
+    1: [  # Surat rujukan
+        (r'Rujukan', 0),
+        (r'Nama|Peserta', 0),
+        (r'Diagnosa', 1),
+        (r'Dr\.|Tanda\s*tangan', 2),
+    ],
+    2: [  # Rekam medis
+        (r'Rekam\s*Medi|No\.?\s*RM', 0),
+        (r'Nama', 0),
+        (r'Diagnosa|ICD', 1),
+        (r'Operasi|Tindakan', 6),
+        (r'Dokter|Dr\.|Tanda\s*tangan', 2),
+    ],
+}
+
+# Fungsi pemeriksa kelengkapan: (index halaman, teks) -> True jika field wajib lengkap
+FieldCheck = Callable[[int, str], bool]
+
+
+def find_regions(
+    lines: List[OCRLine],
+    anchors: List[Tuple[str, int]],
+    scale: float,
+    page_height: float
+) -> List[Tuple[float, float]]:
+    """
+    Cari pita vertikal (y0, y1) dalam point PDF yang memuat field wajib,
+    berdasarkan baris hasil layout pass. Pita yang bertumpuk digabung.
+    """
+    compiled = [(re.compile(pattern, re.IGNORECASE), extra) for pattern, extra in anchors]
+
+    bands = []
+    for i, (text, _) in enumerate(lines):
+        for pattern, extra in compiled:
+            if pattern.search(text):
+                block = lines[i:i + extra + 1]
+                top = min(box[1] for _, box in block) * scale - ROI_PADDING_PT
+                bottom = max(box[3] for _, box in block) * scale + ROI_PADDING_PT
+                bands.append((max(0.0, top), min(page_height, bottom)))
+                break
+
+    merged = []
+    for top, bottom in sorted(bands):
+        if merged and top <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], bottom))
+        else:
+            merged.append((top, bottom))
+    return merged
+
+
+def ocr_pages_roi(
+    doc: ClaimDocument,
+    page_indexes: List[int],
+    field_check: Optional[FieldCheck] = None
+) -> Tuple[List[str], List[str]]:
+    """
+    OCR halaman scan secara adaptif:
+      1. layout pass murah pada OCR_LAYOUT_DPI untuk menemukan label field,
+      2. OCR ulang hanya region field tersebut pada OCR_DPI,
+      3. fallback ke OCR halaman penuh jika region tidak ditemukan,
+         OCR region gagal, atau `field_check` menyatakan field masih kurang.
+    Mengembalikan (teks, metode) sesuai urutan `page_indexes`; metode "ocr_roi" atau "ocr".
+    """
+    engine = get_ocr_engine()
+    texts: Dict[int, str] = {}
+    methods: Dict[int, str] = {}
+
+    roi_candidates = [i for i in page_indexes if i in PAGE_ANCHORS]
+    full_pages = [i for i in page_indexes if i not in PAGE_ANCHORS]
+
+    if roi_candidates:
+        # 1. Layout pass DPI rendah
+        layouts = engine.ocr_layouts([doc.render_page(i, dpi=OCR_LAYOUT_DPI) for i in roi_candidates])
+        scale = 72.0 / OCR_LAYOUT_DPI
+
+        # 2. OCR region DPI tinggi (semua region semua halaman dikirim sekaligus)
+        pending = []
+        for index, lines in zip(roi_candidates, layouts):
+            width, height = doc.page_size(index)
+            regions = find_regions(lines or [], PAGE_ANCHORS[index], scale, height)
+            coverage = sum(bottom - top for top, bottom in regions) / height if height else 1.0
+            if not regions or coverage > ROI_MAX_COVERAGE:
+                full_pages.append(index)
+                continue
+            futures = [
+                engine.submit_page(doc.render_page(index, dpi=OCR_DPI, clip=(0, top, width, bottom)))
+                for top, bottom in regions
+            ]
+            pending.append((index, futures))
+
+        for index, futures in pending:
+            parts = []
+            for future in futures:
+                try:
+                    parts.append(future.result())
+                except Exception as e:
+                    print(f"[ERROR] OCR region halaman {index+1} gagal: {e}")
+                    parts = None
+                    break
+
+            text = "\n".join(parts) if parts is not None else None
+            if text is None or (field_check is not None and not field_check(index, text)):
+                full_pages.append(index)
+                continue
+            texts[index] = text
+            methods[index] = "ocr_roi"
+
+    # 3. Fallback halaman penuh
+    if full_pages:
+        full_pages.sort()
+        if roi_candidates:
+            print(f"[INFO] Fallback OCR halaman penuh: {[i+1 for i in full_pages]}")
+        full_texts = engine.ocr_pages([doc.render_page(i, dpi=OCR_DPI) for i in full_pages])
+        for index, text in zip(full_pages, full_texts):
+            texts[index] = text
+            methods[index] = "ocr"
+
+    return (
+        [texts.get(i, OCR_FAILED_TEXT) for i in page_indexes],
+        [methods.get(i, "ocr") for i in page_indexes]
+    )
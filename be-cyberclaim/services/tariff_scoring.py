@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import os
+import time
+import uuid
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, Any, Optional
+
+from sqlalchemy.orm import Session
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# ============================================================
+# KONFIGURASI SKOR ANOMALI TARIF
+# ============================================================
+# Setiap klaim dibandingkan dengan populasi klaim dalam jendela waktu yang
+# sama: per diagnosa (nominal klaim) dan per faskes (nominal relatif terhadap
+# median diagnosanya). Statistik robust (median, MAD) dipakai agar beberapa
+# klaim ekstrem tidak menggeser acuan. pandas/numpy dimuat saat scoring saja.
+ROBUST_Z_THRESHOLD = float(os.getenv("TARIFF_ROBUST_Z_THRESHOLD", "3.5"))
+TARIFF_VARIANCE_THRESHOLD = float(os.getenv("TARIFF_VARIANCE_THRESHOLD", "0.3"))   # 30%, sama dengan validate_inacbgs_tariff
+MIN_GROUP_SIZE = int(os.getenv("TARIFF_MIN_GROUP_SIZE", "5"))
+SCORE_WRITE_CHUNK = int(os.getenv("TARIFF_SCORE_WRITE_CHUNK", "1000"))
+
+# Konstanta konsistensi MAD & mean absolute deviation terhadap simpangan baku normal
+MAD_SCALE = 0.6745
+MEAN_AD_SCALE = 1.253314
+
+SCORE_COLUMNS = [
+    "standard_tariff", "tariff_ratio",
+    "diagnosis_claims", "diagnosis_median", "diagnosis_mad", "diagnosis_robust_z",
+    "diagnosis_z", "diagnosis_percentile",
+    "facility_claims", "facility_median_ratio", "facility_robust_z", "facility_percentile",
+    "anomaly_score", "is_anomaly",
+]
+
+
+def load_claim_amounts(db: Session, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                       facility_id: Optional[uuid.UUID] = None) -> "pd.DataFrame":
+    """
+    Satu query: id klaim, faskes, diagnosa utama (rekam medis) dan nominal klaim
+    untuk semua klaim bernominal di jendela upload_at [start, end).
+    claimed_amount hanya terisi dari form upload (field `claimed_amount`) atau
+    data seed; klaim tanpa nominal tidak ikut di-score.
+    """
+    import pandas as pd
+    from models.claim import ClaimSubmission
+    from models.medical import RekamMedis
+
+    query = db.query(
+            ClaimSubmission.id,
+            ClaimSubmission.facility_id,
+            RekamMedis.diagnosa_utama,
+            ClaimSubmission.claimed_amount
+        )\
+        .join(RekamMedis, RekamMedis.id == ClaimSubmission.rm_id)\
+        .filter(ClaimSubmission.claimed_amount > 0)
+
+    if start:
+        query = query.filter(ClaimSubmission.upload_at >= start)
+    if end:
+        query = query.filter(ClaimSubmission.upload_at < end)
+    if facility_id:
+        query = query.filter(ClaimSubmission.facility_id == facility_id)
+
+    return pd.DataFrame.from_records(
+        query.all(),
+        columns=["claim_id", "facility_id", "diagnosa_code", "claimed_amount"]
+    )
+
+
+def _robust_z(values, medians, mads, mean_ads):
+    """
+    Modified z-score (Iglewicz & Hoaglin): 0.6745 * (x - median) / MAD.
+    Jika MAD nol dipakai mean absolute deviation; jika keduanya nol, 0.
+    """
+    import numpy as np
+
+    deviation = values - medians
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = np.where(
+            mads > 0,
+            MAD_SCALE * deviation / mads,
+            np.where(mean_ads > 0, deviation / (MEAN_AD_SCALE * mean_ads), 0.0)
+        )
+    return z
+
+
+def _group_stats(frame: "pd.DataFrame", key: str, value: str):
+    """Ukuran grup, median, MAD, mean absolute deviation, mean, std dan persentil per baris"""
+    grouped = frame.groupby(key, sort=False)[value]
+    size = grouped.transform("size").to_numpy()
+    median = grouped.transform("median").to_numpy()
+    abs_dev = (frame[value] - median).abs()
+    abs_dev_grouped = abs_dev.groupby(frame[key], sort=False)
+    mad = abs_dev_grouped.transform("median").to_numpy()
+    mean_ad = abs_dev_grouped.transform("mean").to_numpy()
+    mean = grouped.transform("mean").to_numpy()
+    std = grouped.transform("std", ddof=0).to_numpy()
+    percentile = grouped.rank(pct=True, method="average").to_numpy()
+    return size, median, mad, mean_ad, mean, std, percentile
+
+
+def score_claims(frame: "pd.DataFrame", standard_tariffs: Optional[Dict[str, float]] = None) -> "pd.DataFrame":
+    """
+    Hitung skor anomali tarif untuk semua baris `frame` (kolom claim_id,
+    facility_id, diagnosa_code, claimed_amount) dalam satu pass vektor.
+
+    - diagnosis_*: posisi nominal klaim di antara klaim dengan diagnosa sama
+      (median, MAD, robust z, z klasik, persentil).
+    - facility_*: nominal dibagi median diagnosanya, lalu dibandingkan dengan
+      klaim lain di faskes yang sama.
+    - tariff_ratio: nominal dibagi tarif INA-CBG aktif diagnosa.
+
+    Grup dengan kurang dari MIN_GROUP_SIZE klaim tidak diberi z-score (NaN).
+    anomaly_score = max(|robust z diagnosa|, |robust z faskes|); klaim ditandai
+    anomali jika skor > ROBUST_Z_THRESHOLD atau selisih terhadap tarif standar
+    > TARIFF_VARIANCE_THRESHOLD.
+    """
+    import numpy as np
+
+    result = frame.copy()
+    if result.empty:
+        for column in SCORE_COLUMNS:
+            result[column] = []
+        return result
+
+    amounts = result["claimed_amount"].astype(float)
+    result["claimed_amount"] = amounts
+    result["diagnosa_code"] = result["diagnosa_code"].fillna("")
+
+    # ---------------- per diagnosa ----------------
+    size, median, mad, mean_ad, mean, std, percentile = _group_stats(result, "diagnosa_code", "claimed_amount")
+    enough = size >= MIN_GROUP_SIZE
+    values = amounts.to_numpy()
+    robust_z = _robust_z(values, median, mad, mean_ad)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = np.where(std > 0, (values - mean) / std, 0.0)
+
+    result["diagnosis_claims"] = size
+    result["diagnosis_median"] = median
+    result["diagnosis_mad"] = mad
+    result["diagnosis_robust_z"] = np.where(enough, robust_z, np.nan)
+    result["diagnosis_z"] = np.where(enough, z, np.nan)
+    result["diagnosis_percentile"] = percentile
+
+    # ---------------- per faskes ----------------
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result["_relative"] = np.where(median > 0, values / median, np.nan)
+    size_f, median_f, mad_f, mean_ad_f, _, _, percentile_f = _group_stats(result, "facility_id", "_relative")
+    robust_z_f = _robust_z(result["_relative"].to_numpy(), median_f, mad_f, mean_ad_f)
+
+    result["facility_claims"] = size_f
+    result["facility_median_ratio"] = median_f
+    result["facility_robust_z"] = np.where(size_f >= MIN_GROUP_SIZE, robust_z_f, np.nan)
+    result["facility_percentile"] = percentile_f
+    result = result.drop(columns=["_relative"])
+
+    # ---------------- tarif standar ----------------
+    standard = result["diagnosa_code"].map(standard_tariffs or {}).astype(float).to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.where(standard > 0, values / standard, np.nan)
+    result["standard_tariff"] = standard
+    result["tariff_ratio"] = ratio
+
+    # ---------------- skor gabungan ----------------
+    score = np.fmax(
+        np.abs(result["diagnosis_robust_z"].to_numpy()),
+        np.abs(result["facility_robust_z"].to_numpy())
+    )
+    score = np.nan_to_num(score, nan=0.0, posinf=np.finfo(float).max)
+    result["anomaly_score"] = score
+    with np.errstate(invalid="ignore"):
+        tariff_outlier = np.abs(ratio - 1) > TARIFF_VARIANCE_THRESHOLD
+    result["is_anomaly"] = (score > ROBUST_Z_THRESHOLD) | np.nan_to_num(tariff_outlier, nan=False).astype(bool)
+    return result
+
+
+def write_scores(db: Session, scored: "pd.DataFrame", run_id: str, chunk_size: int = SCORE_WRITE_CHUNK) -> int:
+    """
+    Tulis ulang skor klaim yang di-score dalam satu transaksi: hapus skor
+    lama lalu INSERT multi-row per `chunk_size` baris
+    """
+    import numpy as np
+    from sqlalchemy import insert
+    from models.claim_score import ClaimTariffScore
+
+    if scored.empty:
+        return 0
+
+    scored_at = datetime.utcnow()
+    columns = ["claim_id", "facility_id", "diagnosa_code", "claimed_amount"] + SCORE_COLUMNS
+    frame = scored[columns].astype(object).where(scored[columns].notna(), None)
+    frame = frame.replace({np.inf: None, -np.inf: None})
+    records = frame.to_dict("records")
+
+    try:
+        for start in range(0, len(records), chunk_size):
+            chunk = records[start:start + chunk_size]
+            for record in chunk:
+                record["run_id"] = run_id
+                record["scored_at"] = scored_at
+                record["is_anomaly"] = bool(record["is_anomaly"])
+                for key in ("diagnosis_claims", "facility_claims"):
+                    if record[key] is not None:
+                        record[key] = int(record[key])
+            db.query(ClaimTariffScore)\
+                .filter(ClaimTariffScore.claim_id.in_([record["claim_id"] for record in chunk]))\
+                .delete(synchronize_session=False)
+            db.execute(insert(ClaimTariffScore), chunk)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return len(records)
+
+
+def run_tariff_scoring(db: Session, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                       facility_id: Optional[uuid.UUID] = None) -> Dict[str, Any]:
+    """Load -> score -> tulis balik semua klaim di jendela waktu, dengan ringkasan durasi"""
+    from repositories.tariff import get_tariff_by_diagnosis
+
+    run_id = str(uuid.uuid4())
+    timings = {}
+
+    started = time.perf_counter()
+    frame = load_claim_amounts(db, start, end, facility_id)
+    timings["load_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+    started = time.perf_counter()
+    standard_tariffs = {}
+    for code in frame["diagnosa_code"].dropna().unique() if not frame.empty else []:
+        tariff = get_tariff_by_diagnosis(db, code)
+        if tariff:
+            standard_tariffs[code] = float(tariff.tarif_inacbgs)
+    scored = score_claims(frame, standard_tariffs)
+    timings["score_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+    started = time.perf_counter()
+    written = write_scores(db, scored, run_id)
+    timings["write_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+    anomalies = int(scored["is_anomaly"].sum()) if not scored.empty else 0
+    print(f"📈 Tariff scoring {run_id}: {written} klaim, {anomalies} anomali ({timings})")
+    return {
+        "run_id": run_id,
+        "claims_scored": written,
+        "anomalies": anomalies,
+        "diagnoses": int(frame["diagnosa_code"].nunique()) if not frame.empty else 0,
+        "facilities": int(frame["facility_id"].nunique()) if not frame.empty else 0,
+        **timings,
+    }
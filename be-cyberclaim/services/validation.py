@@ -1,430 +1,326 @@
 import os
 import re
-import pytesseract
-from pdf2image import convert_from_path
-from PIL import Image
-import fitz  # PyMuPDF
-from typing import Dict, Any, List, Tuple
+import threading
+from typing import Dict, Any, List, Optional, Tuple
 import uuid
 from datetime import datetime
-import pandas as pd
-import csv
-import PyPDF2
 from pathlib import Path
-import sqlite3
-import json
 
-# === SET TESSERACT PATH ===
-pytesseract.pytesseract.tesseract_cmd = r"C:\\Program Files\\Tesseract-OCR\\tesseract.exe"
+from services.ocr_engine import get_ocr_engine, OCR_FAILED_TEXT
+from services.extraction_cache import get_extraction_cache
+from services.claim_document import ClaimDocument, DocumentSource, open_document
+from services.roi_ocr import ocr_pages_roi, OCR_MODE, OCR_DPI
+from services.audit_sink import AUDIT_DB_PATH, connect_audit_db, get_audit_sink
+from services.field_extraction import FieldSpec, DocumentSpec, ALL
+from services.icd_index import (
+    ICDIndex, ICDDatabaseView, ICD10, ICD9, ICD10_CSV_PATH, ICD9_CSV_PATH,
+    get_icd_index, read_icd10_csv, read_icd9_csv
+)
 
 # ============================================================
 # KONFIGURASI DATABASE
 # ============================================================
-DB_PATH = "validation_results.db"
+# Hasil validasi ditulis ber-batch oleh audit sink (services/audit_sink.py)
+DB_PATH = AUDIT_DB_PATH
+
+_database_ready = False
+_database_lock = threading.Lock()
 
 def init_database():
     """Initialize SQLite database untuk menyimpan hasil validasi"""
+    global _database_ready
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS validation_results (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                filename TEXT NOT NULL,
-                file_path TEXT NOT NULL,
-                validation_status TEXT NOT NULL,
-                validation_message TEXT,
-                total_files_processed INTEGER,
-                files_valid INTEGER,
-                files_failed INTEGER,
-                validation_details TEXT,
-                extracted_data TEXT,
-                errors TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        conn.commit()
+        conn = connect_audit_db(DB_PATH)
         conn.close()
+        _database_ready = True
         print(f"[INFO] Database initialized: {DB_PATH}")
     except Exception as e:
         print(f"[ERROR] Gagal initialize database: {e}")
 
+def ensure_database():
+    """Buat tabel hasil validasi saat pertama kali dibutuhkan (bukan saat import)"""
+    if not _database_ready:
+        with _database_lock:
+            if not _database_ready:
+                init_database()
+
 def save_validation_result(validation_result: Dict[str, Any]):
-    """Simpan hasil validasi ke database"""
+    """
+    Antrekan hasil validasi untuk ditulis ke database oleh audit sink.
+    Tidak menunggu penulisan; False jika antrean penuh dan hasil dibuang.
+    """
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        filename = validation_result.get('filename', '')
-        if not filename and 'file_path' in validation_result:
-            filename = os.path.basename(validation_result['file_path'])
-        
-        file_path = validation_result.get('file_path', '')
-        
-        cursor.execute('''
-            INSERT INTO validation_results (
-                filename, file_path, validation_status, validation_message,
-                total_files_processed, files_valid, files_failed,
-                validation_details, extracted_data, errors
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            filename,
-            file_path,
-            'SUCCESS' if validation_result.get('valid') else 'FAILED',
-            validation_result.get('message', ''),
-            validation_result.get('total_files_processed', 0),
-            validation_result.get('files_valid', 0),
-            validation_result.get('files_failed', 0),
-            json.dumps(validation_result.get('validation_details', {})),
-            json.dumps(validation_result.get('extracted_data', {})),
-            json.dumps(validation_result.get('errors', []))
-        ))
-        
-        conn.commit()
-        conn.close()
-        print(f"[INFO] Hasil validasi disimpan ke database: {filename}")
-        return True
+        return get_audit_sink().submit(validation_result)
     except Exception as e:
         print(f"[ERROR] Gagal menyimpan hasil validasi: {e}")
         return False
 
-# Initialize database saat module di-load
-init_database()
-
 # ============================================================
 # KONFIGURASI 3 HALAMAN
 # ============================================================
 REQUIRED_PAGES = ["SEP", "SURAT_RUJUKAN", "REKAM_MEDIS"]
 REQUIRED_PAGE_COUNT = 3
 
-# ============================================================
-# FUNGSI LOAD DATABASE ICD-10 DAN ICD-9 DENGAN FALLBACK
-# ============================================================
-def load_icd10_database(csv_path="Code_ICD_10.csv"):
-    """Load database ICD-10 dari file CSV dengan fallback"""
-    icd_database = {}
-    try:
-        if not os.path.exists(csv_path):
-            print(f"[WARNING] File ICD-10 tidak ditemukan: {csv_path}")
-            return icd_database
-            
-        df = pd.read_csv(csv_path, delimiter=';', encoding='utf-8')
-        print(f"[INFO] Loaded {len(df)} kode ICD-10 dari CSV")
-        for _, row in df.iterrows():
-            code = row['CODE'].strip()
-            short_desc = row['SHORT DESCRIPTION (VALID ICD-10 FY2025)'].strip()
-            long_desc = row['LONG DESCRIPTION (VALID ICD-10 FY2025)'].strip()
-            icd_database[code] = {
-                'short_description': short_desc,
-                'long_description': long_desc,
-                'system': 'ICD-10'
-            }
-    except Exception as e:
-        print(f"[WARNING] Gagal load ICD-10 dengan pandas: {e}")
-        try:
-            with open(csv_path, 'r', encoding='utf-8') as file:
-                reader = csv.reader(file, delimiter=';')
-                headers = next(reader)
-                for row in reader:
-                    if len(row) >= 3:
-                        code = row[0].strip()
-                        short_desc = row[1].strip()
-                        long_desc = row[2].strip()
-                        icd_database[code] = {
-                            'short_description': short_desc,
-                            'long_description': long_desc,
-                            'system': 'ICD-10'
-                        }
-                print(f"[INFO] Loaded {len(icd_database)} kode ICD-10 dari CSV")
-        except Exception as e2:
-            print(f"[ERROR] Gagal load database ICD-10: {e2}")
-    
-    return icd_database
-
-def load_icd9_database(csv_path="Code_ICD_9.csv"):
-    """Load database ICD-9 dari file CSV dengan fallback"""
-    icd9_database = {}
-    try:
-        if not os.path.exists(csv_path):
-            print(f"[WARNING] File ICD-9 tidak ditemukan: {csv_path}")
-            return icd9_database
-            
-        with open(csv_path, 'r', encoding='utf-8') as file:
-            reader = csv.reader(file)
-            headers = next(reader)
-            for row in reader:
-                if len(row) >= 2:
-                    code = row[0].strip()
-                    long_desc = row[1].strip()
-                    icd9_database[code] = {
-                        'short_description': long_desc[:100] + "..." if len(long_desc) > 100 else long_desc,
-                        'long_description': long_desc,
-                        'system': 'ICD-9'
-                    }
-        print(f"[INFO] Loaded {len(icd9_database)} kode ICD-9 dari CSV")
-    except Exception as e:
-        print(f"[ERROR] Gagal load database ICD-9: {e}")
-    
-    return icd9_database
-
-# Load database dengan fallback
-try:
-    ICD10_DB = load_icd10_database()
-    ICD9_DB = load_icd9_database()
-except Exception as e:
-    print(f"[WARNING] Error loading ICD databases: {e}")
-    ICD10_DB = {}
-    ICD9_DB = {}
+# Halaman dengan teks digital <= batas ini dianggap scan dan di-OCR
+MIN_DIGITAL_TEXT_CHARS = 20
 
 # ============================================================
-# FUNGSI UNTUK MENGATASI MASALAH DATABASE ICD
+# DATABASE ICD-10 DAN ICD-9
 # ============================================================
-def add_missing_icd_codes():
-    """Tambahkan kode ICD-10 dan ICD-9 yang umum"""
-    common_icd10_codes = {
-        'A01.03': {
-            'short_description': 'Typhoid pneumonia',
-            'long_description': 'Typhoid pneumonia, stage 1',
-            'system': 'ICD-10'
-        },
-        'A0103': {
-            'short_description': 'Typhoid pneumonia',
-            'long_description': 'Typhoid pneumonia, stage 1',
-            'system': 'ICD-10'
-        },
-        'N18.5': {
-            'short_description': 'Chronic kidney disease, stage 5',
-            'long_description': 'Chronic kidney disease, stage 5 (end-stage renal disease)',
-            'system': 'ICD-10'
-        },
-        'N18.9': {
-            'short_description': 'Chronic kidney disease, unspecified',
-            'long_description': 'Chronic kidney disease, unspecified',
-            'system': 'ICD-10'
-        },
-        'I10': {
-            'short_description': 'Essential (primary) hypertension',
-            'long_description': 'Essential (primary) hypertension',
-            'system': 'ICD-10'
-        }
-    }
-    
-    common_icd9_codes = {
-        '38.95': {
-            'short_description': 'Venous catheterization',
-            'long_description': 'Venous catheterization, not elsewhere classified',
-            'system': 'ICD-9'
-        },
-        '39.95': {
-            'short_description': 'Hemodialysis',
-            'long_description': 'Hemodialysis',
-            'system': 'ICD-9'
-        },
-        '4800': {
-            'short_description': 'Pneumonia due to adenovirus',
-            'long_description': 'Pneumonia due to adenovirus',
-            'system': 'ICD-9'
-        }
-    }
-    
-    for code, desc in common_icd10_codes.items():
-        if code not in ICD10_DB:
-            ICD10_DB[code] = desc
-    
-    for code, desc in common_icd9_codes.items():
-        if code not in ICD9_DB:
-            ICD9_DB[code] = desc
+# CSV ICD dikompilasi menjadi artefak biner (services/icd_index.py) yang
+# di-mmap saat pertama kali dipakai. Bangun ulang: python manage.py build-icd-index
+def load_icd10_database(csv_path=ICD10_CSV_PATH):
+    """Load database ICD-10 dari file CSV"""
+    return read_icd10_csv(csv_path)
+
+def load_icd9_database(csv_path=ICD9_CSV_PATH):
+    """Load database ICD-9 dari file CSV"""
+    return read_icd9_csv(csv_path)
 
-add_missing_icd_codes()
+ICD10_DB = ICDDatabaseView(ICD10)
+ICD9_DB = ICDDatabaseView(ICD9)
 
 # ============================================================
 # FUNGSI VALIDASI ICD
 # ============================================================
 def validate_icd_code(code, icd10_database, icd9_database):
     """Validasi kode ICD-10 atau ICD-9 terhadap database"""
-    if not code:
-        return False, "Kode ICD kosong", None
-    
-    code = code.upper().strip()
-    
-    # Pattern untuk berbagai format ICD
-    icd9_pattern = r'^[0-9]{1,4}(\.[0-9]{1,2})?$'  # Format 4800 atau 38.95
-    icd10_pattern = r'^[A-Z][0-9]{2}(\.[0-9]{1,2})?$'  # Format A01.03
-    icd10_no_dot_pattern = r'^[A-Z][0-9]{3,4}$'  # Format A0103
-    
-    # Cek format A0103 (tanpa titik) dan konversi ke A01.03
-    if re.match(icd10_no_dot_pattern, code) and len(code) >= 3:
-        # Konversi A0103 menjadi A01.03
-        converted_code = code[:3] + '.' + code[3:]
-        if converted_code in icd10_database:
-            return True, f"Valid ICD-10 - {icd10_database[converted_code]['short_description']}", 'ICD-10'
-        elif code in icd10_database:  # Cek format asli juga
-            return True, f"Valid ICD-10 - {icd10_database[code]['short_description']}", 'ICD-10'
-    
-    # Cek ICD-10 dengan titik
-    if re.match(icd10_pattern, code):
-        if code in icd10_database:
-            return True, f"Valid ICD-10 - {icd10_database[code]['short_description']}", 'ICD-10'
-        else:
-            return False, "Kode ICD-10 tidak ditemukan dalam database", 'ICD-10'
-    
-    # Cek ICD-9 (format 4800 atau 38.95)
-    elif re.match(icd9_pattern, code):
-        # Normalisasi kode ICD-9 (tambahkan titik jika 4 digit tanpa titik)
-        if len(code) == 4 and '.' not in code:
-            normalized_code = code[:2] + '.' + code[2:]
-        else:
-            normalized_code = code
-            
-        if normalized_code in icd9_database:
-            return True, f"Valid ICD-9 - {icd9_database[normalized_code]['short_description']}", 'ICD-9'
-        elif code in icd9_database:  # Cek format asli juga
-            return True, f"Valid ICD-9 - {icd9_database[code]['short_description']}", 'ICD-9'
-        else:
-            return False, "Kode ICD-9 tidak ditemukan dalam database", 'ICD-9'
-    
-    else:
-        return False, "Format kode ICD tidak valid", None
+    if icd10_database is ICD10_DB and icd9_database is ICD9_DB:
+        return get_icd_index().validate(code)
+    return ICDIndex(icd10_database, icd9_database).validate(code)
+
+# Pattern yang lebih fleksibel untuk berbagai format
+ICD10_TEXT_RE = re.compile(r'[A-Z][0-9]{2}\.[0-9]{1,2}')
+ICD10_NO_DOT_TEXT_RE = re.compile(r'[A-Z][0-9]{3,4}(?=\s|$|[-–])')  # Format A0103
+ICD9_TEXT_RE = re.compile(r'\b([0-9]{1,4}(?:\.[0-9]{1,2})?)\b')  # Format 4800 atau 38.95
+ICD9_EXCLUDED_TOKENS = {'1980', '2024', '2025', '01', '10', '15'}
+
+def is_date_like_token(token):
+    """Token angka yang kemungkinan besar tahun/tanggal, bukan kode ICD-9"""
+    return token in ICD9_EXCLUDED_TOKENS or (
+        len(token) == 4 and token.isdigit() and 1900 < int(token) < 2100
+    )
 
 def detect_icd_codes_in_text(text):
     """Deteksi semua kode ICD-10 dan ICD-9 dalam teks"""
-    # Pattern yang lebih fleksibel untuk berbagai format
-    icd10_pattern = r'[A-Z][0-9]{2}\.[0-9]{1,2}'
-    icd10_no_dot_pattern = r'[A-Z][0-9]{3,4}(?=\s|$|[-–])'  # Format A0103
-    icd9_pattern = r'\b([0-9]{1,4}(?:\.[0-9]{1,2})?)\b'  # Format 4800 atau 38.95
-    
-    icd10_matches = re.findall(icd10_pattern, text)
-    icd10_no_dot_matches = re.findall(icd10_no_dot_pattern, text)
-    icd9_matches = re.findall(icd9_pattern, text)
-    
+    codes = ICD10_TEXT_RE.findall(text)
+    codes += ICD10_NO_DOT_TEXT_RE.findall(text)
     # Filter ICD-9 matches untuk menghindari tanggal/tahun
-    filtered_icd9_matches = []
-    for match in icd9_matches:
-        # Exclude obvious dates and years
-        if not (match in ['1980', '2024', '2025', '01', '10', '15'] or 
-                len(match) == 4 and match.isdigit() and int(match) > 1900 and int(match) < 2100):
-            filtered_icd9_matches.append(match)
-    
-    all_codes = []
-    
-    # Process ICD-10 dengan titik
-    for code in icd10_matches:
-        is_valid, validation_msg, system = validate_icd_code(code, ICD10_DB, ICD9_DB)
-        all_codes.append({
-            'code': code,
-            'system': system,
-            'valid': is_valid,
-            'validation_msg': validation_msg
-        })
+    codes += [match for match in ICD9_TEXT_RE.findall(text) if not is_date_like_token(match)]
     
-    # Process ICD-10 tanpa titik (format A0103)
-    for code in icd10_no_dot_matches:
-        is_valid, validation_msg, system = validate_icd_code(code, ICD10_DB, ICD9_DB)
-        all_codes.append({
+    return [
+        {
             'code': code,
             'system': system,
             'valid': is_valid,
             'validation_msg': validation_msg
-        })
-    
-    # Process ICD-9
-    for code in filtered_icd9_matches:
-        is_valid, validation_msg, system = validate_icd_code(code, ICD10_DB, ICD9_DB)
-        all_codes.append({
-            'code': code,
-            'system': system,
-            'valid': is_valid,
-            'validation_msg': validation_msg
-        })
-    
-    return all_codes
+        }
+        for code, (is_valid, validation_msg, system) in zip(codes, get_icd_index().validate_many(codes))
+    ]
 
 # ============================================================
 # FUNGSI OCR
 # ============================================================
-def pdf_has_text(pdf_path):
+def page_has_text(text: str) -> bool:
+    """Cek apakah teks digital satu halaman cukup untuk dipakai tanpa OCR"""
+    return len((text or "").strip()) > MIN_DIGITAL_TEXT_CHARS
+
+def pdf_has_text(pdf: DocumentSource):
     """Cek apakah PDF memiliki teks digital"""
     try:
-        doc = fitz.open(pdf_path)
-        for page in doc:
-            text = page.get_text().strip()
-            if len(text) > 20:
-                return True
-        return False
+        doc, owned = open_document(pdf)
+        try:
+            for i in range(doc.page_count):
+                if page_has_text(doc.page_text(i)):
+                    return True
+            return False
+        finally:
+            if owned:
+                doc.close()
     except Exception as e:
         print(f"[ERROR] Error checking PDF text: {e}")
         return False
 
-def extract_digital_text(pdf_path):
-    """Ekstrak teks digital dari PDF"""
+def format_pages(pages: List[str]) -> str:
+    """Gabungkan teks per halaman dengan penanda '=== HALAMAN n ==='"""
+    return "\n".join(f"\n=== HALAMAN {i+1} ===\n{text}" for i, text in enumerate(pages))
+
+def extract_digital_pages(pdf: DocumentSource) -> List[str]:
+    """Ekstrak teks digital dari PDF per halaman"""
     try:
-        doc = fitz.open(pdf_path)
-        result = []
-        for i, page in enumerate(doc):
-            text = page.get_text()
-            result.append(f"\n=== HALAMAN {i+1} ===\n{text}")
-        return "\n".join(result)
+        doc, owned = open_document(pdf)
+        try:
+            return doc.page_texts()
+        finally:
+            if owned:
+                doc.close()
     except Exception as e:
         print(f"[ERROR] Error extracting digital text: {e}")
-        return ""
+        return []
 
-def ocr_pdf(pdf_path):
-    """OCR PDF scan dengan Tesseract"""
+def extract_digital_text(pdf: DocumentSource):
+    """Ekstrak teks digital dari PDF"""
+    return format_pages(extract_digital_pages(pdf))
+
+def ocr_pdf_pages(pdf: DocumentSource, dpi: int = 300,
+                  page_indexes: Optional[List[int]] = None) -> List[str]:
+    """
+    OCR PDF scan dengan Tesseract (paralel per halaman via OCREngine).
+    Jika `page_indexes` diisi, hanya halaman tersebut yang di-render dan di-OCR.
+    """
     try:
-        images = convert_from_path(pdf_path, dpi=300)
-        temp_imgs = []
-        for i, img in enumerate(images):
-            name = f"temp_page_{i+1}.png"
-            img.save(name)
-            temp_imgs.append(name)
-    except Exception as e:
-        print(f"[WARNING] pdf2image gagal: {e} → fallback PyMuPDF.")
-        try:
-            doc = fitz.open(pdf_path)
-            temp_imgs = []
-            for i in range(len(doc)):
-                page = doc.load_page(i)
-                zoom = 300 / 72
-                mat = fitz.Matrix(zoom, zoom)
-                pix = page.get_pixmap(matrix=mat)
-                img_path = f"temp_page_{i+1}.png"
-                pix.save(img_path)
-                temp_imgs.append(img_path)
-        except Exception as e2:
-            print(f"[ERROR] PyMuPDF fallback juga gagal: {e2}")
-            return ""
-    
-    output = []
-    for i, img_path in enumerate(temp_imgs):
+        doc, owned = open_document(pdf)
         try:
-            text = pytesseract.image_to_string(Image.open(img_path), lang='ind+eng')
-            output.append(f"\n=== HALAMAN {i+1} ===\n{text}")
-            os.remove(img_path)
-        except Exception as e:
-            print(f"[ERROR] OCR halaman {i+1} gagal: {e}")
-            output.append(f"\n=== HALAMAN {i+1} ===\n[OCR GAGAL]")
+            if page_indexes is None:
+                page_indexes = list(range(doc.page_count))
+            images = [doc.render_page(i, dpi=dpi) for i in page_indexes]
+        finally:
+            if owned:
+                doc.close()
+    except Exception as e:
+        print(f"[ERROR] Render halaman PDF gagal: {e}")
+        return []
     
-    return "\n".join(output)
+    return get_ocr_engine().ocr_pages(images)
+
+def ocr_pdf(pdf: DocumentSource):
+    """OCR PDF scan dengan Tesseract"""
+    return format_pages(ocr_pdf_pages(pdf))
 
-def read_auto(path):
-    """Baca file secara otomatis (PDF atau gambar)"""
-    ext = path.lower().split(".")[-1]
-    if ext == "pdf":
-        print(f"[INFO] Menganalisis PDF: {path}")
-        if pdf_has_text(path):
-            print("[INFO] Terdeteksi TEKS DIGITAL → ekstrak langsung.")
-            return extract_digital_text(path)
+def read_pages(path: DocumentSource) -> Tuple[List[str], List[str]]:
+    """
+    Baca teks PDF per halaman. Keputusan digital vs OCR dibuat per halaman:
+    halaman dengan teks digital dipakai langsung, hanya halaman scan yang di-OCR.
+    Mengembalikan (teks per halaman, metode per halaman: "digital"/"ocr").
+    Hasil di-cache berdasarkan SHA-256.
+    """
+    if isinstance(path, str) and path.lower().split(".")[-1] != "pdf":
+        return [], []
+    
+    doc, owned = open_document(path)
+    try:
+        print(f"[INFO] Menganalisis PDF: {doc.path}")
+        cache = get_extraction_cache()
+        cached = cache.get(doc.checksum)
+        if cached:
+            print(f"[INFO] Extraction cache hit ({doc.checksum[:12]}) → skip ekstraksi/OCR.")
+            return cached["pages"], cached["methods"]
+        
+        pages = doc.page_texts()
+        methods = ["digital" if page_has_text(text) else "ocr" for text in pages]
+        ocr_indexes = [i for i, method in enumerate(methods) if method == "ocr"]
+        
+        if ocr_indexes:
+            print(f"[INFO] Halaman scan {[i+1 for i in ocr_indexes]} → gunakan OCR "
+                  f"({len(pages) - len(ocr_indexes)} halaman teks digital).")
+            if OCR_MODE == "roi":
+                ocr_texts, ocr_methods = ocr_pages_roi(doc, ocr_indexes, page_fields_complete)
+            else:
+                ocr_texts = ocr_pdf_pages(doc, dpi=OCR_DPI, page_indexes=ocr_indexes)
+                ocr_methods = ["ocr"] * len(ocr_indexes)
+            if len(ocr_texts) != len(ocr_indexes):
+                ocr_texts = [OCR_FAILED_TEXT] * len(ocr_indexes)
+            for i, text, method in zip(ocr_indexes, ocr_texts, ocr_methods):
+                pages[i] = text
+                methods[i] = method
         else:
-            print("[INFO] PDF adalah SCAN/GAMBAR → gunakan OCR.")
-            return ocr_pdf(path)
-    else:
-        return ""
+            print("[INFO] Semua halaman TEKS DIGITAL → ekstrak langsung.")
+        
+        # Jangan cache hasil yang gagal agar bisa dicoba ulang
+        if pages and OCR_FAILED_TEXT not in pages:
+            cache.put(doc.checksum, pages, methods)
+        return pages, methods
+    finally:
+        if owned:
+            doc.close()
+
+def read_auto(path: DocumentSource):
+    """Baca file secara otomatis (PDF atau gambar), hasil di-cache berdasarkan SHA-256"""
+    pages, _ = read_pages(path)
+    return format_pages(pages) if pages else ""
 
 # ============================================================
 # FUNGSI EKSTRAKSI DATA YANG DIPERBAIKI
 # ============================================================
+# Deklarasi field per jenis dokumen (dikompilasi sekali saat import)
+SEP_SPEC = DocumentSpec("sep", [
+    FieldSpec('no_sep', [
+        r'No\.?SEP\s*:\s*([A-Z0-9\-]+)',
+        r'SEP\s*:\s*([A-Z0-9\-]+)',
+    ]),
+    FieldSpec('tgl_sep', [
+        r'Tgl\.?SEP\s*:\s*(\d{4}-\d{2}-\d{2})',
+        r'Tanggal\s*SEP\s*:\s*(\d{4}-\d{2}-\d{2})',
+    ]),
+    FieldSpec('no_kartu', [
+        r'No\.?Kartu\s*:\s*([0-9]+)',
+        r'Kartu\s*:\s*([0-9]+)',
+    ]),
+    FieldSpec('nama_pasien', [
+        r'Nama\s*Peserta\s*:\s*([^\n]+)',
+        r'Nama\s*:\s*([^\n]+)',
+    ]),
+    # Kode + deskripsi diagnosa (case-sensitive: kode ICD huruf besar)
+    FieldSpec('diagnosa', [
+        r'Diagnosa\s*Awal\s*:\s*[-\s]*([A-Z][0-9]{2}\.?[0-9]*)\s*[-–]\s*([^\n]+)',
+    ], flags=0),
+    FieldSpec('diagnosa_section', [
+        r'Diagnosa\s*Awal\s*:\s*([^\n]+)',
+    ], on_demand=True),
+])
+
+RUJUKAN_SPEC = DocumentSpec("rujukan", [
+    FieldSpec('no_rujukan', [
+        r'No\.?\s*Rujukan\s*:\s*([^\n]+)',
+        r'Rujukan\s*:\s*([^\n]+)',
+    ]),
+    FieldSpec('nama_pasien_rujukan', [
+        r'Nama\s*:\s*([^\n]+)',
+        r'Peserta\s*:\s*([^\n]+)',
+    ]),
+    FieldSpec('diagnosa_rujukan', [
+        r'Diagnosa\s*:\s*([^\n]+)',
+        r'Diagnosa\s*Awal\s*:\s*([^\n]+)',
+    ]),
+    FieldSpec('tanda_tangan_dokter', [
+        r'Dr\.\s*[A-Za-z\s]+\s*$',  # Pattern untuk nama dokter di akhir dokumen
+        r'Tanda\s*tangan',
+    ]),
+    FieldSpec('dokter_perujuk', [
+        r'Dr\.\s*([A-Za-z\s]+)',
+    ], on_demand=True),
+])
+
+REKAM_MEDIS_SPEC = DocumentSpec("rekam_medis", [
+    FieldSpec('no_rekam_medis', [
+        r'No\.?\s*Rekam\s*Medik?\s*:\s*([A-Z0-9\-]+)',
+        r'No\.?RM\s*:\s*([A-Z0-9\-]+)',
+    ]),
+    FieldSpec('nama_pasien_rm', [
+        r'Nama\s*Pasien\s*:\s*([^\n]+)',
+        r'Nama\s*:\s*([^\n]+)',
+    ]),
+    FieldSpec('diagnosa_rm', [
+        r'Diagnosa\s*masuk\s*:\s*([^\n]+)',
+        r'Diagnosa\s*Utama\s*:\s*([^\n]+)',
+        r'ICD X\s*([A-Z0-9\.]+)',
+    ], mode=ALL),
+    FieldSpec('dokter_dpip', [
+        r'Dokter\s*yang\s*merawat\s*:\s*Dr\.\s*([^\n]+)',
+        r'Dr\.\s*([A-Za-z\s]+)(?=\s*Tanda\s*tangan)',
+    ]),
+    # Section operasi/tindakan, kode ICD-9 dicari di dalamnya
+    FieldSpec('operasi_section', [
+        r'Operasi\s*/\s*Tindakan\s*:([^•]+?)(?=Infeksi Nosokomial|Imunisasi|Keadaan KRS|$)',
+    ], flags=re.IGNORECASE | re.DOTALL),
+])
+
+# Kode ICD-9 dalam format "4800 - Deskripsi"
+TINDAKAN_RE = re.compile(r'(\d{4})\s*-\s*([^\n]+)')
+NON_ALPHA_RE = re.compile(r'[^A-Za-z\s]')
+UMUR_SUFFIX_RE = re.compile(r'Umur\s*:.*')
+PARENTHESES_RE = re.compile(r'\([^)]*\)')
+
 def extract_sep_info(text):
     """Ekstrak informasi dari SEP dengan pattern yang lebih akurat"""
     info = {
@@ -434,97 +330,43 @@ def extract_sep_info(text):
     }
     
     field_wajib_sep = ['no_sep', 'nama_pasien', 'tgl_sep', 'no_kartu', 'diagnosa']
+    fields = SEP_SPEC.extract(text)
     
-    # Pattern untuk nomor SEP - lebih akurat
-    sep_patterns = [
-        r'No\.?SEP\s*:\s*([A-Z0-9\-]+)',
-        r'SEP\s*:\s*([A-Z0-9\-]+)',
-    ]
-    
-    for pattern in sep_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            info['no_sep'] = match.group(1).strip()
-            break
-    
-    # Pattern untuk tanggal SEP - lebih spesifik
-    tgl_sep_patterns = [
-        r'Tgl\.?SEP\s*:\s*(\d{4}-\d{2}-\d{2})',
-        r'Tanggal\s*SEP\s*:\s*(\d{4}-\d{2}-\d{2})',
-    ]
-    
-    for pattern in tgl_sep_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            info['tgl_sep'] = match.group(1).strip()
-            break
+    for field in ['no_sep', 'tgl_sep', 'no_kartu']:
+        if fields[field]:
+            info[field] = fields[field][0].strip()
     
-    # Pattern untuk nomor kartu - lebih spesifik
-    no_kartu_patterns = [
-        r'No\.?Kartu\s*:\s*([0-9]+)',
-        r'Kartu\s*:\s*([0-9]+)',
-    ]
-    
-    for pattern in no_kartu_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            info['no_kartu'] = match.group(1).strip()
-            break
+    if fields['nama_pasien']:
+        # Hapus karakter non-alfabetik tetapi pertahankan spasi
+        info['nama_pasien'] = NON_ALPHA_RE.sub('', fields['nama_pasien'][0].strip()).strip()
     
-    # Pattern untuk nama pasien
-    nama_patterns = [
-        r'Nama\s*Peserta\s*:\s*([^\n]+)',
-        r'Nama\s*:\s*([^\n]+)',
-    ]
-    
-    for pattern in nama_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            nama = match.group(1).strip()
-            # Hapus karakter non-alfabetik tetapi pertahankan spasi
-            nama = re.sub(r'[^A-Za-z\s]', '', nama).strip()
-            info['nama_pasien'] = nama
-            break
-    
-    # Pattern untuk diagnosa - lebih akurat berdasarkan format dokumen
-    diagnosa_patterns = [
-        r'Diagnosa\s*Awal\s*:\s*[-\s]*([A-Z][0-9]{2}\.?[0-9]*)\s*[-–]\s*([^\n]+)',
-        r'Diagnosa\s*Awal\s*:\s*([^\n]+)',
-    ]
+    # Diagnosa dengan format "KODE - Deskripsi"
+    if fields['diagnosa']:
+        kode = fields['diagnosa'][0].strip()
+        deskripsi = fields['diagnosa'][1].strip()
+        is_valid, validation_msg, system = validate_icd_code(kode, ICD10_DB, ICD9_DB)
+        
+        info['diagnosa'].append({
+            'kode': kode, 'deskripsi': deskripsi, 'valid_icd': is_valid,
+            'validation_msg': validation_msg, 'system': system
+        })
     
-    for pattern in diagnosa_patterns:
-        matches = re.findall(pattern, text)
-        for match in matches:
-            if isinstance(match, tuple) and len(match) == 2:
-                kode = match[0].strip()
-                deskripsi = match[1].strip()
-                is_valid, validation_msg, system = validate_icd_code(kode, ICD10_DB, ICD9_DB)
-                
+    # Fallback: cari kode ICD-10 dalam teks diagnosa
+    diagnosa_section = SEP_SPEC['diagnosa_section'].first(text) if not info['diagnosa'] else None
+    if diagnosa_section:
+        diagnosa_text = diagnosa_section[0].strip()
+        all_icd_codes = detect_icd_codes_in_text(diagnosa_text)
+        for icd_info in all_icd_codes:
+            if icd_info['system'] == 'ICD-10':
                 info['diagnosa'].append({
-                    'kode': kode, 'deskripsi': deskripsi, 'valid_icd': is_valid,
-                    'validation_msg': validation_msg, 'system': system
+                    'kode': icd_info['code'], 
+                    'deskripsi': diagnosa_text,
+                    'valid_icd': icd_info['valid'], 
+                    'validation_msg': icd_info['validation_msg'],
+                    'system': icd_info['system']
                 })
                 break
     
-    # Fallback: cari kode ICD-10 dalam teks diagnosa
-    if not info['diagnosa']:
-        # Cari bagian diagnosa terlebih dahulu
-        diagnosa_section_pattern = r'Diagnosa\s*Awal\s*:\s*([^\n]+)'
-        diagnosa_match = re.search(diagnosa_section_pattern, text, re.IGNORECASE)
-        if diagnosa_match:
-            diagnosa_text = diagnosa_match.group(1).strip()
-            all_icd_codes = detect_icd_codes_in_text(diagnosa_text)
-            for icd_info in all_icd_codes:
-                if icd_info['system'] == 'ICD-10':
-                    info['diagnosa'].append({
-                        'kode': icd_info['code'], 
-                        'deskripsi': diagnosa_text,
-                        'valid_icd': icd_info['valid'], 
-                        'validation_msg': icd_info['validation_msg'],
-                        'system': icd_info['system']
-                    })
-                    break
-    
     # Update status validasi ICD-10
     if info['icd10_validation']['errors']:
         info['icd10_validation']['status'] = 'GAGAL'
@@ -535,7 +377,7 @@ def extract_sep_info(text):
     
     # Cek field missing
     for field in field_wajib_sep:
-        if not info[field] or (field == 'diagnosa' and not info[field]):
+        if not info[field]:
             info['field_missing'].append(field)
     
     return info
@@ -548,84 +390,43 @@ def extract_rujukan_info(text):
     }
     
     field_wajib_rujukan = ['no_rujukan', 'nama_pasien_rujukan', 'diagnosa_rujukan', 'tanda_tangan_dokter']
-    
-    # Pattern untuk nomor rujukan - lebih akurat
-    rujukan_patterns = [
-        r'No\.?\s*Rujukan\s*:\s*([^\n]+)',
-        r'Rujukan\s*:\s*([^\n]+)',
-    ]
-    
-    for pattern in rujukan_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            no_rujukan = match.group(1).strip()
-            # Filter untuk menghindari kata "Puskesmas"
-            if no_rujukan.lower() != "puskesmas":
-                info['no_rujukan'] = no_rujukan
-            break
-    
-    # Pattern untuk nama pasien
-    nama_patterns = [
-        r'Nama\s*:\s*([^\n]+)',
-        r'Peserta\s*:\s*([^\n]+)',
-    ]
-    
-    for pattern in nama_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            nama = match.group(1).strip()
-            # Hapus informasi tambahan seperti "Umur : 45 Tahun : 1980-01-01"
-            nama = re.sub(r'Umur\s*:.*', '', nama).strip()
-            nama = re.sub(r'[^A-Za-z\s]', '', nama).strip()
-            info['nama_pasien_rujukan'] = nama
-            break
-    
-    # Pattern untuk diagnosa - lebih akurat
-    diagnosa_patterns = [
-        r'Diagnosa\s*:\s*([^\n]+)',
-        r'Diagnosa\s*Awal\s*:\s*([^\n]+)',
-    ]
-    
-    for pattern in diagnosa_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            diagnosa_text = match.group(1).strip()
-            # Hapus informasi tambahan dalam kurung
-            diagnosa_text = re.sub(r'\([^)]*\)', '', diagnosa_text).strip()
-            
-            all_icd_codes = detect_icd_codes_in_text(diagnosa_text)
-            
-            for icd_info in all_icd_codes:
-                info['diagnosa_rujukan'].append({
-                    'kode': icd_info['code'], 
-                    'deskripsi': diagnosa_text,
-                    'valid_icd': icd_info['valid'], 
-                    'validation_msg': icd_info['validation_msg'],
-                    'system': icd_info['system']
-                })
-            break
+    fields = RUJUKAN_SPEC.extract(text)
+    
+    if fields['no_rujukan']:
+        no_rujukan = fields['no_rujukan'][0].strip()
+        # Filter untuk menghindari kata "Puskesmas"
+        if no_rujukan.lower() != "puskesmas":
+            info['no_rujukan'] = no_rujukan
+    
+    if fields['nama_pasien_rujukan']:
+        nama = fields['nama_pasien_rujukan'][0].strip()
+        # Hapus informasi tambahan seperti "Umur : 45 Tahun : 1980-01-01"
+        nama = UMUR_SUFFIX_RE.sub('', nama).strip()
+        info['nama_pasien_rujukan'] = NON_ALPHA_RE.sub('', nama).strip()
+    
+    if fields['diagnosa_rujukan']:
+        # Hapus informasi tambahan dalam kurung
+        diagnosa_text = PARENTHESES_RE.sub('', fields['diagnosa_rujukan'][0].strip()).strip()
+        
+        for icd_info in detect_icd_codes_in_text(diagnosa_text):
+            info['diagnosa_rujukan'].append({
+                'kode': icd_info['code'], 
+                'deskripsi': diagnosa_text,
+                'valid_icd': icd_info['valid'], 
+                'validation_msg': icd_info['validation_msg'],
+                'system': icd_info['system']
+            })
     
     # Cek tanda tangan dokter
-    tanda_tangan_patterns = [
-        r'Dr\.\s*[A-Za-z\s]+\s*$',  # Pattern untuk nama dokter di akhir dokumen
-        r'Tanda\s*tangan',
-    ]
-    
-    for pattern in tanda_tangan_patterns:
-        if re.search(pattern, text, re.IGNORECASE):
-            info['tanda_tangan_dokter'] = True
-            # Extract nama dokter
-            doctor_match = re.search(r'Dr\.\s*([A-Za-z\s]+)', text, re.IGNORECASE)
-            if doctor_match:
-                info['dokter_perujuk'] = doctor_match.group(1).strip()
-            break
+    if fields['tanda_tangan_dokter']:
+        info['tanda_tangan_dokter'] = True
+        dokter = RUJUKAN_SPEC['dokter_perujuk'].first(text)
+        if dokter:
+            info['dokter_perujuk'] = dokter[0].strip()
     
     # Cek field missing
     for field in field_wajib_rujukan:
-        if field == 'tanda_tangan_dokter':
-            if not info[field]:
-                info['field_missing'].append(field)
-        elif not info[field] or (field == 'diagnosa_rujukan' and not info[field]):
+        if not info[field]:
             info['field_missing'].append(field)
     
     return info
@@ -640,81 +441,35 @@ def extract_rekam_medis_info(text):
     }
     
     field_wajib_rm = ['no_rekam_medis', 'nama_pasien_rm', 'diagnosa_rm', 'dokter_dpip']
+    fields = REKAM_MEDIS_SPEC.extract(text)
     
-    # Pattern untuk nomor rekam medis
-    rm_patterns = [
-        r'No\.?\s*Rekam\s*Medik?\s*:\s*([A-Z0-9\-]+)',
-        r'No\.?RM\s*:\s*([A-Z0-9\-]+)',
-    ]
-    
-    for pattern in rm_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            info['no_rekam_medis'] = match.group(1).strip()
-            break
+    if fields['no_rekam_medis']:
+        info['no_rekam_medis'] = fields['no_rekam_medis'][0].strip()
     
-    # Pattern untuk nama pasien
-    nama_patterns = [
-        r'Nama\s*Pasien\s*:\s*([^\n]+)',
-        r'Nama\s*:\s*([^\n]+)',
-    ]
-    
-    for pattern in nama_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            nama = match.group(1).strip()
-            nama = re.sub(r'[^A-Za-z\s]', '', nama).strip()
-            info['nama_pasien_rm'] = nama
-            break
-    
-    # Pattern untuk diagnosa - lebih akurat
-    diagnosa_patterns = [
-        r'Diagnosa\s*masuk\s*:\s*([^\n]+)',
-        r'Diagnosa\s*Utama\s*:\s*([^\n]+)',
-        r'ICD X\s*([A-Z0-9\.]+)',
-    ]
+    if fields['nama_pasien_rm']:
+        info['nama_pasien_rm'] = NON_ALPHA_RE.sub('', fields['nama_pasien_rm'][0].strip()).strip()
     
-    for pattern in diagnosa_patterns:
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        for match in matches:
-            if isinstance(match, str):
-                diagnosa_text = match.strip()
-                all_icd_codes = detect_icd_codes_in_text(diagnosa_text)
-                
-                for icd_info in all_icd_codes:
-                    info['diagnosa_rm'].append({
-                        'kode': icd_info['code'], 
-                        'deskripsi': diagnosa_text,
-                        'valid_icd': icd_info['valid'], 
-                        'validation_msg': icd_info['validation_msg'],
-                        'system': icd_info['system']
-                    })
+    for (diagnosa_match,) in fields['diagnosa_rm']:
+        diagnosa_text = diagnosa_match.strip()
+        for icd_info in detect_icd_codes_in_text(diagnosa_text):
+            info['diagnosa_rm'].append({
+                'kode': icd_info['code'], 
+                'deskripsi': diagnosa_text,
+                'valid_icd': icd_info['valid'], 
+                'validation_msg': icd_info['validation_msg'],
+                'system': icd_info['system']
+            })
     
     # Cek dokter DPJP
-    dokter_patterns = [
-        r'Dokter\s*yang\s*merawat\s*:\s*Dr\.\s*([^\n]+)',
-        r'Dr\.\s*([A-Za-z\s]+)(?=\s*Tanda\s*tangan)',
-    ]
-    
-    for pattern in dokter_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            info['dokter_dpip'] = match.group(1).strip()
-            info['tanda_tangan_dpip'] = True
-            break
+    if fields['dokter_dpip']:
+        info['dokter_dpip'] = fields['dokter_dpip'][0].strip()
+        info['tanda_tangan_dpip'] = True
     
-    # EKSTRAKSI TINDAKAN MEDIS YANG LEBIH AKURAT
-    # Cari section operasi/tindakan terlebih dahulu
-    operasi_section_pattern = r'Operasi\s*/\s*Tindakan\s*:([^•]+?)(?=Infeksi Nosokomial|Imunisasi|Keadaan KRS|$)'
-    operasi_match = re.search(operasi_section_pattern, text, re.IGNORECASE | re.DOTALL)
-    
-    if operasi_match:
-        operasi_text = operasi_match.group(1).strip()
-        # Cari kode ICD-9 dalam format "4800 - Deskripsi"
-        tindakan_pattern = r'(\d{4})\s*-\s*([^\n]+)'
-        tindakan_matches = re.findall(tindakan_pattern, operasi_text)
+    # EKSTRAKSI TINDAKAN MEDIS DARI SECTION OPERASI/TINDAKAN
+    if fields['operasi_section']:
+        operasi_text = fields['operasi_section'][0].strip()
         
-        for kode, deskripsi in tindakan_matches:
+        for kode, deskripsi in TINDAKAN_RE.findall(operasi_text):
             deskripsi = deskripsi.strip()
             # Skip jika deskripsi adalah "Golongan Operasi" atau kosong
             if deskripsi and "golongan" not in deskripsi.lower():
@@ -740,7 +495,7 @@ def extract_rekam_medis_info(text):
     
     # Cek field missing
     for field in field_wajib_rm:
-        if not info[field] or (field == 'diagnosa_rm' and not info[field]):
+        if not info[field]:
             info['field_missing'].append(field)
     
     return info
@@ -748,29 +503,51 @@ def extract_rekam_medis_info(text):
 # ============================================================
 # FUNGSI VALIDASI YANG DIPERBAIKI
 # ============================================================
-def validate_single_pdf_structure(pdf_path: str) -> Dict[str, Any]:
+def page_fields_complete(index: int, text: str) -> bool:
+    """
+    Cek apakah field wajib halaman klaim (0: SEP, 1: rujukan, 2: rekam medis)
+    sudah terbaca dari teks. Dipakai ROI OCR untuk memutuskan fallback ke
+    OCR halaman penuh; field opsional mengikuti aturan validate_pdf_content_improved.
+    """
+    if index == 0:
+        missing = [f for f in extract_sep_info(text)['field_missing'] if f not in ['tgl_sep', 'no_kartu']]
+    elif index == 1:
+        missing = [f for f in extract_rujukan_info(text)['field_missing'] if f != 'diagnosa_rujukan']
+    elif index == 2:
+        rm_info = extract_rekam_medis_info(text)
+        missing = [f for f in rm_info['field_missing'] if f != 'dokter_dpip']
+        if not rm_info['tanda_tangan_dpip']:
+            missing.append('tanda_tangan_dpip')
+    else:
+        return True
+    return not missing
+
+def validate_single_pdf_structure(pdf: DocumentSource) -> Dict[str, Any]:
     """Validasi struktur PDF - 3 halaman wajib"""
     try:
-        with open(pdf_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            page_count = len(pdf_reader.pages)
-            
-            if page_count != REQUIRED_PAGE_COUNT:
-                return {
-                    "valid": False,
-                    "message": f"File harus memiliki {REQUIRED_PAGE_COUNT} halaman, ditemukan {page_count} halaman",
-                    "page_count": page_count,
-                    "missing_pages": REQUIRED_PAGES,
-                    "required_page_count": REQUIRED_PAGE_COUNT
-                }
-            
+        doc, owned = open_document(pdf)
+        try:
+            page_count = doc.page_count
+        finally:
+            if owned:
+                doc.close()
+        
+        if page_count != REQUIRED_PAGE_COUNT:
             return {
-                "valid": True,
-                "message": "Struktur PDF valid - 3 halaman terdeteksi",
+                "valid": False,
+                "message": f"File harus memiliki {REQUIRED_PAGE_COUNT} halaman, ditemukan {page_count} halaman",
                 "page_count": page_count,
-                "missing_pages": [],
+                "missing_pages": REQUIRED_PAGES,
                 "required_page_count": REQUIRED_PAGE_COUNT
             }
+        
+        return {
+            "valid": True,
+            "message": "Struktur PDF valid - 3 halaman terdeteksi",
+            "page_count": page_count,
+            "missing_pages": [],
+            "required_page_count": REQUIRED_PAGE_COUNT
+        }
             
     except Exception as e:
         return {
@@ -781,13 +558,14 @@ def validate_single_pdf_structure(pdf_path: str) -> Dict[str, Any]:
             "required_page_count": REQUIRED_PAGE_COUNT
         }
 
-def validate_pdf_content_improved(pdf_path: str) -> Dict[str, Any]:
+def validate_pdf_content_improved(pdf_path: DocumentSource) -> Dict[str, Any]:
     """
     Validasi konten PDF dengan pattern matching yang lebih akurat
     """
     try:
-        # Baca teks dari PDF
-        full_text = read_auto(pdf_path)
+        # Baca teks dari PDF (digital/OCR diputuskan per halaman)
+        pages, page_methods = read_pages(pdf_path)
+        full_text = format_pages(pages) if pages else ""
         
         if not full_text:
             return {
@@ -798,19 +576,8 @@ def validate_pdf_content_improved(pdf_path: str) -> Dict[str, Any]:
                 "validation_details": {}
             }
         
-        # Pisahkan teks berdasarkan halaman
-        pages = full_text.split("=== HALAMAN")
-        
         # Ekstrak teks per halaman untuk 3 halaman
-        sep_text, rujukan_text, rekam_medis_text = "", "", ""
-        
-        for i, page in enumerate(pages):
-            if "1" in page[:5]: 
-                sep_text = page
-            elif "2" in page[:5]: 
-                rujukan_text = page
-            elif "3" in page[:5]: 
-                rekam_medis_text = page
+        sep_text, rujukan_text, rekam_medis_text = (pages + ["", "", ""])[:3]
         
         # Fallback jika tidak terpisah dengan baik
         if not sep_text: sep_text = full_text
@@ -826,7 +593,11 @@ def validate_pdf_content_improved(pdf_path: str) -> Dict[str, Any]:
         validation_details = {
             'sep': sep_info, 'rujukan': rujukan_info, 'rekam_medis': rm_info,
             'field_validation': {}, 'diagnosa_validation': {}, 'signature_validation': {},
-            'icd10_validation': {}, 'icd9_validation': {}
+            'icd10_validation': {}, 'icd9_validation': {},
+            'page_extraction': [
+                {'page': i + 1, 'method': method, 'chars': len(text.strip())}
+                for i, (text, method) in enumerate(zip(pages, page_methods))
+            ]
         }
         
         # 1. VALIDASI FIELD WAJIB - LEBIH FLEKSIBEL
@@ -918,9 +689,12 @@ def validate_pdf_content_improved(pdf_path: str) -> Dict[str, Any]:
             "validation_details": {}
         }
 
-def validate_claim_documents(pdf_files: List[str]) -> Dict[str, Any]:
+def validate_claim_documents(pdf_files: List[DocumentSource]) -> Dict[str, Any]:
     """
     Validasi dokumen claim - fungsi utama yang diekspor untuk 3 halaman
+
+    `pdf_files` boleh berisi path atau ClaimDocument yang sudah dibuka,
+    sehingga satu dokumen cukup dibuka sekali untuk validasi dan processing.
     """
     print(f"[INFO] Memulai validasi untuk {len(pdf_files)} file PDF (3 halaman)")
     
@@ -944,21 +718,30 @@ def validate_claim_documents(pdf_files: List[str]) -> Dict[str, Any]:
         return result
     
     for pdf_file in pdf_files:
-        filename = os.path.basename(pdf_file)
+        file_path = pdf_file.path if isinstance(pdf_file, ClaimDocument) else pdf_file
+        filename = os.path.basename(file_path)
         print(f"[INFO] Memvalidasi file: {filename}")
         
         file_result = {
             "filename": filename,
-            "file_path": pdf_file,
+            "file_path": file_path,
             "valid": False,
             "message": "",
             "errors": [],
             "warnings": []
         }
         
+        document = None
+        owned = False
         try:
+            # Dokumen dibuka sekali untuk validasi struktur dan konten
+            try:
+                document, owned = open_document(pdf_file)
+            except Exception:
+                document = pdf_file
+
             # 1. Validasi struktur PDF - 3 HALAMAN WAJIB
-            structure_validation = validate_single_pdf_structure(pdf_file)
+            structure_validation = validate_single_pdf_structure(document)
             
             if not structure_validation["valid"]:
                 error_msg = structure_validation['message']
@@ -970,7 +753,7 @@ def validate_claim_documents(pdf_files: List[str]) -> Dict[str, Any]:
                 continue
             
             # 2. Validasi konten PDF - IMPROVED
-            content_validation = validate_pdf_content_improved(pdf_file)
+            content_validation = validate_pdf_content_improved(document)
             
             file_result["valid"] = content_validation["valid"]
             file_result["message"] = content_validation['message']
@@ -994,6 +777,9 @@ def validate_claim_documents(pdf_files: List[str]) -> Dict[str, Any]:
             validation_errors.append(f"{filename}: {error_msg}")
             all_results.append(file_result)
             print(f"[ERROR] {error_msg}")
+        finally:
+            if owned:
+                document.close()
     
     # Buat hasil akhir
     final_result = {
@@ -1005,8 +791,8 @@ def validate_claim_documents(pdf_files: List[str]) -> Dict[str, Any]:
         "total_files_processed": len(pdf_files),
         "files_valid": len(valid_files),
         "files_failed": len(validation_errors),
-        "filename": pdf_files[0] if pdf_files else "none",
-        "file_path": pdf_files[0] if pdf_files else "none"
+        "filename": all_results[0]["file_path"] if all_results else "none",
+        "file_path": all_results[0]["file_path"] if all_results else "none"
     }
     
     # Simpan hasil ke database
@@ -0,0 +1,34 @@
+import time
+import threading
+
+# ============================================================
+# WARM-UP
+# ============================================================
+# Modul berat (PyMuPDF, pytesseract + pandas, PIL) dan index ICD tidak lagi
+# dimuat saat import. Warm-up memuatnya di background setelah proses siap
+# melayani request sehingga upload pertama tidak menanggung biaya tersebut.
+
+
+def warm_up():
+    """Muat modul berat, index ICD dan tabel hasil validasi"""
+    start = time.perf_counter()
+    try:
+        import fitz  # noqa: F401  PyMuPDF
+        import pytesseract  # noqa: F401
+        from PIL import Image  # noqa: F401
+
+        from services.icd_index import get_icd_index
+        from services.validation import ensure_database
+
+        get_icd_index()
+        ensure_database()
+        print(f"🔥 Warm-up selesai dalam {(time.perf_counter() - start) * 1000:.0f} ms")
+    except Exception as e:
+        print(f"⚠️ Warm-up gagal: {e}")
+
+
+def start_warm_up() -> threading.Thread:
+    """Jalankan warm_up di thread background"""
+    thread = threading.Thread(target=warm_up, name="warm-up", daemon=True)
+    thread.start()
+    return thread
@@ -1,9 +1,18 @@
 from .security import verify_password, get_password_hash, create_access_token, verify_token
-from .file_utils import validate_archive, extract_archive, calculate_checksum
+from .file_utils import (
+    validate_archive, extract_archive, calculate_checksum, save_stream_with_checksum, FileTooLargeError,
+    read_zip_members, read_rar_members, list_archive_members, ArchiveMember, ArchiveError
+)
 from .constants import ALLOWED_FILE_TYPES, MAX_FILE_SIZE
+from .upload_limits import UploadSizeLimitMiddleware, MULTIPART_OVERHEAD
+from .pagination import encode_cursor, decode_cursor, apply_keyset, next_cursor, NEXT_CURSOR_HEADER, MAX_PAGE_SIZE
 
 __all__ = [
     'verify_password', 'get_password_hash', 'create_access_token', 'verify_token',
     'validate_archive', 'extract_archive', 'calculate_checksum',
-    'ALLOWED_FILE_TYPES', 'MAX_FILE_SIZE'
+    'save_stream_with_checksum', 'FileTooLargeError',
+    'read_zip_members', 'read_rar_members', 'list_archive_members', 'ArchiveMember', 'ArchiveError',
+    'ALLOWED_FILE_TYPES', 'MAX_FILE_SIZE',
+    'UploadSizeLimitMiddleware', 'MULTIPART_OVERHEAD',
+    'encode_cursor', 'decode_cursor', 'apply_keyset', 'next_cursor', 'NEXT_CURSOR_HEADER', 'MAX_PAGE_SIZE'
 ]
\ No newline at end of file
@@ -1,8 +1,372 @@
 import os
+import uuid
+import shutil
+import hashlib
 import subprocess
+import threading
 import zipfile
-from typing import List
+from typing import BinaryIO, Callable, Collection, List, Optional, Tuple
 
+# Ukuran chunk untuk streaming upload dan perhitungan checksum
+CHUNK_SIZE = 1024 * 1024  # 1MB
+
+# Member arsip di atas ukuran ini ditulis ke disk, sisanya tetap di memori
+ARCHIVE_SPILL_THRESHOLD = int(os.getenv("ARCHIVE_SPILL_THRESHOLD", str(8 * 1024 * 1024)))  # 8MB
+# Total isi member yang boleh ditahan di memori per arsip; selebihnya di-spill
+ARCHIVE_MEMORY_BUDGET = int(os.getenv("ARCHIVE_MEMORY_BUDGET", str(64 * 1024 * 1024)))  # 64MB
+# Batas arsip yang dibaca (zip bomb): jumlah member dan total ukuran tak terkompresi
+ARCHIVE_MAX_MEMBERS = int(os.getenv("ARCHIVE_MAX_MEMBERS", "500"))
+ARCHIVE_MAX_UNCOMPRESSED_SIZE = int(os.getenv("ARCHIVE_MAX_UNCOMPRESSED_SIZE", str(512 * 1024 * 1024)))  # 512MB
+
+
+class ArchiveError(Exception):
+    """Arsip tidak valid, rusak, atau format tidak didukung"""
+
+
+class ArchiveMember:
+    """
+    Satu file di dalam arsip. Isinya ada di `data` (memori) atau `path`
+    (di-spill ke disk karena melewati ARCHIVE_SPILL_THRESHOLD).
+    """
+
+    def __init__(self, name: str, size: int, checksum: Optional[str],
+                 data: Optional[bytes] = None, path: Optional[str] = None):
+        self.name = name
+        self.size = size
+        self.checksum = checksum
+        self.data = data
+        self.path = path
+
+    def __repr__(self):
+        location = self.path or "<memory>"
+        return f"<ArchiveMember {self.name} {self.size}B {location}>"
+
+
+class FileTooLargeError(Exception):
+    """Upload melebihi batas ukuran; file parsial sudah dihapus"""
+
+    def __init__(self, max_bytes: int, received_bytes: int):
+        self.max_bytes = max_bytes
+        self.received_bytes = received_bytes
+        super().__init__(f"File exceeds maximum size of {max_bytes} bytes")
+
+
+def save_stream_with_checksum(
+    source: BinaryIO,
+    dest_path: str,
+    max_bytes: Optional[int] = None,
+    chunk_size: int = CHUNK_SIZE
+) -> Tuple[int, str]:
+    """
+    Tulis stream ke `dest_path` per chunk besar sambil menghitung SHA-256.
+    Berhenti dan hapus file parsial begitu ukuran melewati `max_bytes`.
+    Untuk UploadFile, body request sudah di-spool Starlette sebelum fungsi ini
+    dipanggil; batas transfer jaringan ditegakkan oleh UploadSizeLimitMiddleware.
+    Returns (size in bytes, sha256 hexdigest).
+    """
+    sha256 = hashlib.sha256()
+    size = 0
+    try:
+        with open(dest_path, "wb") as buffer:
+            while True:
+                chunk = source.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if max_bytes is not None and size > max_bytes:
+                    raise FileTooLargeError(max_bytes, size)
+                sha256.update(chunk)
+                buffer.write(chunk)
+    except BaseException:
+        if os.path.exists(dest_path):
+            os.remove(dest_path)
+        raise
+
+    return size, sha256.hexdigest()
+
+
+# Callback progress per member: (nama member, urutan mulai 1, total member atau None)
+ProgressCallback = Callable[[str, int, Optional[int]], None]
+
+
+def _read_member(
+    name: str,
+    size: int,
+    open_member: Callable[[], BinaryIO],
+    index: int,
+    spill_dir: Optional[str],
+    spill: bool,
+    suffixes: Tuple[str, ...]
+) -> Optional[ArchiveMember]:
+    """
+    Baca satu member arsip sampai habis (memicu verifikasi CRC oleh library)
+    sambil menghitung SHA-256. Member dengan akhiran `suffixes` disimpan di
+    memori atau di-spill ke `spill_dir` (spill=True); member lain dibuang
+    setelah dibaca.
+    """
+    keep = name.lower().endswith(suffixes)
+    spill = keep and spill
+    sha256 = hashlib.sha256()
+    chunks = []
+    spill_path = None
+    out = None
+
+    if spill:
+        spill_path = os.path.join(spill_dir, f"{index}_{os.path.basename(name)}")
+        os.makedirs(spill_dir, exist_ok=True)
+        out = open(spill_path, "wb")
+
+    try:
+        with open_member() as member:
+            for chunk in iter(lambda: member.read(CHUNK_SIZE), b""):
+                sha256.update(chunk)
+                if out is not None:
+                    out.write(chunk)
+                elif keep:
+                    chunks.append(chunk)
+    finally:
+        if out is not None:
+            out.close()
+
+    if not keep:
+        return None
+    return ArchiveMember(
+        name=name,
+        size=size,
+        checksum=sha256.hexdigest(),
+        data=None if spill else b"".join(chunks),
+        path=spill_path
+    )
+
+
+# Timeout `unrar x`: dasar + per MB arsip (arsip solid harus didekompresi berurutan)
+UNRAR_TIMEOUT_BASE = int(os.getenv("UNRAR_TIMEOUT_BASE", "60"))
+UNRAR_TIMEOUT_PER_MB = float(os.getenv("UNRAR_TIMEOUT_PER_MB", "1"))
+
+# unrar memperlakukan karakter ini sebagai wildcard pada argumen nama file
+UNRAR_WILDCARDS = ("*", "?")
+
+
+def _check_unrar_names(names: Collection[str]):
+    """Nama member dari arsip upload tidak boleh terbaca sebagai wildcard unrar"""
+    for name in names:
+        if any(char in name for char in UNRAR_WILDCARDS):
+            raise ArchiveError(f"Nama file dalam RAR mengandung karakter wildcard: {name}")
+
+
+def _select_infos(infos, names: Optional[Collection[str]]):
+    """Member non-direktori, dibatasi ke `names` jika diisi"""
+    infos = [info for info in infos if not info.is_dir()]
+    if names is not None:
+        wanted = set(names)
+        infos = [info for info in infos if info.filename in wanted]
+    return infos
+
+
+def _check_archive_limits(infos, max_members: int, max_total_size: int):
+    """
+    Tolak arsip sebelum isinya dibaca jika jumlah member atau total ukuran
+    tak terkompresi (dari header; zipfile tidak membaca melebihi ukuran ini)
+    melewati batas
+    """
+    if len(infos) > max_members:
+        raise ArchiveError(f"Arsip berisi {len(infos)} file, maksimum {max_members}")
+    total_size = sum(info.file_size for info in infos)
+    if total_size > max_total_size:
+        raise ArchiveError(
+            f"Total ukuran isi arsip {total_size/1024/1024:.1f}MB melebihi batas "
+            f"{max_total_size/1024/1024:.0f}MB"
+        )
+
+
+def list_archive_members(
+    file_path: str,
+    suffixes: Tuple[str, ...] = (".pdf",)
+) -> List[Tuple[str, Optional[int]]]:
+    """
+    Daftar (nama, ukuran) member arsip berakhiran `suffixes` tanpa membaca
+    isinya; dipakai untuk arsip bulk yang isinya diproses per klaim oleh worker.
+    Ukuran None jika tidak diketahui (RAR lewat `unrar lb`).
+    Raises ArchiveError jika arsip tidak bisa dibaca.
+    """
+    file_lower = file_path.lower()
+    if file_lower.endswith(".zip"):
+        try:
+            with zipfile.ZipFile(file_path, 'r') as zip_ref:
+                return [
+                    (info.filename, info.file_size)
+                    for info in zip_ref.infolist()
+                    if not info.is_dir() and info.filename.lower().endswith(suffixes)
+                ]
+        except (zipfile.BadZipFile, zipfile.LargeZipFile, OSError) as e:
+            raise ArchiveError(f"ZIP tidak valid atau rusak: {str(e)}")
+
+    if file_lower.endswith(".rar"):
+        try:
+            result = subprocess.run(['unrar', 'lb', '--', file_path], capture_output=True, text=True, timeout=60)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            raise ArchiveError(f"unrar tidak tersedia: {str(e)}")
+        if result.returncode != 0:
+            raise ArchiveError(f"RAR tidak valid atau rusak (exit {result.returncode})")
+        members = [
+            (name, None) for name in (line.strip() for line in result.stdout.splitlines())
+            if name.lower().endswith(suffixes)
+        ]
+        # Tolak sekarang, bukan saat worker mengekstrak member per klaim
+        _check_unrar_names(name for name, _ in members)
+        return members
+
+    raise ArchiveError("Unsupported archive format (only .rar & .zip allowed)")
+
+
+def read_zip_members(
+    file_path: str,
+    spill_dir: Optional[str] = None,
+    spill_threshold: int = ARCHIVE_SPILL_THRESHOLD,
+    suffixes: Tuple[str, ...] = (".pdf",),
+    progress: Optional[ProgressCallback] = None,
+    names: Optional[Collection[str]] = None,
+    memory_budget: int = ARCHIVE_MEMORY_BUDGET,
+    max_members: int = ARCHIVE_MAX_MEMBERS,
+    max_total_size: int = ARCHIVE_MAX_UNCOMPRESSED_SIZE
+) -> List[ArchiveMember]:
+    """
+    Baca ZIP dalam satu pass: setiap member dibaca sekali, CRC diverifikasi
+    oleh zipfile saat member selesai dibaca, dan SHA-256 dihitung bersamaan.
+
+    Member dengan akhiran `suffixes` dikembalikan sebagai buffer di memori,
+    atau file di `spill_dir` jika lebih besar dari `spill_threshold` atau
+    total buffer di memori akan melewati `memory_budget`; member lain hanya
+    dibaca untuk verifikasi CRC. Jika `names` diisi hanya member tersebut
+    yang dibaca (satu klaim dari arsip bulk).
+    Raises ArchiveError jika arsip rusak atau melewati `max_members` /
+    `max_total_size` (dicek dari header sebelum isi dibaca).
+    """
+    members = []
+    try:
+        with zipfile.ZipFile(file_path, 'r') as zip_ref:
+            infos = _select_infos(zip_ref.infolist(), names)
+            _check_archive_limits(infos, max_members, max_total_size)
+            in_memory = 0
+            for index, info in enumerate(infos):
+                if progress:
+                    progress(info.filename, index + 1, len(infos))
+                keep = info.filename.lower().endswith(suffixes)
+                over_budget = keep and in_memory + info.file_size > memory_budget
+                if over_budget and spill_dir is None:
+                    raise ArchiveError(f"Isi arsip melebihi batas memori {memory_budget/1024/1024:.0f}MB")
+                spill = keep and spill_dir is not None and (info.file_size > spill_threshold or over_budget)
+                member = _read_member(
+                    info.filename, info.file_size, lambda: zip_ref.open(info),
+                    index, spill_dir, spill, suffixes
+                )
+                if member:
+                    members.append(member)
+                    if member.data is not None:
+                        in_memory += member.size
+    except (zipfile.BadZipFile, zipfile.LargeZipFile, EOFError, OSError, NotImplementedError) as e:
+        raise ArchiveError(f"ZIP tidak valid atau rusak: {str(e)}")
+
+    return members
+
+
+def read_rar_members(
+    file_path: str,
+    spill_dir: str,
+    spill_threshold: int = ARCHIVE_SPILL_THRESHOLD,
+    suffixes: Tuple[str, ...] = (".pdf",),
+    progress: Optional[ProgressCallback] = None,
+    timeout: Optional[float] = None,
+    names: Optional[Collection[str]] = None
+) -> List[ArchiveMember]:
+    """
+    Baca RAR dalam satu pass (test + ekstrak sekaligus).
+
+    Satu kali `unrar x` ke `spill_dir` (tanpa `unrar t` terpisah, tanpa satu
+    proses per member); unrar memverifikasi CRC saat mengekstrak dan baris
+    output-nya dipakai sebagai progress per member. `names` membatasi member
+    yang diekstrak; nama berasal dari arsip upload, jadi `--` menghentikan
+    parsing switch dan nama berisi wildcard ditolak. Tanpa `timeout`, batas
+    waktu dihitung dari ukuran arsip (UNRAR_TIMEOUT_BASE + UNRAR_TIMEOUT_PER_MB).
+    Raises ArchiveError jika arsip rusak.
+    """
+    if names:
+        _check_unrar_names(names)
+    if timeout is None:
+        try:
+            size_mb = os.path.getsize(file_path) / (1024 * 1024)
+        except OSError:
+            size_mb = 0
+        timeout = UNRAR_TIMEOUT_BASE + UNRAR_TIMEOUT_PER_MB * size_mb
+    os.makedirs(spill_dir, exist_ok=True)
+    try:
+        process = subprocess.Popen(
+            # -idp/-idc: tanpa persentase (backspace) dan copyright di output progress
+            ['unrar', 'x', '-y', '-o+', '-idp', '-idc', '--', file_path, *(names or []), spill_dir + os.sep],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True
+        )
+    except OSError as e:
+        raise ArchiveError(f"unrar tidak tersedia: {str(e)}")
+
+    timer = threading.Timer(timeout, process.kill)
+    timer.start()
+    output = []
+    extracted = 0
+    try:
+        for line in process.stdout:
+            output.append(line)
+            line = line.strip()
+            if line.startswith("Extracting ") and not line.startswith("Extracting from"):
+                extracted += 1
+                if progress:
+                    name = line[len("Extracting "):].rsplit(" ", 1)[0].strip()
+                    progress(os.path.relpath(name, spill_dir), extracted, None)
+        returncode = process.wait()
+    finally:
+        timer.cancel()
+
+    if returncode != 0:
+        raise ArchiveError(f"RAR extraction failed (exit {returncode}): {''.join(output[-5:]).strip()}")
+
+    members = []
+    for root, dirs, files in os.walk(spill_dir):
+        for f in sorted(files):
+            if f.lower().endswith(suffixes):
+                path = os.path.join(root, f)
+                members.append(ArchiveMember(
+                    name=os.path.relpath(path, spill_dir),
+                    size=os.path.getsize(path),
+                    checksum=None,
+                    path=path
+                ))
+    return members
+
+
+def extract_rar_shared(file_path: str, target_dir: str,
+                       progress: Optional[ProgressCallback] = None) -> str:
+    """
+    Ekstrak seluruh RAR sekali ke `target_dir` untuk dipakai bersama (arsip
+    bulk: setiap job klaim membaca member-nya dari disk, bukan menjalankan
+    `unrar x` sendiri atas arsip yang sama). Ekstraksi ditulis ke direktori
+    sementara lalu di-rename, sehingga `target_dir` yang ada selalu lengkap;
+    jika dua worker mengekstrak bersamaan, hasil yang kalah dibuang.
+    Raises ArchiveError jika arsip rusak.
+    """
+    if os.path.isdir(target_dir):
+        return target_dir
+    tmp_dir = f"{target_dir}.tmp-{uuid.uuid4().hex}"
+    try:
+        read_rar_members(file_path, tmp_dir, progress=progress)
+        try:
+            os.rename(tmp_dir, target_dir)
+        except OSError:
+            if not os.path.isdir(target_dir):
+                raise
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return target_dir
 
 def validate_archive(file_path: str) -> bool:
     """
@@ -99,11 +463,10 @@ def extract_archive(file_path: str, extract_dir: str) -> List[str]:
 
 def calculate_checksum(file_path: str) -> str:
     """Calculate SHA256 checksum of a file"""
-    import hashlib
     sha256 = hashlib.sha256()
 
     with open(file_path, "rb") as f:
-        for chunk in iter(lambda: f.read(4096), b""):
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
             sha256.update(chunk)
 
     return sha256.hexdigest()
@@ -0,0 +1,54 @@
+import base64
+import uuid
+from datetime import datetime
+from typing import Optional, Tuple
+
+from sqlalchemy import tuple_, literal
+
+# ============================================================
+# KEYSET (CURSOR) PAGINATION
+# ============================================================
+# Listing diurutkan (kolom waktu DESC, id DESC). Cursor menyimpan pasangan
+# (waktu, id) baris terakhir halaman sebelumnya, sehingga halaman berikutnya
+# cukup `WHERE (waktu, id) < (:waktu, :id)` lewat index, tanpa OFFSET.
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+MAX_PAGE_SIZE = 1000
+
+Keyset = Tuple[datetime, uuid.UUID]
+
+def encode_cursor(sort_value: datetime, row_id: uuid.UUID) -> str:
+    """Cursor opaque (base64 url-safe) dari (waktu, id) baris terakhir"""
+    raw = f"{sort_value.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Keyset]:
+    """Kebalikan encode_cursor; ValueError jika cursor tidak valid"""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        sort_value, row_id = raw.split("|", 1)
+        return datetime.fromisoformat(sort_value), uuid.UUID(row_id)
+    except Exception:
+        raise ValueError("Cursor tidak valid")
+
+def apply_keyset(query, sort_column, id_column, after: Optional[Keyset], limit: int):
+    """Urutkan (sort_column DESC, id DESC) dan ambil `limit` baris setelah `after`"""
+    if after:
+        sort_value, row_id = after
+        query = query.filter(tuple_(sort_column, id_column) < tuple_(
+            literal(sort_value, type_=sort_column.type),
+            literal(row_id, type_=id_column.type)
+        ))
+    return query.order_by(sort_column.desc(), id_column.desc()).limit(limit)
+
+def next_cursor(rows, limit: int, sort_attr: str, id_attr: str = "id") -> Optional[str]:
+    """Cursor halaman berikutnya, atau None jika halaman ini yang terakhir"""
+    if not rows or len(rows) < limit:
+        return None
+    last = rows[-1]
+    sort_value = getattr(last, sort_attr)
+    if sort_value is None:
+        return None
+    return encode_cursor(sort_value, getattr(last, id_attr))
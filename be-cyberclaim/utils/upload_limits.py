@@ -0,0 +1,105 @@
+import json
+from typing import Dict, Optional
+
+# ============================================================
+# BATAS UKURAN BODY UPLOAD (SEBELUM DI-SPOOL)
+# ============================================================
+# Starlette mem-parsing multipart (dan men-spool UploadFile ke memori/disk)
+# sebelum handler maupun dependency FastAPI berjalan, sehingga pengecekan
+# ukuran di route baru terjadi setelah seluruh body diterima. Middleware ASGI
+# ini berjalan sebelum parsing: request dengan Content-Length di atas batas
+# ditolak 413 tanpa membaca body sama sekali, dan body tanpa Content-Length
+# (chunked) dihentikan begitu jumlah byte yang diterima melewati batas.
+# Di production batas yang sama sebaiknya juga dipasang di reverse proxy
+# (mis. nginx `client_max_body_size`) agar koneksi ditolak sebelum sampai ke app.
+
+# Ruang untuk boundary multipart dan field form selain file
+MULTIPART_OVERHEAD = 1024 * 1024
+
+
+class _BodyTooLarge(Exception):
+    pass
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Tolak request POST ke path di `limits` ({path: batas byte body}) yang
+    body-nya melebihi batas, sebelum Starlette membaca/men-spool body tersebut.
+    """
+
+    def __init__(self, app, limits: Dict[str, int]):
+        self.app = app
+        self.limits = dict(limits)
+
+    async def __call__(self, scope, receive, send):
+        limit = self._limit_for(scope)
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        content_length = self._content_length(scope)
+        if content_length is not None and content_length > limit:
+            await self._reject(send, limit)
+            return
+
+        received = 0
+        exceeded = False
+        rejected = False
+
+        async def limited_receive():
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    exceeded = True
+                    raise _BodyTooLarge()
+            return message
+
+        async def limited_send(message):
+            # FastAPI membungkus error saat parsing body menjadi 400; ganti
+            # response tersebut dengan 413 begitu batas terlewati
+            nonlocal rejected
+            if not exceeded:
+                await send(message)
+            elif not rejected:
+                rejected = True
+                await self._reject(send, limit)
+
+        try:
+            await self.app(scope, limited_receive, limited_send)
+        except _BodyTooLarge:
+            if not rejected:
+                rejected = True
+                await self._reject(send, limit)
+
+    def _limit_for(self, scope) -> Optional[int]:
+        if scope["type"] != "http" or scope["method"] != "POST":
+            return None
+        return self.limits.get(scope["path"].rstrip("/"))
+
+    @staticmethod
+    def _content_length(scope) -> Optional[int]:
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                try:
+                    return int(value)
+                except ValueError:
+                    return None
+        return None
+
+    @staticmethod
+    async def _reject(send, limit: int):
+        body = json.dumps({
+            "detail": f"Request body exceeds maximum limit of {limit/1024/1024:.0f}MB"
+        }).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"connection", b"close"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
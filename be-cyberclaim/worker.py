@@ -0,0 +1,157 @@
+"""
+Worker antrean job CyberClaim (validasi klaim & fraud detection).
+
+Jalankan terpisah dari API, bisa lebih dari satu instance:
+
+    python worker.py --concurrency 2
+    python worker.py --job-types fraud_detection --concurrency 4
+"""
+import os
+import time
+import socket
+import signal
+import argparse
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from database import SessionLocal
+from repositories.job import (
+    claim_next_job, complete_job, fail_job, extend_job_lease,
+    JOB_VISIBILITY_TIMEOUT
+)
+from models.job import JobStatus
+from services.claim_processing import JOB_HANDLERS
+from services.warmup import warm_up
+from services.audit_sink import get_audit_sink
+
+WORKER_CONCURRENCY = int(os.getenv("WORKER_CONCURRENCY", "2"))
+WORKER_POLL_INTERVAL = float(os.getenv("WORKER_POLL_INTERVAL", "2"))
+
+
+class Worker:
+    """
+    Menjalankan `concurrency` slot paralel; setiap slot mengambil satu job,
+    menjalankan handler-nya, lalu menandai job selesai / gagal (retry dengan backoff).
+    Lease job diperpanjang berkala selama handler berjalan.
+    """
+
+    def __init__(self, concurrency: int = WORKER_CONCURRENCY, job_types=None,
+                 poll_interval: float = WORKER_POLL_INTERVAL,
+                 visibility_timeout: int = JOB_VISIBILITY_TIMEOUT):
+        self.concurrency = max(1, concurrency)
+        self.job_types = job_types or list(JOB_HANDLERS.keys())
+        self.poll_interval = poll_interval
+        self.visibility_timeout = visibility_timeout
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._stop = threading.Event()
+
+    def stop(self, *_):
+        if not self._stop.is_set():
+            print(f"🛑 Worker {self.worker_id} berhenti setelah job yang sedang berjalan selesai...")
+        self._stop.set()
+
+    def _heartbeat(self, job_id, done: threading.Event):
+        interval = max(1, self.visibility_timeout // 3)
+        while not done.wait(interval):
+            db = SessionLocal()
+            try:
+                if not extend_job_lease(db, job_id, self.worker_id, self.visibility_timeout):
+                    print(f"⚠️ Lease job {job_id} tidak lagi dimiliki worker ini")
+                    return
+            except Exception as e:
+                print(f"⚠️ Gagal memperpanjang lease job {job_id}: {e}")
+            finally:
+                db.close()
+
+    def run_one(self) -> bool:
+        """Ambil dan jalankan satu job. Return False jika antrean kosong."""
+        db = SessionLocal()
+        try:
+            job = claim_next_job(db, self.worker_id, self.job_types, self.visibility_timeout)
+            if job is None:
+                return False
+
+            handler = JOB_HANDLERS[job.job_type]
+            print(f"⚙️ [{self.worker_id}] Job {job.id} ({job.job_type}) klaim {job.claim_id} "
+                  f"- percobaan {job.attempts}/{job.max_attempts}")
+
+            if job.attempts > job.max_attempts:
+                # Diambil ulang setelah visibility timeout tetapi jatah percobaan sudah habis
+                job.attempts = job.max_attempts
+                job = fail_job(db, job, "Visibility timeout terlampaui, worker sebelumnya tidak menyelesaikan job")
+                handler["on_failure"](db, job)
+                return True
+
+            done = threading.Event()
+            heartbeat = threading.Thread(target=self._heartbeat, args=(job.id, done), daemon=True)
+            heartbeat.start()
+            try:
+                result = handler["run"](db, job)
+            except Exception as e:
+                db.rollback()
+                print(f"🚨 Job {job.id} gagal: {e}")
+                traceback.print_exc()
+                job = fail_job(db, job, f"{type(e).__name__}: {e}")
+                if job.status == JobStatus.FAILED:
+                    print(f"💀 Job {job.id} gagal permanen setelah {job.attempts} percobaan")
+                    handler["on_failure"](db, job)
+                else:
+                    print(f"🔁 Job {job.id} dijadwalkan ulang pada {job.run_after.isoformat()}")
+                return True
+            finally:
+                done.set()
+
+            complete_job(db, job, result)
+            print(f"✅ Job {job.id} selesai")
+            return True
+        finally:
+            db.close()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                if not self.run_one():
+                    self._stop.wait(self.poll_interval)
+            except Exception as e:
+                print(f"🚨 Worker loop error: {e}")
+                self._stop.wait(self.poll_interval)
+
+    def run(self):
+        print(f"🚀 Worker {self.worker_id} mulai: concurrency={self.concurrency}, job_types={self.job_types}")
+        warm_up()
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="job-worker") as executor:
+            for _ in range(self.concurrency):
+                executor.submit(self._loop)
+            while not self._stop.is_set():
+                time.sleep(0.5)
+        get_audit_sink().close()
+        print(f"🔴 Worker {self.worker_id} berhenti")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CyberClaim job worker")
+    parser.add_argument("--concurrency", type=int, default=WORKER_CONCURRENCY,
+                        help="Jumlah job yang diproses paralel")
+    parser.add_argument("--job-types", default=None,
+                        help="Daftar job type dipisah koma (default: semua)")
+    parser.add_argument("--poll-interval", type=float, default=WORKER_POLL_INTERVAL,
+                        help="Jeda polling (detik) saat antrean kosong")
+    parser.add_argument("--visibility-timeout", type=int, default=JOB_VISIBILITY_TIMEOUT,
+                        help="Lease job (detik) sebelum dianggap ditinggalkan")
+    args = parser.parse_args()
+
+    job_types = [t.strip() for t in args.job_types.split(",")] if args.job_types else None
+    worker = Worker(
+        concurrency=args.concurrency,
+        job_types=job_types,
+        poll_interval=args.poll_interval,
+        visibility_timeout=args.visibility_timeout
+    )
+    signal.signal(signal.SIGINT, worker.stop)
+    signal.signal(signal.SIGTERM, worker.stop)
+    worker.run()
+
+
+if __name__ == "__main__":
+    main()